@@ -0,0 +1,90 @@
+"""
+Parity and throughput of the PyTorch and int8 ONNX embedding backends.
+
+Parity: cosine similarity between the two backends' vectors for the same
+text, and how often both return the same top-3 chunks for a query.
+Throughput: texts per second for document batches and single queries.
+
+Export the ONNX model first:
+    python -m flashcards.onnx_embeddings
+
+Usage: python benchmarks/bench_embeddings.py [--file notes.pdf] [--texts 512]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from flashcards.embeddings import create_embeddings
+
+
+def rss_mb() -> float:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+
+def corpus(path, count):
+    if path:
+        from flashcards.extraction import extract_path, split_text
+        chunks = split_text(extract_path(path))
+    else:
+        topics = ["Newton's laws", "photosynthesis", "binary search", "the French revolution",
+                  "integration by parts", "supply and demand", "recursion", "plate tectonics"]
+        chunks = [
+            f"Lecture note {i}: {topics[i % len(topics)]} explained with an example about "
+            f"{topics[(i * 3) % len(topics)]} and a short exercise numbered {i}."
+            for i in range(count)
+        ]
+    return (chunks * (count // max(len(chunks), 1) + 1))[:count]
+
+
+def measure(model, texts, queries):
+    before = rss_mb()
+    started = time.perf_counter()
+    docs = np.asarray(model.embed_documents(texts), dtype=np.float32)
+    doc_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    q = np.asarray([model.embed_query(text) for text in queries], dtype=np.float32)
+    query_seconds = time.perf_counter() - started
+    return docs, q, doc_seconds, query_seconds, rss_mb() - before
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--file", help="PDF/DOCX/PPTX to take chunks from")
+    parser.add_argument("--texts", type=int, default=512)
+    parser.add_argument("--queries", type=int, default=64)
+    args = parser.parse_args()
+
+    texts = corpus(args.file, args.texts)
+    queries = [t[:80] for t in texts[::max(1, len(texts) // args.queries)]][:args.queries]
+
+    results = {}
+    for backend in ("huggingface", "onnx"):
+        started = time.perf_counter()
+        model = create_embeddings(backend)
+        load_seconds = time.perf_counter() - started
+        results[backend] = (load_seconds, *measure(model, texts, queries))
+
+    print(f"{'backend':<12} {'load s':>7} {'docs/s':>9} {'queries/s':>10} {'rss +MB':>8}")
+    for backend, (load, _, _, doc_s, query_s, rss) in results.items():
+        print(f"{backend:<12} {load:>7.2f} {len(texts) / doc_s:>9.1f} {len(queries) / query_s:>10.1f} {rss:>8.1f}")
+
+    _, hf_docs, hf_q, *_ = results["huggingface"]
+    _, ox_docs, ox_q, *_ = results["onnx"]
+    cosine = np.sum(hf_docs * ox_docs, axis=1)
+    hf_top = np.argsort(-(hf_q @ hf_docs.T), axis=1)[:, :3]
+    ox_top = np.argsort(-(ox_q @ ox_docs.T), axis=1)[:, :3]
+    overlap = np.mean([len(set(a) & set(b)) / 3 for a, b in zip(hf_top, ox_top)])
+
+    print(f"\ncosine(hf, onnx): mean {cosine.mean():.4f}  min {cosine.min():.4f}")
+    print(f"top-3 retrieval overlap: {overlap:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Track the cold-start cost of importing the API.
+
+Runs `python -X importtime -c "import main"` in a fresh interpreter and
+reports the wall-clock import time plus the slowest top-level packages.
+Heavy components (embedding model, graphs, parse workers) are loaded by
+the background warm-up, so importing main should stay cheap; pass
+--max-seconds to fail CI when a change pulls something heavy back into
+module scope.
+
+Usage: python benchmarks/bench_import.py [--module main] [--top 15] [--max-seconds 5]
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--max-seconds", type=float)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {args.module}"],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    wall = time.perf_counter() - started
+    if out.returncode != 0:
+        print(out.stderr.strip().splitlines()[-1])
+        sys.exit(out.returncode)
+
+    # Cumulative time of each first-level package, taken from its outermost import
+    packages = defaultdict(int)
+    for match in LINE.finditer(out.stderr):
+        cumulative, indent, name = int(match.group(2)), len(match.group(3)), match.group(4)
+        if indent <= 1:
+            packages[name.split(".")[0]] += cumulative
+
+    print(f"import {args.module}: {wall:.2f}s wall (including interpreter start)\n")
+    print(f"{'package':<32} {'cumulative ms':>14}")
+    for name, micros in sorted(packages.items(), key=lambda kv: -kv[1])[:args.top]:
+        print(f"{name:<32} {micros / 1000:>14.1f}")
+
+    if args.max_seconds is not None and wall > args.max_seconds:
+        print(f"\nImport took {wall:.2f}s, over the {args.max_seconds:.2f}s budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
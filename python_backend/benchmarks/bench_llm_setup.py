@@ -0,0 +1,80 @@
+"""
+Per-request LLM setup cost: fresh clients and chains vs the shared registry.
+
+"fresh" reproduces what each chat message and flashcard node used to do
+(construct ChatGoogleGenerativeAI, build the prompt, bind tools or
+structured output). "shared" is the registry lookup that replaces it.
+No model calls are made, so a placeholder GOOGLE_API_KEY is enough.
+
+Usage: python benchmarks/bench_llm_setup.py [--iterations 200]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark-placeholder")
+
+from langchain.prompts import ChatPromptTemplate
+
+from flashcards import flashcard_agent
+from flashcards.agent import tools
+from flashcards.flashcard_agent import Flashcards, Quiz, ImportantPoint, get_chain
+from flashcards.llm import CHAT_MODEL, TEACHER_PROMPTS, get_teacher_chain
+
+
+def fresh_teacher_chain():
+    from langchain_google_genai import ChatGoogleGenerativeAI
+    llm = ChatGoogleGenerativeAI(model=CHAT_MODEL, google_api_key=os.environ["GOOGLE_API_KEY"], temperature=0.7)
+    prompt = ChatPromptTemplate.from_messages([("system", TEACHER_PROMPTS['Anil Deshmukh']), ("user", "{input}")])
+    return prompt | llm.bind_tools(tools)
+
+
+def fresh_flashcard_chains():
+    from langchain_google_genai import ChatGoogleGenerativeAI
+    chains = []
+    for model, schema, prompt in (
+        (flashcard_agent.SUMMARY_MODEL, None, flashcard_agent.summary_prompt),
+        (flashcard_agent.QUIZ_MODEL, Quiz, flashcard_agent.quiz_prompt),
+        (flashcard_agent.IMPORTANT_MODEL, ImportantPoint, flashcard_agent.important_prompt),
+        (flashcard_agent.FLASHCARDS_MODEL, Flashcards, flashcard_agent.flashcards_prompt),
+    ):
+        llm = ChatGoogleGenerativeAI(model=model, temperature=0.7)
+        chains.append(prompt | (llm.with_structured_output(schema) if schema else llm))
+    return chains
+
+
+def shared_flashcard_chains():
+    return [get_chain(name) for name in ("summarize", "quiz", "important", "flashcards")]
+
+
+def timed(fn, iterations):
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - started) / iterations * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    # First call pays imports and builds the shared registry entries
+    fresh_teacher_chain(), fresh_flashcard_chains()
+    get_teacher_chain('Anil Deshmukh'), shared_flashcard_chains()
+
+    rows = [
+        ("chat message", timed(fresh_teacher_chain, args.iterations),
+         timed(lambda: get_teacher_chain('Anil Deshmukh'), args.iterations)),
+        ("flashcard request", timed(fresh_flashcard_chains, args.iterations),
+         timed(shared_flashcard_chains, args.iterations)),
+    ]
+    print(f"{'setup per':<18} {'fresh ms':>9} {'shared ms':>10} {'saved ms':>9}")
+    for name, fresh, shared in rows:
+        print(f"{name:<18} {fresh:>9.3f} {shared:>10.4f} {fresh - shared:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
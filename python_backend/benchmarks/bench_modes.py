@@ -0,0 +1,85 @@
+"""
+Latency and token cost of the combined study-pack call versus the four-call fan-out.
+
+Runs the flashcard graph on growing prefixes of a document in both modes
+and prints one row per size; the crossover is the first size at which
+fan-out finishes faster than the combined call. Use the result to set
+COMBINED_MAX_TOKENS. Needs GOOGLE_API_KEY and makes real Gemini calls.
+
+Usage: python benchmarks/bench_modes.py --file lecture.pdf [--sizes 1000 2000 4000 8000 16000] [--repeats 3]
+"""
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_core.callbacks import get_usage_metadata_callback
+from langchain_core.messages import HumanMessage
+
+from flashcards.extraction import extract_path
+from flashcards.flashcard_agent import build_graph
+from flashcards.history import estimate_tokens
+from flashcards.result_cache import node_result_cache
+
+MODES = ["combined", "fanout"]
+
+
+async def run_once(graph, content: str, mode: str) -> dict:
+    """One graph run from pre-extracted content; returns wall time and token usage"""
+    state = {"messages": [HumanMessage(content=content)], "teacher": "Mary Fernandes", "mode": mode}
+    with get_usage_metadata_callback() as usage:
+        started = time.perf_counter()
+        await graph.ainvoke(state)
+        seconds = time.perf_counter() - started
+    totals = {"input_tokens": 0, "output_tokens": 0}
+    for model_usage in usage.usage_metadata.values():
+        totals["input_tokens"] += model_usage.get("input_tokens", 0)
+        totals["output_tokens"] += model_usage.get("output_tokens", 0)
+    return {"seconds": seconds, **totals}
+
+
+async def benchmark(text: str, sizes: list, repeats: int):
+    # Repeated runs on the same content would otherwise be served from the result cache
+    node_result_cache.enabled = False
+    graph = build_graph()
+    crossover = None
+    print(f"{'tokens':>8} {'mode':>9} {'median_s':>9} {'input_tok':>10} {'output_tok':>11}")
+    for size in sizes:
+        content = text[:size * 4]
+        medians = {}
+        for mode in MODES:
+            runs = [await run_once(graph, content, mode) for _ in range(repeats)]
+            medians[mode] = statistics.median(r["seconds"] for r in runs)
+            print(f"{estimate_tokens(content):>8} {mode:>9} {medians[mode]:>9.2f} "
+                  f"{int(statistics.median(r['input_tokens'] for r in runs)):>10} "
+                  f"{int(statistics.median(r['output_tokens'] for r in runs)):>11}")
+        if crossover is None and medians["fanout"] < medians["combined"]:
+            crossover = size
+        if len(content) < size * 4:
+            break
+    return crossover
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--file", required=True, help="PDF, DOCX, PPTX or TXT to take content from")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 2000, 4000, 8000, 16000],
+                        help="content sizes in estimated tokens")
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    crossover = asyncio.run(benchmark(extract_path(args.file), sorted(args.sizes), args.repeats))
+    if crossover is None:
+        print("Combined mode was at least as fast at every size tested")
+    else:
+        print(f"Fan-out overtakes the combined call at about {crossover} tokens; set COMBINED_MAX_TOKENS below that")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Compare the Chroma and NumPy per-document retrievers.
+
+Reports build time, query latency and resident memory at 100, 1k and 10k
+chunks. Each case runs in a fresh subprocess so RSS deltas aren't skewed
+by earlier cases. Vectors are random unit vectors of the MiniLM dimension,
+so the numbers isolate the store itself from the embedding model.
+
+Usage: python benchmarks/bench_retriever.py [--sizes 100 1000 10000] [--queries 200]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DIM = 384
+
+
+def rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def run_case(backend: str, size: int, queries: int) -> dict:
+    import numpy as np
+    from langchain_core.embeddings import DeterministicFakeEmbedding
+
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((size, DIM)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    # ~1000 character chunks, like the production splitter
+    texts = [f"chunk {i} " + "lorem ipsum dolor sit amet " * 37 for i in range(size)]
+    probes = rng.standard_normal((queries, DIM)).astype(np.float32)
+    probes /= np.linalg.norm(probes, axis=1, keepdims=True)
+    embedding = DeterministicFakeEmbedding(size=DIM)
+
+    if backend == "chroma":
+        from langchain_community.vectorstores import Chroma
+        from flashcards.index_store import PrecomputedEmbeddings
+        before = rss_bytes()
+        started = time.perf_counter()
+        doc_embeddings = PrecomputedEmbeddings(embedding, texts, vectors)
+        store = Chroma.from_texts(texts, doc_embeddings, collection_name=f"bench_{size}")
+        doc_embeddings.release()
+    else:
+        from flashcards.numpy_store import NumpyVectorStore
+        before = rss_bytes()
+        started = time.perf_counter()
+        store = NumpyVectorStore.from_arrays(texts, vectors.copy(), embedding)
+    build_seconds = time.perf_counter() - started
+    memory = rss_bytes() - before
+
+    latencies = []
+    for probe in probes:
+        started = time.perf_counter()
+        store.similarity_search_by_vector(probe.tolist(), k=3)
+        latencies.append(time.perf_counter() - started)
+    latencies.sort()
+
+    return {
+        "backend": backend,
+        "chunks": size,
+        "build_ms": round(build_seconds * 1000, 2),
+        "query_p50_ms": round(latencies[len(latencies) // 2] * 1000, 3),
+        "query_p95_ms": round(latencies[int(len(latencies) * 0.95)] * 1000, 3),
+        "rss_mb": round(memory / (1024 * 1024), 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--backends", nargs="+", default=["chroma", "numpy"])
+    parser.add_argument("--case", nargs=2, metavar=("BACKEND", "SIZE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.case:
+        print(json.dumps(run_case(args.case[0], int(args.case[1]), args.queries)))
+        return
+
+    print(f"{'backend':<8} {'chunks':>7} {'build ms':>10} {'p50 ms':>8} {'p95 ms':>8} {'rss MB':>8}")
+    for size in args.sizes:
+        for backend in args.backends:
+            out = subprocess.run(
+                [sys.executable, __file__, "--case", backend, str(size), "--queries", str(args.queries)],
+                capture_output=True, text=True
+            )
+            if out.returncode != 0:
+                print(f"{backend:<8} {size:>7} failed: {out.stderr.strip().splitlines()[-1]}")
+                continue
+            r = json.loads(out.stdout.strip().splitlines()[-1])
+            print(f"{r['backend']:<8} {r['chunks']:>7} {r['build_ms']:>10} {r['query_p50_ms']:>8} {r['query_p95_ms']:>8} {r['rss_mb']:>8}")
+
+
+if __name__ == "__main__":
+    main()
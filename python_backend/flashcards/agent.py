@@ -1,77 +1,91 @@
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_huggingface import HuggingFaceEmbeddings
 from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langgraph.graph import StateGraph, END
+from langgraph.graph import StateGraph, START, END
 from langgraph.graph.message import add_messages
-from langgraph.checkpoint.memory import MemorySaver
+from .checkpoint_metrics import InstrumentedMemorySaver
+from .checkpointer import SqliteCheckpointSaver
 from langgraph.prebuilt import ToolNode, tools_condition
-from langchain_community.utilities import SerpAPIWrapper
 from langchain_community.vectorstores import Chroma
-from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain.tools import tool
-from langchain_core.messages import HumanMessage, AIMessage
+from langchain_core.messages import HumanMessage, AIMessage, RemoveMessage, ToolMessage
+from langchain_core.callbacks.manager import adispatch_custom_event
+from langchain_core.runnables import RunnableConfig
 from dotenv import load_dotenv
 from langchain_community.vectorstores import Chroma
 from langchain.text_splitter import RecursiveCharacterTextSplitter
-from .teachers import anil_prompt, kavita_prompt, raghav_prompt, mary_prompt
+from .llm import get_llm, get_teacher_chain, CHAT_MODEL, TEACHER_PROMPTS
+from .documents import document_store
+from .extraction import split_document
+from .executors import parse_executor, embed_executor, query_executor
 from typing import TypedDict, List, Literal, Annotated, Optional, Dict, Any, AsyncGenerator
-from pdfminer.high_level import extract_text
 import os
+import uuid
 import logging
-from pptx import Presentation
-from docx import Document
-from cachetools import TTLCache
+import asyncio
+from .vector_store_manager import VectorStoreManager, estimate_store_bytes
+from .index_store import index_store, PrecomputedEmbeddings
+from .numpy_store import NumpyVectorStore, chunk_id
+from .embedding_cache import CachedEmbeddings
+from .embedding_service import EmbeddingService
+from .embeddings import embeddings
+from .registry import registry
+from .response_cache import response_cache
+from .search import search_service
+from .history import history_summarizer, estimate_tokens, split_turns, fit_history
+from .context_packer import pack_context
+from .timings import timed
+from .turn_store import TurnStore
+from .config import (
+    EMBEDDING_MODEL_KEY, RETRIEVER_BACKEND, CHECKPOINT_BACKEND, CHECKPOINT_DB_PATH,
+    CHECKPOINT_TTL_SECONDS, CHECKPOINT_KEEP_PER_THREAD, HISTORY_WINDOW_TURNS, CHAT_TOKEN_BUDGET,
+    SUMMARY_SAVE_WAIT_SECONDS,
+    RESPONSE_CACHE_ENABLED, RESPONSE_CACHE_WITHOUT_DOCUMENT, RETRIEVAL_CANDIDATES, CONTEXT_TOKEN_BUDGET,
+)
+import numpy as np
 # Load environment variables FIRST
 load_dotenv()
 
-vector_stores = TTLCache(maxsize=1000, ttl=1800)
-
-embeddings = HuggingFaceEmbeddings(
-    model_name="sentence-transformers/all-MiniLM-L6-v2",
-    model_kwargs={'device': 'cpu'},
-    encode_kwargs={'normalize_embeddings': True}
-)
+# Document chunks go through the chunk-level cache; everything that reaches the model is micro-batched
+document_embeddings = CachedEmbeddings(embeddings, EMBEDDING_MODEL_KEY)
+embedding_service = EmbeddingService(embeddings)
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Global storage for vector databases and conversation contexts
-vector_stores: Dict[str, Chroma] = {}
+def release_vector_store(doc_id: str, vector_db):
+    """Drop the evicted collection so its memory is actually freed"""
+    vector_db.delete_collection()
+
+# Global storage for vector databases (keyed by doc_id) and conversation contexts
+vector_stores = VectorStoreManager(on_evict=release_vector_store)
 conversation_contexts: Dict[str, Dict[str, Any]] = {}
+_index_locks: Dict[str, asyncio.Lock] = {}
+# Query vector, packed context or cached answer for the turn in progress, handed from retrieve to chat
+turn_retrievals = TurnStore()
 
+# Checkpointed every super-step, so only plain serializable data lives here;
+# chains and clients are resolved from the registry at run time
 class State(TypedDict):
     messages: Annotated[List, add_messages]
     teacher: Literal['Anil Deshmukh', 'Kavita Iyer', 'Raghav Sharma', 'Mary Fernandes']
-    chain: Any
-    pdf_path: Optional[str]
-    user_id: str
+    doc_id: Optional[str]
+    summary: Optional[str]
+    # Summary folded in the background, applied by the next chat turn
+    pending_summary: Optional[Dict[str, Any]]
 
 def create_google_llm():
-    """Create Google LLM with proper error handling"""
+    """Return the shared Google LLM client with proper error handling"""
     try:
-        api_key = os.getenv('GOOGLE_API_KEY')
-        if not api_key:
-            raise ValueError("GOOGLE_API_KEY environment variable is not set")
-        
-        llm = ChatGoogleGenerativeAI(
-            model='gemini-2.0-flash',
-            google_api_key=api_key,
-            temperature=0.7
-        )
-        logger.info("Google LLM initialized successfully")
-        return llm
+        return get_llm(CHAT_MODEL)
     except Exception as e:
         logger.error(f"Failed to initialize Google LLM: {e}")
         raise
 
 @tool
-def search(query: str) -> str:
+async def search(query: str) -> str:
     """Search for information on the internet."""
     try:
-        serpapi = SerpAPIWrapper()
-        results = serpapi.run(query)
-        return results
+        return await search_service.search(query)
     except Exception as e:
         logger.error(f"Search error: {e}")
         return f"Search failed: {str(e)}"
@@ -80,145 +94,397 @@ def search(query: str) -> str:
 tools = [search]
 tool_node = ToolNode(tools)
 
-def extract_pptx(pptx_path):
-    prs = Presentation(pptx_path)
-    text_runs = []
-    for slide in prs.slides:
-        for shape in slide.shapes:
-            if hasattr(shape, "text") and shape.text:
-                text_runs.append(shape.text)
-    return "\n".join(text_runs)
-
-def extract_docx(docx_path):
-    doc = Document(docx_path)
-    full_text = []
-    for para in doc.paragraphs:
-        if para.text:
-            full_text.append(para.text)
-    return "\n".join(full_text)
-
-
-async def prepare_pdf_rag(pdf_path: str, user_id: str) -> Chroma:
-    # Check if this user already has a vectorstore
-    existing = vector_stores.get(user_id)
-    if existing and existing["file"] == pdf_path:
-        # Reuse the same DB
-        return existing["db"]
-    
-    # If new file or none exists, build fresh
-    if pdf_path.endswith('.pdf'):
-        content = extract_text(pdf_path)
-    elif pdf_path.endswith('.txt'):
-        with open(pdf_path, 'r') as f:
-            content = f.read()
-    elif pdf_path.endswith('.pptx'):
-        content = extract_pptx(pdf_path)
-    elif pdf_path.endswith('.docx'):
-        content = extract_docx(pdf_path)
-    
-    splitter = RecursiveCharacterTextSplitter(
-        chunk_size=1000,
-        chunk_overlap=200
-    )
-    chunks = splitter.split_text(content)
-    
-    vector_db = Chroma.from_texts(chunks, embeddings)
-    
-    # Store/replace
-    vector_stores[user_id] = {"file": pdf_path, "db": vector_db}
-    
+def build_vector_store(doc_id: str, chunks: List[str], vectors: np.ndarray):
+    """Wrap precomputed chunk vectors in the configured retriever backend"""
+    # Chunk positions let the context packer merge neighbouring hits
+    metadatas = [{"chunk": i} for i in range(len(chunks))]
+    if RETRIEVER_BACKEND == "numpy":
+        return NumpyVectorStore.from_arrays(chunks, vectors, embeddings, metadatas)
+
+    # One collection per document so indexes never mix
+    doc_embeddings = PrecomputedEmbeddings(embeddings, chunks, vectors)
+    vector_db = Chroma.from_texts(chunks, doc_embeddings, metadatas=metadatas, collection_name=f"doc_{doc_id[:32]}")
+    doc_embeddings.release()
+    return vector_db
+
+def previous_revision(previous_doc_id: str):
+    """Chunks and vectors of an earlier revision, from disk or from its resident index"""
+    # The id reaches index paths, so only stored documents are accepted
+    if not document_store.get(previous_doc_id):
+        return None
+    persisted = index_store.load(previous_doc_id, EMBEDDING_MODEL_KEY)
+    if persisted:
+        return persisted
+    resident = vector_stores.get(previous_doc_id)
+    if isinstance(resident, NumpyVectorStore):
+        return resident.texts, resident.matrix
+    return None
+
+async def embed_revision(chunks: List[str], previous_doc_id: str):
+    """Embed a new revision, reusing vectors of chunks unchanged since `previous_doc_id`.
+
+    Returns (vectors, stats), or None when the previous revision isn't available.
+    """
+    previous = await embed_executor.run(previous_revision, previous_doc_id)
+    if previous is None:
+        return None
+    old_chunks, old_vectors = previous
+    old_rows = {chunk_id(chunk): row for row, chunk in enumerate(old_chunks)}
+    ids = [chunk_id(chunk) for chunk in chunks]
+
+    # Only chunks whose hash the old revision doesn't have go to the model
+    changed = list(dict.fromkeys(chunk for chunk, i in zip(chunks, ids) if i not in old_rows))
+    computed = {}
+    cache_stats = None
+    if changed:
+        new_vectors, cache_stats = await document_embeddings.aembed_documents_with_stats(
+            changed, embed=embedding_service.aembed_documents
+        )
+        computed = {chunk_id(chunk): vector for chunk, vector in zip(changed, new_vectors)}
+
+    stats = {
+        "previous_doc_id": previous_doc_id,
+        "chunks": len(chunks),
+        "reused": sum(1 for i in ids if i in old_rows),
+        "recomputed": sum(1 for i in ids if i not in old_rows),
+        "removed": len(set(old_rows) - set(ids)),
+        "embedding_cache": cache_stats,
+    }
+    rows = [old_vectors[old_rows[i]] if i in old_rows else computed[i] for i in ids]
+    vectors = np.asarray(rows, dtype=np.float32) if rows else np.zeros((0, old_vectors.shape[1]), dtype=np.float32)
+    return vectors, stats
+
+async def prepare_pdf_rag(doc_id: str, previous_doc_id: Optional[str] = None, owner: Optional[str] = None):
+    """Return the vector index for a document, building it once per doc_id.
+
+    With `previous_doc_id` (an earlier revision of the same file), only
+    chunks that changed since that revision are embedded. With `owner`, the
+    index comes back pinned and the caller must unpin it when done.
+    """
+    vector_db, _ = await _prepare_index(doc_id, previous_doc_id, owner)
     return vector_db
 
+async def reindex_revision(doc_id: str, previous_doc_id: str) -> Optional[Dict[str, Any]]:
+    """Index a revised upload; re-index stats of this call, or None if nothing was re-embedded from the revision"""
+    _, reindex_stats = await _prepare_index(doc_id, previous_doc_id)
+    return reindex_stats
+
+async def _prepare_index(doc_id: str, previous_doc_id: Optional[str], owner: Optional[str] = None):
+    existing = vector_stores.get(doc_id, owner)
+    if existing is not None:
+        return existing, None
+
+    # Concurrent questions on a fresh document wait for a single build
+    lock = _index_locks.setdefault(doc_id, asyncio.Lock())
+    async with lock:
+        existing = vector_stores.get(doc_id, owner)
+        if existing is not None:
+            return existing, None
+
+        reindex_stats = None
+        # Another worker (or a previous run) may already have embedded this document
+        persisted = await embed_executor.run(index_store.load, doc_id, EMBEDDING_MODEL_KEY)
+        if persisted:
+            chunks, vectors = persisted
+            logger.info(f"Loaded persisted index for document {doc_id} ({len(chunks)} chunks)")
+        else:
+            pdf_path = document_store.path(doc_id)
+            if not pdf_path:
+                raise ValueError(f"Unknown document: {doc_id}")
+
+            # doc_id is the content hash, so extraction and chunking are shared with other endpoints
+            chunks = await parse_executor.run(split_document, pdf_path, content_hash=doc_id)
+            revision = None
+            if previous_doc_id and previous_doc_id != doc_id:
+                revision = await embed_revision(chunks, previous_doc_id)
+            if revision:
+                vectors, reindex_stats = revision
+                extra = {"reindex": reindex_stats}
+                logger.info(
+                    f"Re-indexed document {doc_id} from {previous_doc_id}: {reindex_stats['reused']} chunks "
+                    f"reused, {reindex_stats['recomputed']} recomputed, {reindex_stats['removed']} removed"
+                )
+            else:
+                vectors, cache_stats = await document_embeddings.aembed_documents_with_stats(
+                    chunks, embed=embedding_service.aembed_documents
+                )
+                vectors = np.asarray(vectors, dtype=np.float32)
+                extra = {"embedding_cache": cache_stats}
+                logger.info(
+                    f"Embedded document {doc_id}: {cache_stats['hits']}/{cache_stats['chunks']} chunks "
+                    f"from cache (hit ratio {cache_stats['hit_ratio']})"
+                )
+            await embed_executor.run(index_store.save, doc_id, EMBEDDING_MODEL_KEY, chunks, vectors, extra)
+
+        vector_db = await embed_executor.run(build_vector_store, doc_id, chunks, vectors)
+        size = vector_db.nbytes() if isinstance(vector_db, NumpyVectorStore) else estimate_store_bytes(chunks)
+        vector_stores.put(doc_id, vector_db, size, owner)
+        logger.info(f"Vector index ready for document {doc_id} ({len(chunks)} chunks)")
+
+    _index_locks.pop(doc_id, None)
+    return vector_db, reindex_stats
+
+def _log_index_failure(task: asyncio.Task):
+    if not task.cancelled() and task.exception():
+        logger.error(f"Error preparing vector index: {task.exception()}")
+
+def normalize_teacher(teacher: str) -> str:
+    """Known persona name; anything else falls back to Mary Fernandes"""
+    return teacher if teacher in TEACHER_PROMPTS else 'Mary Fernandes'
+
+@timed("teacher")
 def initialise_teacher(state: State):
-    """Initialize teacher with appropriate prompt and tools"""
+    """Validate the teacher and make sure its chain is built"""
     try:
-        llm = create_google_llm()
-        teacher = state['teacher']
-        
-        # Get teacher prompt
-        if teacher == 'Anil Deshmukh':
-            system_prompt = anil_prompt
-        elif teacher == 'Kavita Iyer':
-            system_prompt = kavita_prompt
-        elif teacher == 'Raghav Sharma':
-            system_prompt = raghav_prompt
-        else:
-            system_prompt = mary_prompt
-        
-        # Create a simpler prompt template
-        prompt_template = ChatPromptTemplate.from_messages([
-            ("system", system_prompt),
-            ("user", "{input}")
-        ])
-        
-        # Create the chain with the new template
-        chain = prompt_template | llm.bind_tools(tools)
-        
-        return {"chain": chain}
+        teacher = normalize_teacher(state['teacher'])
+        # Chains are built once per teacher and reused across messages
+        get_teacher_chain(teacher)
+        return {"teacher": teacher}
         
     except Exception as e:
         logger.error(f"Error initializing teacher: {e}")
         raise
 
-async def chat(state: State):
+def is_response_cacheable(state: State) -> bool:
+    """Only opening questions are cached: later answers depend on the thread's turns and summary"""
+    if not RESPONSE_CACHE_ENABLED or state.get('summary') or len(state['messages']) > 1:
+        return False
+    return bool(state.get('doc_id')) or RESPONSE_CACHE_WITHOUT_DOCUMENT
+
+def turn_key(config: RunnableConfig, question: HumanMessage):
+    """Identifies one turn: the thread and the id add_messages gave the question"""
+    return config.get("configurable", {}).get("thread_id", "default"), question.id
+
+@timed("retrieve")
+async def retrieve(state: State, config: RunnableConfig):
+    """Embed the question, check the answer cache and pack document context.
+
+    Runs alongside `initialise_teacher`; `chat` only starts once both are done.
+    """
+    index_task = None
+    key = None
+    try:
+        last_message = state['messages'][-1] if state['messages'] else None
+        question = last_message.content if isinstance(last_message, HumanMessage) else ""
+        doc_id = state.get('doc_id')
+        cacheable = is_response_cacheable(state)
+        if not question or not (doc_id or cacheable):
+            return {}
+        key = turn_key(config, last_message)
+        thread_id = config.get("configurable", {}).get("thread_id", "default")
+
+        # The question is embedded alongside other users' questions while the index loads;
+        # the index comes back pinned so a burst of other uploads can't evict it mid-lookup
+        owner = f"{thread_id}:{uuid.uuid4().hex}"
+        index_task = asyncio.create_task(prepare_pdf_rag(doc_id, owner=owner)) if doc_id else None
+        query_vector = [float(x) for x in await embedding_service.aembed_query(question)]
+        # Runs alongside initialise_teacher, so the name in state isn't normalized yet;
+        # chat stores the answer under this same name
+        teacher = normalize_teacher(state['teacher'])
+        retrieval = {"query_vector": query_vector, "cacheable": cacheable, "teacher": teacher}
+
+        # Same persona, same notes, same question: answer without calling the LLM
+        if cacheable:
+            cached = response_cache.lookup(teacher, doc_id, query_vector)
+            if cached:
+                if index_task:
+                    # Let the index finish loading for follow-up questions
+                    index_task.add_done_callback(_log_index_failure)
+                await adispatch_custom_event("retrieval", {"doc_id": doc_id, "chunks": 0, "cached": True}, config=config)
+                turn_retrievals.put(key, {**retrieval, "cached": cached})
+                return {}
+
+        # If a document is attached to the thread, use retriever to get relevant chunks
+        packed = None
+        if doc_id:
+            vector_db = await index_task
+            relevant_docs = await query_executor.run(
+                vector_db.similarity_search_by_vector, query_vector, k=RETRIEVAL_CANDIDATES
+            )
+
+            # Context gets at most half of what the question and summary leave, so recent turns are never crowded out
+            summary = state.get('summary')
+            budget = CHAT_TOKEN_BUDGET - estimate_tokens(question) - (estimate_tokens(summary) if summary else 0)
+            packed = pack_context(relevant_docs, min(CONTEXT_TOKEN_BUDGET, budget // 2))
+            retrieval["packed"] = packed
+
+        # Lets streaming clients know retrieval finished before tokens arrive
+        await adispatch_custom_event("retrieval", {
+            "doc_id": doc_id,
+            "chunks": packed["chunks"] if packed else 0,
+            "passages": packed["passages"] if packed else 0,
+            "context_tokens": packed["tokens"] if packed else 0,
+            "cached": False,
+        }, config=config)
+        turn_retrievals.put(key, retrieval)
+        return {}
+
+    except Exception as e:
+        logger.error(f"Error in document retrieval: {e}")
+        if key:
+            turn_retrievals.put(key, {"error": str(e)})
+        return {}
+    finally:
+        if index_task:
+            # Released once the index is ready, also when this turn returned before using it
+            index_task.add_done_callback(lambda _: vector_stores.unpin(doc_id, owner))
+
+async def save_summary_fold(thread_id: str, fold: Dict[str, Any]):
+    """Write a finished history fold into the thread's checkpointed state"""
+    agent = get_agent()
+    config = {"configurable": {"thread_id": thread_id}}
+    # A run still in progress would write its next checkpoint over the update
+    deadline = asyncio.get_running_loop().time() + SUMMARY_SAVE_WAIT_SECONDS
+    while (await agent.aget_state(config)).next:
+        if asyncio.get_running_loop().time() > deadline:
+            logger.info(f"Dropped a history summary for busy thread {thread_id}")
+            return
+        await asyncio.sleep(0.5)
+    await agent.aupdate_state(config, {"pending_summary": fold}, as_node="chat")
+
+@timed("chat")
+async def chat(state: State, config: RunnableConfig):
     """Modified chat handler with RAG support"""
     try:
-        chain = state['chain']
-        
-        # Get the last message
-        last_message = state['messages'][-1].content if state['messages'] else ""
-        print(last_message) 
+        chain = get_teacher_chain(state['teacher'])
+        thread_id = config.get("configurable", {}).get("thread_id", "default")
+        # After the tools node the turn ends in the model's tool calls and their results,
+        # which go back to the model after the question they belong to
+        messages = state['messages']
+        question_index = max((i for i, m in enumerate(messages) if isinstance(m, HumanMessage)), default=len(messages))
+        tool_turn = messages[question_index + 1:] if messages and isinstance(messages[-1], ToolMessage) else []
+        last_message = messages[question_index].content if question_index < len(messages) else ""
+        logger.debug(f"Chat question: {last_message}")
         if not last_message:
             return {"messages": [AIMessage(content="I didn't receive any message. Please try again.")]}
+        # Retrieval results never enter graph state, so they never reach a checkpoint
+        key = turn_key(config, messages[question_index])
+        retrieval = turn_retrievals.pop(key) or {}
+        if retrieval.get("error"):
+            return {"messages": [AIMessage(content=f"Sorry, I encountered an error: {retrieval['error']}")]}
 
-        # If PDF provided, use retriever to get relevant chunks
-        if state.get('pdf_path'):
-            vector_db = await prepare_pdf_rag(state['pdf_path'], state['user_id'])
-            relevant_docs = vector_db.similarity_search(last_message, k=3)
+        # Apply a summary folded in the background since the previous turn
+        summary = state.get('summary')
+        removals = []
+        earlier = messages[:question_index]
+        pending = state.get('pending_summary')
+        folded = history_summarizer.take(thread_id, summary, pending)
+        if folded:
+            summary, folded_ids = folded
+            folded_ids = set(folded_ids)
+            removals = [RemoveMessage(id=m.id) for m in earlier if m.id in folded_ids]
+            earlier = [m for m in earlier if m.id not in folded_ids]
 
-            context = "\n\n".join([doc.page_content for doc in relevant_docs])
-            
+        # Turns older than the window are summarized off the request path
+        turns = split_turns(earlier)
+        recent = turns[-HISTORY_WINDOW_TURNS:] if HISTORY_WINDOW_TURNS > 0 else []
+        older = turns[:len(turns) - len(recent)]
+        if older:
+            history_summarizer.schedule(thread_id, summary, [m for turn in older for m in turn], save_summary_fold)
+        # Every return clears the stored fold, applied or stale
+        updates = {"summary": summary, "pending_summary": None} if pending else {"summary": summary}
+
+        cached = retrieval.get("cached")
+        if cached:
+            message = AIMessage(content=cached["answer"], response_metadata={"cache": cached["provenance"]})
+            return {"messages": [*removals, message], **updates}
+
+        # The question and tool results always fit; summary, retrieved context and recent turns share the rest
+        budget = CHAT_TOKEN_BUDGET - estimate_tokens(last_message) - (estimate_tokens(summary) if summary else 0)
+        budget -= sum(estimate_tokens(str(m.content)) for m in tool_turn)
+        packed = retrieval.get("packed")
+        if packed:
+            budget -= packed["tokens"]
             # Format input with context
-            input_text = f"Context from PDF:\n{context}\n\nQuestion: {last_message}"
+            input_text = f"Context from PDF:\n{packed['context']}\n\nQuestion: {last_message}"
         else:
             input_text = last_message
 
         # Invoke chain with simplified input
         try:
-            response = await chain.ainvoke({"input": input_text})
-            response = response.model_dump() if hasattr(response, 'model_dump') else None
-            print(response)
-            return {"messages": [AIMessage(content=response['content'])]}
+            response = await chain.ainvoke({
+                "input": input_text,
+                "history": fit_history(recent, budget),
+                "summary": f"\n\nSummary of the conversation so far:\n{summary}" if summary else "",
+                "tool_turn": tool_turn,
+            }, config=config)
+            logger.debug(f"Chat response: {response}")
+            if response.tool_calls:
+                # tools_condition routes to the tools node; retrieval is kept for the follow-up call
+                turn_retrievals.put(key, retrieval)
+                return {"messages": [*removals, response], **updates}
+
+            provenance = {"hit": False}
+            query_vector = retrieval.get("query_vector")
+            # Answers that needed a search are time-sensitive and never cached
+            if retrieval.get("cacheable") and not tool_turn and query_vector and isinstance(response.content, str) and response.content.strip():
+                entry_id = response_cache.store(retrieval["teacher"], state.get('doc_id'), query_vector, last_message, response.content)
+                provenance["entry_id"] = entry_id
+            response.response_metadata["cache"] = provenance
+            return {"messages": [*removals, response], **updates}
         except Exception as chain_error:
             logger.error(f"Chain invocation error: {chain_error}")
-            return {"messages": [AIMessage(content=f"I encountered an error processing your request: {str(chain_error)}")]}
+            return {"messages": [*removals, AIMessage(content=f"I encountered an error processing your request: {str(chain_error)}")], **updates}
 
     except Exception as e:
         logger.error(f"Error in chat with RAG: {e}")
         return {"messages": [AIMessage(content=f"Sorry, I encountered an error: {str(e)}")]}
 
     
-memory = MemorySaver()
-
-# Build the graph
-graph_builder = StateGraph(State)
-
-# Add nodes
-graph_builder.add_node("teacher", initialise_teacher)
-graph_builder.add_node("chat", chat)
-graph_builder.add_node("tools", tool_node)
-
-graph_builder.add_conditional_edges("chat", tools_condition)
-graph_builder.add_edge("teacher", "chat")
-graph_builder.add_edge("tools", "chat")
-
-# Set entry point
-graph_builder.set_entry_point("teacher")
-
-# Compile graph
-try:
-    agent = graph_builder.compile(checkpointer=memory)
-    logger.info("Graph compiled successfully")
-except Exception as e:
-    logger.error(f"Error compiling graph: {e}")
-    raise
\ No newline at end of file
+def create_checkpointer():
+    """Checkpoint saver selected by CHECKPOINT_BACKEND"""
+    if CHECKPOINT_BACKEND == "sqlite":
+        return SqliteCheckpointSaver(CHECKPOINT_DB_PATH, CHECKPOINT_TTL_SECONDS, CHECKPOINT_KEEP_PER_THREAD)
+    return InstrumentedMemorySaver()
+
+
+def build_agent():
+    """Compile the teacher chat graph"""
+    memory = create_checkpointer()
+
+    # Build the graph
+    graph_builder = StateGraph(State)
+
+    # Add nodes
+    graph_builder.add_node("teacher", initialise_teacher)
+    graph_builder.add_node("retrieve", retrieve)
+    graph_builder.add_node("chat", chat)
+    graph_builder.add_node("tools", tool_node)
+
+    # Teacher setup and retrieval are independent, so both start with the request and chat waits for both
+    graph_builder.add_edge(START, "teacher")
+    graph_builder.add_edge(START, "retrieve")
+    graph_builder.add_edge(["teacher", "retrieve"], "chat")
+    graph_builder.add_conditional_edges("chat", tools_condition)
+    graph_builder.add_edge("tools", "chat")
+
+    # Compile graph
+    try:
+        agent = graph_builder.compile(checkpointer=memory)
+        logger.info("Graph compiled successfully")
+        return agent
+    except Exception as e:
+        logger.error(f"Error compiling graph: {e}")
+        raise
+
+registry.register("agent", build_agent)
+
+def get_agent():
+    return registry.get("agent")
+
+def checkpoint_stats(thread_id: Optional[str] = None) -> Dict[str, Any]:
+    """Checkpoint size and write time, overall or for one thread"""
+    saver = get_agent().checkpointer
+    if thread_id is None:
+        return saver.stats.summary()
+    stats = saver.stats.thread(thread_id)
+    if stats is None:
+        return None
+    return {**stats, "resident_bytes": saver.thread_bytes(thread_id)}
+
+def compact_checkpoints() -> Optional[Dict[str, int]]:
+    """Run checkpoint expiry and vacuum; a no-op for the in-memory saver"""
+    saver = get_agent().checkpointer
+    if not isinstance(saver, SqliteCheckpointSaver):
+        return None
+    return saver.compact()
@@ -0,0 +1,97 @@
+from typing import Any, Dict, Optional
+from langgraph.checkpoint.memory import MemorySaver
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class CheckpointStats:
+    """Per-thread checkpoint write sizes and latencies"""
+
+    def __init__(self):
+        self._threads: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, thread_id: str, nbytes: int, seconds: float):
+        with self._lock:
+            entry = self._threads.setdefault(thread_id, {
+                "writes": 0, "last_bytes": 0, "max_bytes": 0, "total_bytes": 0,
+                "last_write_ms": 0.0, "total_write_ms": 0.0,
+            })
+            entry["writes"] += 1
+            entry["last_bytes"] = nbytes
+            entry["max_bytes"] = max(entry["max_bytes"], nbytes)
+            entry["total_bytes"] += nbytes
+            entry["last_write_ms"] = round(seconds * 1000, 3)
+            entry["total_write_ms"] += seconds * 1000
+
+    def forget(self, thread_id: str):
+        with self._lock:
+            self._threads.pop(thread_id, None)
+
+    def thread(self, thread_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._threads.get(thread_id)
+            if entry is None:
+                return None
+            return {
+                **entry,
+                "total_write_ms": round(entry["total_write_ms"], 3),
+                "avg_write_ms": round(entry["total_write_ms"] / entry["writes"], 3),
+            }
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = list(self._threads.values())
+        writes = sum(e["writes"] for e in entries)
+        return {
+            "threads": len(entries),
+            "writes": writes,
+            "avg_write_bytes": round(sum(e["total_bytes"] for e in entries) / writes) if writes else 0,
+            "max_write_bytes": max((e["max_bytes"] for e in entries), default=0),
+            "avg_write_ms": round(sum(e["total_write_ms"] for e in entries) / writes, 3) if writes else 0.0,
+        }
+
+
+class InstrumentedMemorySaver(MemorySaver):
+    """MemorySaver that records how many bytes each checkpoint write stores"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = CheckpointStats()
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        started = time.perf_counter()
+        result = super().put(config, checkpoint, metadata, new_versions)
+        elapsed = time.perf_counter() - started
+        thread_id = config["configurable"]["thread_id"]
+        self.stats.record(thread_id, self._written_bytes(config, checkpoint, new_versions), elapsed)
+        return result
+
+    def _written_bytes(self, config, checkpoint, new_versions) -> int:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        try:
+            size = 0
+            for channel, version in new_versions.items():
+                blob = self.blobs.get((thread_id, checkpoint_ns, channel, version))
+                if blob:
+                    size += len(blob[1])
+            saved = self.storage[thread_id][checkpoint_ns][checkpoint["id"]]
+            return size + len(saved[0][1]) + len(saved[1][1])
+        except Exception:
+            # Storage layout differs between langgraph releases; fall back to re-serializing
+            return len(self.serde.dumps_typed(checkpoint)[1])
+
+    def thread_bytes(self, thread_id: str) -> int:
+        """Bytes currently held in memory for one conversation"""
+        size = 0
+        for key, blob in list(self.blobs.items()):
+            if key[0] == thread_id:
+                size += len(blob[1])
+        for checkpoints in self.storage.get(thread_id, {}).values():
+            for saved in checkpoints.values():
+                size += len(saved[0][1]) + len(saved[1][1])
+        return size
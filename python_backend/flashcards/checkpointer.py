@@ -0,0 +1,379 @@
+from contextlib import contextmanager
+from typing import Any, AsyncIterator, Dict, Iterator, Optional, Sequence
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+import asyncio
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+import zlib
+import logging
+
+from .checkpoint_metrics import CheckpointStats
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS checkpoints (
+        thread_id TEXT NOT NULL,
+        checkpoint_ns TEXT NOT NULL DEFAULT '',
+        checkpoint_id TEXT NOT NULL,
+        parent_checkpoint_id TEXT,
+        type TEXT,
+        checkpoint BLOB,
+        metadata BLOB,
+        PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+    )""",
+    """CREATE TABLE IF NOT EXISTS writes (
+        thread_id TEXT NOT NULL,
+        checkpoint_ns TEXT NOT NULL DEFAULT '',
+        checkpoint_id TEXT NOT NULL,
+        task_id TEXT NOT NULL,
+        task_path TEXT NOT NULL DEFAULT '',
+        idx INTEGER NOT NULL,
+        channel TEXT NOT NULL,
+        type TEXT,
+        value BLOB,
+        PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+    )""",
+    # Channel values, one row per channel version, shared by the checkpoints that reference it
+    """CREATE TABLE IF NOT EXISTS blobs (
+        thread_id TEXT NOT NULL,
+        checkpoint_ns TEXT NOT NULL DEFAULT '',
+        channel TEXT NOT NULL,
+        version TEXT NOT NULL,
+        type TEXT,
+        value BLOB,
+        PRIMARY KEY (thread_id, checkpoint_ns, channel, version)
+    )""",
+    """CREATE TABLE IF NOT EXISTS threads (
+        thread_id TEXT PRIMARY KEY,
+        updated_at REAL NOT NULL
+    )""",
+    "CREATE INDEX IF NOT EXISTS threads_updated ON threads(updated_at)",
+]
+
+
+def _config(thread_id: str, checkpoint_ns: str, checkpoint_id: str) -> RunnableConfig:
+    return {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint_id}}
+
+
+class SqliteCheckpointSaver(BaseCheckpointSaver):
+    """Conversation checkpoints in a local SQLite file shared by all workers.
+
+    Payloads are zlib-compressed, and each checkpoint only writes the
+    channels listed in its `new_versions`; unchanged channel values are
+    shared with earlier checkpoints. The database runs in WAL mode with a
+    busy timeout and writes take an immediate lock, so several uvicorn
+    worker processes on one host can read and write the same database.
+    Threads idle for longer than `ttl_seconds` are deleted by `compact`,
+    which also drops all but the newest `keep_per_thread` checkpoints of
+    each thread and returns the freed pages to the filesystem.
+
+    Runs on one thread must not overlap: the newest checkpoint wins, so a
+    run that started from an older one silently replaces the other's turn.
+    `put` logs a warning when it sees that happen.
+    """
+
+    def __init__(self, path: str, ttl_seconds: int, keep_per_thread: int = 3, compress_level: int = 6):
+        super().__init__()
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.keep_per_thread = max(1, keep_per_thread)
+        self.compress_level = compress_level
+        self.stats = CheckpointStats()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    def _connection(self) -> sqlite3.Connection:
+        # A connection must not cross a fork; each worker process opens its own
+        if self._conn is None or self._pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            # The mode only takes effect on a new file; an existing one is converted by a single VACUUM
+            if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+                logger.info(f"Converting {self.path} to incremental auto-vacuum")
+                conn.execute("VACUUM")
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            for statement in _SCHEMA:
+                conn.execute(statement)
+            self._conn, self._pid = conn, os.getpid()
+        return self._conn
+
+    @contextmanager
+    def _cursor(self, write: bool = False) -> Iterator[sqlite3.Cursor]:
+        with self._lock:
+            conn = self._connection()
+            cur = conn.cursor()
+            if write:
+                cur.execute("BEGIN IMMEDIATE")
+            try:
+                yield cur
+                if write:
+                    cur.execute("COMMIT")
+            except Exception:
+                if write:
+                    cur.execute("ROLLBACK")
+                raise
+            finally:
+                cur.close()
+
+    def _dumps(self, value: Any):
+        type_, payload = self.serde.dumps_typed(value)
+        return type_, zlib.compress(payload, self.compress_level)
+
+    def _loads(self, type_: str, payload: bytes) -> Any:
+        return self.serde.loads_typed((type_, zlib.decompress(payload)))
+
+    def _pending_writes(self, cur: sqlite3.Cursor, thread_id: str, checkpoint_ns: str, checkpoint_id: str):
+        cur.execute(
+            "SELECT task_id, channel, type, value FROM writes "
+            "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ? ORDER BY task_id, idx",
+            (thread_id, checkpoint_ns, checkpoint_id),
+        )
+        return [(task_id, channel, self._loads(type_, value)) for task_id, channel, type_, value in cur.fetchall()]
+
+    def _channel_values(self, cur: sqlite3.Cursor, thread_id: str, checkpoint_ns: str,
+                        versions: ChannelVersions) -> Dict[str, Any]:
+        values = {}
+        for channel, version in versions.items():
+            row = cur.execute(
+                "SELECT type, value FROM blobs WHERE thread_id = ? AND checkpoint_ns = ? AND channel = ? AND version = ?",
+                (thread_id, checkpoint_ns, channel, str(version)),
+            ).fetchone()
+            if row and row[0] != "empty":
+                values[channel] = self._loads(*row)
+        return values
+
+    def _tuple(self, cur: sqlite3.Cursor, row) -> CheckpointTuple:
+        thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, type_, checkpoint, metadata = row
+        checkpoint = self._loads(type_, checkpoint)
+        # Checkpoints written before channel values moved to their own table still carry them inline
+        if "channel_values" not in checkpoint:
+            checkpoint["channel_values"] = self._channel_values(
+                cur, thread_id, checkpoint_ns, checkpoint["channel_versions"])
+        return CheckpointTuple(
+            _config(thread_id, checkpoint_ns, checkpoint_id),
+            checkpoint,
+            json.loads(metadata) if metadata is not None else {},
+            _config(thread_id, checkpoint_ns, parent_checkpoint_id) if parent_checkpoint_id else None,
+            self._pending_writes(cur, thread_id, checkpoint_ns, checkpoint_id),
+        )
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        thread_id = str(config["configurable"]["thread_id"])
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        columns = "thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata"
+        with self._cursor() as cur:
+            if checkpoint_id := get_checkpoint_id(config):
+                cur.execute(
+                    f"SELECT {columns} FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+                    (thread_id, checkpoint_ns, checkpoint_id),
+                )
+            else:
+                cur.execute(
+                    f"SELECT {columns} FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? "
+                    "ORDER BY checkpoint_id DESC LIMIT 1",
+                    (thread_id, checkpoint_ns),
+                )
+            row = cur.fetchone()
+            return self._tuple(cur, row) if row else None
+
+    def list(self, config: Optional[RunnableConfig], *, filter: Optional[Dict[str, Any]] = None,
+             before: Optional[RunnableConfig] = None, limit: Optional[int] = None) -> Iterator[CheckpointTuple]:
+        clauses, params = [], []
+        if config:
+            clauses.append("thread_id = ?")
+            params.append(str(config["configurable"]["thread_id"]))
+            if (checkpoint_ns := config["configurable"].get("checkpoint_ns")) is not None:
+                clauses.append("checkpoint_ns = ?")
+                params.append(checkpoint_ns)
+            if checkpoint_id := get_checkpoint_id(config):
+                clauses.append("checkpoint_id = ?")
+                params.append(checkpoint_id)
+        if before and (before_id := get_checkpoint_id(before)):
+            clauses.append("checkpoint_id < ?")
+            params.append(before_id)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        query = (
+            "SELECT thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata "
+            f"FROM checkpoints {where} ORDER BY checkpoint_id DESC"
+        )
+        with self._cursor() as cur:
+            rows = cur.execute(query, params).fetchall()
+            results = []
+            for row in rows:
+                # Metadata is small JSON, so filtering happens here rather than in SQL
+                if filter:
+                    metadata = json.loads(row[6]) if row[6] is not None else {}
+                    if any(metadata.get(k) != v for k, v in filter.items()):
+                        continue
+                results.append(self._tuple(cur, row))
+                if limit is not None and len(results) >= limit:
+                    break
+        yield from results
+
+    def put(self, config: RunnableConfig, checkpoint: Checkpoint, metadata: CheckpointMetadata,
+            new_versions: ChannelVersions) -> RunnableConfig:
+        started = time.perf_counter()
+        thread_id = str(config["configurable"]["thread_id"])
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        parent_id = config["configurable"].get("checkpoint_id")
+        checkpoint = checkpoint.copy()
+        values = checkpoint.pop("channel_values", {})
+        # Only channels that changed since the parent checkpoint get a new row
+        blobs = [
+            (thread_id, checkpoint_ns, channel, str(version),
+             *(self._dumps(values[channel]) if channel in values else ("empty", None)))
+            for channel, version in new_versions.items()
+        ]
+        type_, payload = self._dumps(checkpoint)
+        serialized_metadata = json.dumps(get_checkpoint_metadata(config, metadata), ensure_ascii=False).encode("utf-8", "ignore")
+        with self._cursor(write=True) as cur:
+            newest = cur.execute(
+                "SELECT MAX(checkpoint_id) FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ?",
+                (thread_id, checkpoint_ns),
+            ).fetchone()[0]
+            if parent_id and newest and newest != parent_id:
+                logger.warning(f"Thread {thread_id} got a checkpoint from a stale parent; another run is writing to it")
+            cur.executemany("INSERT OR REPLACE INTO blobs VALUES (?, ?, ?, ?, ?, ?)", blobs)
+            cur.execute(
+                "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (thread_id, checkpoint_ns, checkpoint["id"], parent_id, type_, payload, serialized_metadata),
+            )
+            cur.execute("INSERT OR REPLACE INTO threads VALUES (?, ?)", (thread_id, time.time()))
+        written = len(payload) + len(serialized_metadata) + sum(len(blob[5] or b"") for blob in blobs)
+        self.stats.record(thread_id, written, time.perf_counter() - started)
+        return _config(thread_id, checkpoint_ns, checkpoint["id"])
+
+    def put_writes(self, config: RunnableConfig, writes: Sequence[tuple], task_id: str, task_path: str = "") -> None:
+        verb = "INSERT OR REPLACE" if all(w[0] in WRITES_IDX_MAP for w in writes) else "INSERT OR IGNORE"
+        thread_id = str(config["configurable"]["thread_id"])
+        checkpoint_ns = str(config["configurable"].get("checkpoint_ns", ""))
+        checkpoint_id = str(config["configurable"]["checkpoint_id"])
+        rows = [
+            (thread_id, checkpoint_ns, checkpoint_id, task_id, task_path,
+             WRITES_IDX_MAP.get(channel, idx), channel, *self._dumps(value))
+            for idx, (channel, value) in enumerate(writes)
+        ]
+        with self._cursor(write=True) as cur:
+            cur.executemany(f"{verb} INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._cursor(write=True) as cur:
+            for table in ("checkpoints", "writes", "blobs", "threads"):
+                cur.execute(f"DELETE FROM {table} WHERE thread_id = ?", (str(thread_id),))
+        self.stats.forget(str(thread_id))
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(self, config: Optional[RunnableConfig], *, filter: Optional[Dict[str, Any]] = None,
+                    before: Optional[RunnableConfig] = None, limit: Optional[int] = None) -> AsyncIterator[CheckpointTuple]:
+        results = await asyncio.to_thread(lambda: list(self.list(config, filter=filter, before=before, limit=limit)))
+        for item in results:
+            yield item
+
+    async def aput(self, config: RunnableConfig, checkpoint: Checkpoint, metadata: CheckpointMetadata,
+                   new_versions: ChannelVersions) -> RunnableConfig:
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config: RunnableConfig, writes: Sequence[tuple], task_id: str, task_path: str = "") -> None:
+        await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await asyncio.to_thread(self.delete_thread, thread_id)
+
+    def get_next_version(self, current: Optional[str], channel: None = None) -> str:
+        # String versions with a random suffix stay unique across worker processes
+        if current is None:
+            current_v = 0
+        elif isinstance(current, int):
+            current_v = current
+        else:
+            current_v = int(current.split(".")[0])
+        return f"{current_v + 1:032}.{random.random():016}"
+
+    def thread_bytes(self, thread_id: str) -> int:
+        """Compressed bytes stored for one conversation"""
+        with self._cursor() as cur:
+            checkpoints = cur.execute(
+                "SELECT COALESCE(SUM(LENGTH(checkpoint) + LENGTH(metadata)), 0) FROM checkpoints WHERE thread_id = ?",
+                (thread_id,),
+            ).fetchone()[0]
+            writes = cur.execute(
+                "SELECT COALESCE(SUM(LENGTH(value)), 0) FROM writes WHERE thread_id = ?", (thread_id,)
+            ).fetchone()[0]
+            blobs = cur.execute(
+                "SELECT COALESCE(SUM(LENGTH(value)), 0) FROM blobs WHERE thread_id = ?", (thread_id,)
+            ).fetchone()[0]
+        return checkpoints + writes + blobs
+
+    def _drop_unreferenced_blobs(self, cur: sqlite3.Cursor, thread_id: str, checkpoint_ns: str):
+        referenced = set()
+        for type_, checkpoint in cur.execute(
+            "SELECT type, checkpoint FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ?", (thread_id, checkpoint_ns)
+        ).fetchall():
+            versions = self._loads(type_, checkpoint).get("channel_versions", {})
+            referenced.update((channel, str(version)) for channel, version in versions.items())
+        stale = [
+            (thread_id, checkpoint_ns, channel, version)
+            for channel, version in cur.execute(
+                "SELECT channel, version FROM blobs WHERE thread_id = ? AND checkpoint_ns = ?", (thread_id, checkpoint_ns)
+            ).fetchall()
+            if (channel, version) not in referenced
+        ]
+        cur.executemany(
+            "DELETE FROM blobs WHERE thread_id = ? AND checkpoint_ns = ? AND channel = ? AND version = ?", stale)
+
+    def compact(self) -> Dict[str, int]:
+        """Expire idle threads, keep the newest checkpoints per thread and reclaim space"""
+        cutoff = time.time() - self.ttl_seconds
+        with self._cursor(write=True) as cur:
+            expired = [row[0] for row in cur.execute("SELECT thread_id FROM threads WHERE updated_at < ?", (cutoff,))]
+            for thread_id in expired:
+                for table in ("checkpoints", "writes", "blobs", "threads"):
+                    cur.execute(f"DELETE FROM {table} WHERE thread_id = ?", (thread_id,))
+
+            # Checkpoint ids sort by time, so anything past the newest N is history nobody reads
+            ranked = """SELECT rowid, thread_id, checkpoint_ns FROM (
+                SELECT rowid, thread_id, checkpoint_ns, ROW_NUMBER() OVER (
+                    PARTITION BY thread_id, checkpoint_ns ORDER BY checkpoint_id DESC
+                ) AS position FROM checkpoints
+            ) WHERE position > ?"""
+            pruned_threads = cur.execute(
+                f"SELECT DISTINCT thread_id, checkpoint_ns FROM ({ranked})", (self.keep_per_thread,)
+            ).fetchall()
+            cur.execute(f"DELETE FROM checkpoints WHERE rowid IN (SELECT rowid FROM ({ranked}))", (self.keep_per_thread,))
+            pruned = cur.rowcount
+            for thread_id, checkpoint_ns in pruned_threads:
+                self._drop_unreferenced_blobs(cur, thread_id, checkpoint_ns)
+            cur.execute(
+                """DELETE FROM writes WHERE NOT EXISTS (
+                    SELECT 1 FROM checkpoints c WHERE c.thread_id = writes.thread_id
+                    AND c.checkpoint_ns = writes.checkpoint_ns AND c.checkpoint_id = writes.checkpoint_id
+                )"""
+            )
+        with self._cursor() as cur:
+            cur.execute("PRAGMA incremental_vacuum")
+            cur.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        for thread_id in expired:
+            self.stats.forget(thread_id)
+        if expired or pruned:
+            logger.info(f"Checkpoint compaction: expired {len(expired)} threads, pruned {pruned} checkpoints")
+        return {"expired_threads": len(expired), "pruned_checkpoints": pruned}
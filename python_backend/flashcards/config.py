@@ -0,0 +1,116 @@
+import os
+from dotenv import load_dotenv
+
+# Load environment variables FIRST
+load_dotenv()
+
+# Root directory for everything the API persists on local disk
+DATA_DIR = os.getenv("TEACHER_DATA_DIR", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".data"))
+
+# Uploaded documents, addressed by doc_id
+DOCUMENT_STORE_DIR = os.getenv("DOCUMENT_STORE_DIR", os.path.join(DATA_DIR, "documents"))
+# Disk budget for uploads: least recently used documents go first, idle ones expire
+DOCUMENT_STORE_MAX_BYTES = int(os.getenv("DOCUMENT_STORE_MAX_MB", "2048")) * 1024 * 1024
+DOCUMENT_STORE_TTL_SECONDS = int(os.getenv("DOCUMENT_STORE_TTL_SECONDS", str(7 * 24 * 3600)))
+
+ALLOWED_EXTENSIONS = ['.pdf', '.docx', '.pptx']
+
+# Content-addressed cache of extracted text and chunk lists
+EXTRACTION_CACHE_DIR = os.getenv("EXTRACTION_CACHE_DIR", os.path.join(DATA_DIR, "extraction_cache"))
+EXTRACTION_CACHE_MAX_BYTES = int(os.getenv("EXTRACTION_CACHE_MAX_MB", "512")) * 1024 * 1024
+
+# Executors for blocking work kept off the event loop
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", str(min(4, os.cpu_count() or 1))))
+EMBED_WORKERS = int(os.getenv("EMBED_WORKERS", "2"))
+QUERY_WORKERS = int(os.getenv("QUERY_WORKERS", "4"))
+
+# Background warm-up: components that fail to load are retried, backing off up to the maximum
+WARMUP_RETRY_SECONDS = float(os.getenv("WARMUP_RETRY_SECONDS", "5"))
+WARMUP_MAX_RETRY_SECONDS = float(os.getenv("WARMUP_MAX_RETRY_SECONDS", "300"))
+
+# In-memory vector indexes: resident byte budget and idle expiry
+VECTOR_STORE_MAX_BYTES = int(os.getenv("VECTOR_STORE_MAX_MB", "1024")) * 1024 * 1024
+VECTOR_STORE_TTL_SECONDS = int(os.getenv("VECTOR_STORE_TTL_SECONDS", "1800"))
+
+# Sentence-transformer used for document and query embeddings
+EMBEDDING_MODEL_NAME = os.getenv("EMBEDDING_MODEL_NAME", "sentence-transformers/all-MiniLM-L6-v2")
+
+# "huggingface" (PyTorch) or "onnx" (int8-quantized ONNX Runtime export of the same model)
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "huggingface").lower()
+ONNX_MODEL_DIR = os.getenv("ONNX_MODEL_DIR", os.path.join(DATA_DIR, "onnx", EMBEDDING_MODEL_NAME.split("/")[-1] + "-int8"))
+
+# Quantized vectors differ slightly, so caches and persisted indexes are keyed per backend
+EMBEDDING_MODEL_KEY = EMBEDDING_MODEL_NAME if EMBEDDING_BACKEND == "huggingface" else f"{EMBEDDING_MODEL_NAME}@onnx-int8"
+
+# Persisted embeddings, keyed by document hash and embedding model
+INDEX_STORE_DIR = os.getenv("INDEX_STORE_DIR", os.path.join(DATA_DIR, "indexes"))
+
+# Per-document retriever backend: "chroma" or "numpy"
+RETRIEVER_BACKEND = os.getenv("RETRIEVER_BACKEND", "chroma").lower()
+
+# Chunk-level embedding cache, keyed by hash(model, chunk text)
+EMBEDDING_CACHE_DIR = os.getenv("EMBEDDING_CACHE_DIR", os.path.join(DATA_DIR, "embedding_cache"))
+EMBEDDING_CACHE_MAX_BYTES = int(os.getenv("EMBEDDING_CACHE_MAX_MB", "1024")) * 1024 * 1024
+
+# Cross-request micro-batching for the embedding model
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "32"))
+EMBED_MAX_WAIT_MS = float(os.getenv("EMBED_MAX_WAIT_MS", "5"))
+
+# Conversation checkpoints: "memory" (per process) or "sqlite" (durable, shared by workers on one host)
+CHECKPOINT_BACKEND = os.getenv("CHECKPOINT_BACKEND", "memory").lower()
+CHECKPOINT_DB_PATH = os.getenv("CHECKPOINT_DB_PATH", os.path.join(DATA_DIR, "checkpoints.sqlite"))
+CHECKPOINT_TTL_SECONDS = int(os.getenv("CHECKPOINT_TTL_SECONDS", str(7 * 24 * 3600)))
+CHECKPOINT_KEEP_PER_THREAD = int(os.getenv("CHECKPOINT_KEEP_PER_THREAD", "3"))
+CHECKPOINT_COMPACT_INTERVAL_SECONDS = int(os.getenv("CHECKPOINT_COMPACT_INTERVAL_SECONDS", "900"))
+
+# Teacher chat history: recent turns kept verbatim, older ones folded into a rolling summary
+HISTORY_WINDOW_TURNS = int(os.getenv("HISTORY_WINDOW_TURNS", "6"))
+# How long a finished summary waits for a busy thread before it is dropped and redone later
+SUMMARY_SAVE_WAIT_SECONDS = float(os.getenv("SUMMARY_SAVE_WAIT_SECONDS", "60"))
+# Per-request token budget for summary + history + retrieved context + question
+CHAT_TOKEN_BUDGET = int(os.getenv("CHAT_TOKEN_BUDGET", "6000"))
+
+# Semantic cache of tutor answers, keyed by teacher, document hash and question embedding
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() == "true"
+RESPONSE_CACHE_THRESHOLD = float(os.getenv("RESPONSE_CACHE_THRESHOLD", "0.95"))
+RESPONSE_CACHE_TTL_SECONDS = int(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "86400"))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "10000"))
+# Chats without a document share one partition across all users, so they are only cached when allowed
+RESPONSE_CACHE_WITHOUT_DOCUMENT = os.getenv("RESPONSE_CACHE_WITHOUT_DOCUMENT", "false").lower() == "true"
+
+# Web search tool: "serpapi" or "package.module:attribute" naming an async callable
+SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "serpapi")
+SEARCH_CACHE_DIR = os.getenv("SEARCH_CACHE_DIR", os.path.join(DATA_DIR, "search_cache"))
+SEARCH_CACHE_MAX_BYTES = int(os.getenv("SEARCH_CACHE_MAX_MB", "64")) * 1024 * 1024
+SEARCH_CACHE_TTL_SECONDS = int(os.getenv("SEARCH_CACHE_TTL_SECONDS", str(24 * 3600)))
+SEARCH_TIMEOUT_SECONDS = float(os.getenv("SEARCH_TIMEOUT_SECONDS", "8"))
+SEARCH_MAX_CONCURRENCY = int(os.getenv("SEARCH_MAX_CONCURRENCY", "4"))
+
+# Retrieval: candidates fetched per question, then packed into a token budget
+RETRIEVAL_CANDIDATES = int(os.getenv("RETRIEVAL_CANDIDATES", "8"))
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "1500"))
+# Retrieval results wait in memory for the chat node; uncollected ones expire after this long
+RETRIEVAL_TTL_SECONDS = int(os.getenv("RETRIEVAL_TTL_SECONDS", "300"))
+
+# Background flashcard jobs: concurrent graph runs, queue capacity and result retention
+FLASHCARD_JOB_WORKERS = int(os.getenv("FLASHCARD_JOB_WORKERS", "2"))
+FLASHCARD_JOB_MAX_QUEUE = int(os.getenv("FLASHCARD_JOB_MAX_QUEUE", "100"))
+FLASHCARD_JOB_TTL_SECONDS = int(os.getenv("FLASHCARD_JOB_TTL_SECONDS", "3600"))
+# Job records and queue, shared by all worker processes; how often idle workers and subscribers re-check it
+FLASHCARD_JOB_DB_PATH = os.getenv("FLASHCARD_JOB_DB_PATH", os.path.join(DATA_DIR, "flashcard_jobs.sqlite"))
+FLASHCARD_JOB_POLL_SECONDS = float(os.getenv("FLASHCARD_JOB_POLL_SECONDS", "0.5"))
+# Uploads for flashcard jobs, shared by all worker processes and removed once their job is over
+FLASHCARD_JOB_UPLOAD_DIR = os.getenv("FLASHCARD_JOB_UPLOAD_DIR", os.path.join(DATA_DIR, "flashcard_job_uploads"))
+
+# Flashcard graph map-reduce mode: documents above the threshold are digested section by section first
+DIGEST_THRESHOLD_TOKENS = int(os.getenv("DIGEST_THRESHOLD_TOKENS", "30000"))
+DIGEST_SECTION_TOKENS = int(os.getenv("DIGEST_SECTION_TOKENS", "8000"))
+DIGEST_CONCURRENCY = int(os.getenv("DIGEST_CONCURRENCY", "4"))
+
+# Flashcard graph: content up to this size gets one combined study-pack call instead of four
+COMBINED_MAX_TOKENS = int(os.getenv("COMBINED_MAX_TOKENS", "4000"))
+
+# Persistent per-node cache of flashcard graph results
+FLASHCARD_CACHE_ENABLED = os.getenv("FLASHCARD_CACHE_ENABLED", "true").lower() == "true"
+FLASHCARD_CACHE_DIR = os.getenv("FLASHCARD_CACHE_DIR", os.path.join(DATA_DIR, "flashcard_cache"))
+FLASHCARD_CACHE_MAX_BYTES = int(os.getenv("FLASHCARD_CACHE_MAX_MB", "256")) * 1024 * 1024
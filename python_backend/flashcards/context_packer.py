@@ -0,0 +1,73 @@
+from typing import Dict, List, Sequence, Tuple
+from langchain_core.documents import Document
+
+from .extraction import CHUNK_OVERLAP
+from .history import estimate_tokens
+
+
+def overlap_length(left: str, right: str, max_overlap: int = CHUNK_OVERLAP) -> int:
+    """Length of the longest suffix of `left` that starts `right`"""
+    for size in range(min(len(left), len(right), max_overlap), 0, -1):
+        if left.endswith(right[:size]):
+            return size
+    return 0
+
+
+def merge_run(texts: Sequence[str]) -> str:
+    """Join consecutive chunks, keeping their shared overlap once"""
+    merged = texts[0]
+    for text in texts[1:]:
+        size = overlap_length(merged, text)
+        merged = merged + text[size:] if size else f"{merged}\n{text}"
+    return merged
+
+
+def _passages(selected: List[Tuple[int, Document]]) -> List[str]:
+    """Group selected chunks into passages of neighbouring chunks, best-ranked passage first"""
+    runs: List[Tuple[int, List[Tuple[int, str]]]] = []
+    indexed = sorted(
+        (d.metadata["chunk"], rank, d.page_content) for rank, d in selected if "chunk" in d.metadata
+    )
+    for position, rank, text in indexed:
+        if runs and runs[-1][1][-1][0] + 1 == position:
+            best, members = runs[-1]
+            runs[-1] = (min(best, rank), members + [(position, text)])
+        else:
+            runs.append((rank, [(position, text)]))
+
+    passages = [(rank, merge_run([text for _, text in members])) for rank, members in runs]
+    # Chunks from stores built without positions can't be merged, only de-duplicated
+    passages += [(rank, d.page_content) for rank, d in selected if "chunk" not in d.metadata]
+    return [text for _, text in sorted(passages)]
+
+
+def pack_context(documents: Sequence[Document], token_budget: int) -> Dict[str, object]:
+    """Fill `token_budget` with retrieved chunks in relevance order.
+
+    Exact duplicates are dropped and chunks that are neighbours in the
+    source document are merged, so the splitter overlap between them is
+    only paid for once. A chunk that no longer fits is skipped in favour
+    of smaller, less relevant ones.
+    """
+    selected: List[Tuple[int, Document]] = []
+    seen = set()
+    used = 0
+    for rank, document in enumerate(documents):
+        text = document.page_content
+        if not text or text in seen:
+            continue
+        seen.add(text)
+        candidate = selected + [(rank, document)]
+        cost = sum(estimate_tokens(p) for p in _passages(candidate))
+        if cost > token_budget:
+            continue
+        selected, used = candidate, cost
+
+    passages = _passages(selected)
+    return {
+        "context": "\n\n".join(passages),
+        "tokens": used,
+        "chunks": len(selected),
+        "passages": len(passages),
+        "candidates": len(documents),
+    }
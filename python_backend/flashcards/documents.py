@@ -0,0 +1,174 @@
+from typing import Callable, Optional, Dict, Any, List
+from datetime import datetime
+import hashlib
+import json
+import os
+import re
+import tempfile
+import time
+import logging
+
+from .config import DOCUMENT_STORE_DIR, DOCUMENT_STORE_MAX_BYTES, DOCUMENT_STORE_TTL_SECONDS
+
+logger = logging.getLogger(__name__)
+
+_DOC_ID_RE = re.compile(r"^[0-9a-f]{64}$")
+
+
+def content_hash(content: bytes) -> str:
+    """SHA-256 hex digest of raw upload bytes"""
+    return hashlib.sha256(content).hexdigest()
+
+
+class DocumentStore:
+    """Uploaded documents kept on disk and addressed by the hash of their bytes.
+
+    The doc_id is the SHA-256 of the upload, so the same file uploaded twice
+    maps to the same document and everything derived from it (text, chunks,
+    vector index) can be shared.
+
+    Uploads are kept within `max_bytes`: least recently used documents are
+    removed first, and any document unused for `ttl_seconds` goes regardless.
+    `on_evict(doc_id)` runs after each removal so derived data can go too.
+    """
+
+    def __init__(self, root: str = DOCUMENT_STORE_DIR, max_bytes: int = DOCUMENT_STORE_MAX_BYTES,
+                 ttl_seconds: int = DOCUMENT_STORE_TTL_SECONDS, on_evict: Optional[Callable[[str], None]] = None):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.on_evict = on_evict
+        os.makedirs(self.root, exist_ok=True)
+
+    def _meta_path(self, doc_id: str) -> str:
+        return os.path.join(self.root, f"{doc_id}.json")
+
+    def _write_atomic(self, path: str, data: bytes):
+        # Unique temp name per writer, so workers saving the same upload never share a file
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
+
+    def save(self, content: bytes, filename: str) -> Dict[str, Any]:
+        """Store an upload and return its document record"""
+        doc_id = content_hash(content)
+        extension = os.path.splitext(filename.lower())[1]
+        existing = self.get(doc_id)
+        if existing:
+            return existing
+
+        file_path = os.path.join(self.root, f"{doc_id}{extension}")
+        self._write_atomic(file_path, content)
+
+        record = {
+            "doc_id": doc_id,
+            "filename": filename,
+            "extension": extension,
+            "size": len(content),
+            "created_at": datetime.now().isoformat(),
+        }
+        # The record goes last, so a readable record always has its file
+        self._write_atomic(self._meta_path(doc_id), json.dumps(record).encode("utf-8"))
+
+        logger.info(f"Stored document {doc_id} ({filename}, {len(content)} bytes)")
+        self._shrink(keep=doc_id)
+        return record
+
+    def get(self, doc_id: str) -> Optional[Dict[str, Any]]:
+        """Return the document record, or None if unknown"""
+        if not doc_id or not _DOC_ID_RE.match(doc_id):
+            return None
+        try:
+            with open(self._meta_path(doc_id), "r") as f:
+                record = json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.error(f"Failed to read document record {doc_id}: {e}")
+            return None
+        # The record's mtime is the document's last use, which eviction goes by
+        try:
+            os.utime(self._meta_path(doc_id))
+        except OSError:
+            pass
+        return record
+
+    def path(self, doc_id: str) -> Optional[str]:
+        """Return the on-disk path of a stored document"""
+        record = self.get(doc_id)
+        if not record:
+            return None
+        file_path = os.path.join(self.root, f"{doc_id}{record['extension']}")
+        return file_path if os.path.exists(file_path) else None
+
+    def delete(self, doc_id: str) -> bool:
+        """Remove a document and its record"""
+        file_path = self.path(doc_id)
+        if not file_path:
+            return False
+        for p in (file_path, self._meta_path(doc_id)):
+            try:
+                os.unlink(p)
+            except FileNotFoundError:
+                pass
+        return True
+
+    def _usage(self) -> Dict[str, List[float]]:
+        """[bytes on disk, last use] of every document that has a record"""
+        usage: Dict[str, List[float]] = {}
+        stale = time.time() - 3600
+        for entry in os.scandir(self.root):
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            if entry.name.endswith(".tmp"):
+                # Left behind by a writer that crashed mid-save
+                if stat.st_mtime < stale:
+                    try:
+                        os.unlink(entry.path)
+                    except FileNotFoundError:
+                        pass
+                continue
+            doc_id = entry.name[:64]
+            if not _DOC_ID_RE.match(doc_id):
+                continue
+            item = usage.setdefault(doc_id, [0, 0.0])
+            item[0] += stat.st_size
+            if entry.name == f"{doc_id}.json":
+                item[1] = stat.st_mtime
+        # Without a record the upload is still being written by another worker
+        return {doc_id: item for doc_id, item in usage.items() if item[1]}
+
+    def _shrink(self, keep: Optional[str] = None):
+        """Remove expired documents, then least recently used ones until within budget"""
+        try:
+            usage = self._usage()
+        except Exception as e:
+            logger.error(f"Failed to scan document store: {e}")
+            return
+        total = sum(size for size, _ in usage.values())
+        deadline = time.time() - self.ttl_seconds
+        for doc_id, (size, last_used) in sorted(usage.items(), key=lambda item: item[1][1]):
+            if last_used >= deadline and total <= self.max_bytes:
+                break
+            if doc_id == keep or not self.delete(doc_id):
+                continue
+            total -= size
+            logger.info(f"Evicted document {doc_id} ({int(size)} bytes)")
+            if self.on_evict:
+                try:
+                    self.on_evict(doc_id)
+                except Exception as e:
+                    logger.error(f"Error releasing evicted document {doc_id}: {e}")
+
+
+document_store = DocumentStore()
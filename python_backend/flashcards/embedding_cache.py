@@ -0,0 +1,88 @@
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from langchain_core.embeddings import Embeddings
+import numpy as np
+import asyncio
+import hashlib
+import os
+import logging
+
+from .config import EMBEDDING_CACHE_DIR, EMBEDDING_CACHE_MAX_BYTES
+from .disk_cache import DiskCache
+
+logger = logging.getLogger(__name__)
+
+
+def embedding_key(model_name: str, text: str) -> str:
+    return hashlib.sha256(f"{model_name}\0{text}".encode("utf-8")).hexdigest()
+
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings wrapper that only sends unseen chunks to the model.
+
+    Vectors are stored as float32 bytes in a shared SQLite cache keyed by
+    hash(model name, chunk text), so a re-uploaded document with a few
+    edited slides only pays for the chunks that actually changed.
+    """
+
+    def __init__(self, base: Embeddings, model_name: str, cache: Optional[DiskCache] = None):
+        self.base = base
+        self.model_name = model_name
+        self.cache = cache or DiskCache(os.path.join(EMBEDDING_CACHE_DIR, "embeddings.sqlite"), EMBEDDING_CACHE_MAX_BYTES)
+
+    def _lookup(self, texts: List[str]) -> Tuple[List[str], Dict[str, bytes], Dict[str, str]]:
+        keys = [embedding_key(self.model_name, t) for t in texts]
+        cached = self.cache.get_many(keys)
+
+        # Duplicate chunks inside one document are embedded once
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in cached and key not in missing:
+                missing[key] = text
+        return keys, cached, missing
+
+    def _assemble(self, keys: List[str], cached: Dict[str, bytes],
+                  computed: Dict[str, np.ndarray]) -> Tuple[List[List[float]], Dict[str, float]]:
+        result = []
+        for key in keys:
+            if key in computed:
+                result.append(computed[key].tolist())
+            else:
+                result.append(np.frombuffer(cached[key], dtype=np.float32).tolist())
+
+        hits = len(keys) - sum(1 for k in keys if k in computed)
+        stats = {
+            "chunks": len(keys),
+            "hits": hits,
+            "embedded": len(computed),
+            "hit_ratio": round(hits / len(keys), 4) if keys else 0.0,
+        }
+        return result, stats
+
+    def _store(self, missing: Dict[str, str], vectors: List[List[float]]) -> Dict[str, np.ndarray]:
+        computed = {key: np.asarray(v, dtype=np.float32) for key, v in zip(missing, vectors)}
+        self.cache.set_many((key, v.tobytes()) for key, v in computed.items())
+        return computed
+
+    def embed_documents_with_stats(self, texts: List[str]) -> Tuple[List[List[float]], Dict[str, float]]:
+        """Embed texts and report how many came from the cache"""
+        keys, cached, missing = self._lookup(texts)
+        computed = self._store(missing, self.base.embed_documents(list(missing.values()))) if missing else {}
+        return self._assemble(keys, cached, computed)
+
+    async def aembed_documents_with_stats(self, texts: List[str],
+                                          embed: Optional[Callable[[List[str]], Awaitable[List[List[float]]]]] = None
+                                          ) -> Tuple[List[List[float]], Dict[str, float]]:
+        """Async variant; `embed` lets misses go through a batching service instead of the model"""
+        embed = embed or self.base.aembed_documents
+        keys, cached, missing = await asyncio.to_thread(self._lookup, texts)
+        computed = {}
+        if missing:
+            vectors = await embed(list(missing.values()))
+            computed = await asyncio.to_thread(self._store, missing, vectors)
+        return self._assemble(keys, cached, computed)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embed_documents_with_stats(texts)[0]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.base.embed_query(text)
@@ -0,0 +1,145 @@
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+from langchain_core.embeddings import Embeddings
+import asyncio
+import logging
+
+from .config import EMBED_BATCH_SIZE, EMBED_MAX_WAIT_MS
+from .executors import ManagedExecutor, embed_executor
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingService:
+    """Coalesces embedding requests from concurrent coroutines into micro-batches.
+
+    Callers await `aembed_query` / `aembed_documents`; a single worker task
+    drains the pending texts into batches of up to `max_batch_size`,
+    waiting at most `max_wait_ms` for more callers to join, and runs each
+    batch as one forward pass on the executor. Up to one batch per executor
+    worker is in flight at once; while all are busy, pending texts keep
+    accumulating into the next batch. Queries are taken before document
+    chunks so a large upload never delays a student's question by more
+    than one batch.
+    """
+
+    def __init__(self, model: Embeddings, executor: ManagedExecutor = embed_executor,
+                 max_batch_size: int = EMBED_BATCH_SIZE, max_wait_ms: float = EMBED_MAX_WAIT_MS):
+        self.model = model
+        self.executor = executor
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self._queries: Deque[Tuple[str, asyncio.Future]] = deque()
+        self._documents: Deque[Tuple[str, asyncio.Future]] = deque()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._in_flight: Set[asyncio.Task] = set()
+        self.batches = 0
+        self.items = 0
+        self.query_items = 0
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return (await self._enqueue([text], self._queries))[0]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        return await self._enqueue(list(texts), self._documents)
+
+    async def _enqueue(self, texts: List[str], queue: Deque) -> List[List[float]]:
+        self._ensure_worker()
+        loop = asyncio.get_running_loop()
+        futures = [loop.create_future() for _ in texts]
+        queue.extend(zip(texts, futures))
+        self._wakeup.set()
+        return list(await asyncio.gather(*futures))
+
+    def _ensure_worker(self):
+        if self._worker is None or self._worker.done():
+            self._wakeup = asyncio.Event()
+            self._slots = asyncio.Semaphore(self.executor.max_workers)
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    def _pending(self) -> int:
+        return len(self._queries) + len(self._documents)
+
+    def _take(self) -> Tuple[List[Tuple[str, asyncio.Future]], int]:
+        batch = []
+        queries = 0
+        for queue in (self._queries, self._documents):
+            while queue and len(batch) < self.max_batch_size:
+                text, future = queue.popleft()
+                # Callers that gave up don't need their text embedded
+                if future.cancelled():
+                    continue
+                batch.append((text, future))
+                if queue is self._queries:
+                    queries += 1
+        return batch, queries
+
+    async def _run(self):
+        while True:
+            if not self._pending():
+                self._wakeup.clear()
+                await self._wakeup.wait()
+
+            # A batch is only formed once the executor can take it
+            await self._slots.acquire()
+
+            # Give concurrent callers a moment to join a partially filled batch
+            if self.max_wait and self._pending() < self.max_batch_size:
+                await asyncio.sleep(self.max_wait)
+
+            batch, queries = self._take()
+            if not batch:
+                self._slots.release()
+                continue
+
+            task = asyncio.get_running_loop().create_task(self._embed(batch, queries))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+
+    async def _embed(self, batch: List[Tuple[str, asyncio.Future]], queries: int):
+        try:
+            vectors = await self.executor.run(self.model.embed_documents, [text for text, _ in batch])
+        except Exception as e:
+            logger.error(f"Embedding batch of {len(batch)} failed: {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            self._slots.release()
+
+        for (_, future), vector in zip(batch, vectors):
+            if not future.done():
+                future.set_result(vector)
+        self.batches += 1
+        self.items += len(batch)
+        self.query_items += queries
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "pending_queries": len(self._queries),
+            "pending_documents": len(self._documents),
+            "in_flight_batches": len(self._in_flight),
+            "batches": self.batches,
+            "items": self.items,
+            "query_items": self.query_items,
+            "avg_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+        }
+
+    async def close(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        for task in list(self._in_flight):
+            task.cancel()
+        await asyncio.gather(*self._in_flight, return_exceptions=True)
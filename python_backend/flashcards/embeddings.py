@@ -0,0 +1,47 @@
+from typing import List
+from langchain_core.embeddings import Embeddings
+import logging
+
+from .config import EMBEDDING_BACKEND, EMBEDDING_MODEL_NAME, ONNX_MODEL_DIR
+from .registry import registry
+
+logger = logging.getLogger(__name__)
+
+
+def create_embeddings(backend: str = EMBEDDING_BACKEND) -> Embeddings:
+    """Build the configured embedding backend"""
+    if backend == "onnx":
+        from .onnx_embeddings import OnnxEmbeddings
+        logger.info(f"Using int8 ONNX embeddings from {ONNX_MODEL_DIR}")
+        return OnnxEmbeddings(ONNX_MODEL_DIR)
+    if backend != "huggingface":
+        raise ValueError(f"Unknown EMBEDDING_BACKEND: {backend}")
+
+    from langchain_huggingface import HuggingFaceEmbeddings
+    return HuggingFaceEmbeddings(
+        model_name=EMBEDDING_MODEL_NAME,
+        model_kwargs={'device': 'cpu'},
+        encode_kwargs={'normalize_embeddings': True}
+    )
+
+
+class LazyEmbeddings(Embeddings):
+    """Proxy for the registry's embedding model, loaded on the first call.
+
+    Calls usually arrive on executor threads, so the model load never
+    happens on the event loop.
+    """
+
+    def __init__(self, name: str = "embeddings"):
+        self.name = name
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return registry.get(self.name).embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        return registry.get(self.name).embed_query(text)
+
+
+registry.register("embeddings", create_embeddings, warm=lambda model: model.embed_query("warm-up"))
+
+embeddings = LazyEmbeddings()
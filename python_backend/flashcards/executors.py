@@ -0,0 +1,120 @@
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Dict, Any, Optional
+import asyncio
+import functools
+import multiprocessing
+import threading
+import time
+import logging
+
+from .config import PARSE_WORKERS, EMBED_WORKERS, QUERY_WORKERS
+from .registry import registry
+
+logger = logging.getLogger(__name__)
+
+
+class ManagedExecutor:
+    """A lazily started thread or process pool with queue-depth metrics.
+
+    Coroutines hand blocking work to `run`, which keeps the event loop free
+    while documents are parsed or embedded.
+    """
+
+    def __init__(self, name: str, kind: str, max_workers: int):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown executor kind: {kind}")
+        self.name = name
+        self.kind = kind
+        self.max_workers = max(1, max_workers)
+        self._pool: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.total_seconds = 0.0
+
+    def _get_pool(self) -> Executor:
+        with self._lock:
+            if self._pool is None:
+                if self.kind == "process":
+                    # spawn avoids inheriting locks and sqlite handles from a threaded parent
+                    self._pool = ProcessPoolExecutor(
+                        max_workers=self.max_workers,
+                        mp_context=multiprocessing.get_context("spawn")
+                    )
+                else:
+                    self._pool = ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix=f"{self.name}-worker"
+                    )
+                logger.info(f"Started {self.kind} pool '{self.name}' with {self.max_workers} workers")
+            return self._pool
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """Run fn(*args, **kwargs) in the pool and await its result"""
+        loop = asyncio.get_running_loop()
+        self.submitted += 1
+        self.in_flight += 1
+        started = time.perf_counter()
+        try:
+            result = await loop.run_in_executor(self._get_pool(), functools.partial(fn, *args, **kwargs))
+            self.completed += 1
+            return result
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self.in_flight -= 1
+            self.total_seconds += time.perf_counter() - started
+
+    def prestart(self, fn: Callable, *args):
+        """Start every worker by running fn once per worker, blocking until done"""
+        pool = self._get_pool()
+        futures = [pool.submit(fn, *args) for _ in range(self.max_workers)]
+        return [future.result() for future in futures]
+
+    def stats(self) -> Dict[str, Any]:
+        finished = self.completed + self.failed
+        return {
+            "kind": self.kind,
+            "max_workers": self.max_workers,
+            "running": min(self.in_flight, self.max_workers),
+            "queued": max(0, self.in_flight - self.max_workers),
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "avg_seconds": round(self.total_seconds / finished, 4) if finished else 0.0,
+        }
+
+    def shutdown(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+
+# CPU-heavy document parsing runs in separate processes
+parse_executor = ManagedExecutor("parse", "process", PARSE_WORKERS)
+# Index builds embed whole documents on threads (torch releases the GIL)
+embed_executor = ManagedExecutor("embed", "thread", EMBED_WORKERS)
+# Question lookups get their own threads so they never queue behind index builds
+query_executor = ManagedExecutor("query", "thread", QUERY_WORKERS)
+
+executors = [parse_executor, embed_executor, query_executor]
+
+
+def _warm_parse_pool(executor: ManagedExecutor):
+    from .extraction import preload
+    executor.prestart(preload)
+
+registry.register("parse_pool", lambda: parse_executor, warm=_warm_parse_pool)
+
+
+def executor_stats() -> Dict[str, Dict[str, Any]]:
+    return {executor.name: executor.stats() for executor in executors}
+
+
+def shutdown_executors():
+    for executor in executors:
+        executor.shutdown()
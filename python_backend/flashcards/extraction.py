@@ -0,0 +1,133 @@
+from typing import List, Optional
+import hashlib
+import json
+import os
+import zlib
+import logging
+
+from .config import EXTRACTION_CACHE_DIR, EXTRACTION_CACHE_MAX_BYTES
+from .disk_cache import DiskCache
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1000
+CHUNK_OVERLAP = 200
+
+
+# Parser libraries are imported on first use; they only need to load in the parse workers
+
+def extract_pdf(pdf_path: str) -> str:
+    from pdfminer.high_level import extract_text
+    return extract_text(pdf_path)
+
+def extract_pptx(pptx_path: str) -> str:
+    from pptx import Presentation
+    prs = Presentation(pptx_path)
+    text_runs = []
+    for slide in prs.slides:
+        for shape in slide.shapes:
+            if hasattr(shape, "text") and shape.text:
+                text_runs.append(shape.text)
+    return "\n".join(text_runs)
+
+def extract_docx(docx_path: str) -> str:
+    from docx import Document
+    doc = Document(docx_path)
+    full_text = []
+    for para in doc.paragraphs:
+        if para.text:
+            full_text.append(para.text)
+    return "\n".join(full_text)
+
+def extract_txt(txt_path: str) -> str:
+    with open(txt_path, 'r') as file:
+        return file.read()
+
+EXTRACTORS = {
+    '.pdf': extract_pdf,
+    '.pptx': extract_pptx,
+    '.docx': extract_docx,
+    '.txt': extract_txt,
+}
+
+
+def extract_path(path: str) -> str:
+    """Extract text from a file without consulting the cache"""
+    extension = os.path.splitext(path.lower())[1]
+    extractor = EXTRACTORS.get(extension)
+    if extractor is None:
+        raise ValueError(f"Unsupported file extension for extraction: {path}")
+    return extractor(path)
+
+
+def preload() -> int:
+    """Import the parser libraries; run in each parse worker during warm-up"""
+    import pdfminer.high_level  # noqa: F401
+    import pptx  # noqa: F401
+    import docx  # noqa: F401
+    import langchain.text_splitter  # noqa: F401
+    get_cache()
+    return os.getpid()
+
+
+def file_hash(path: str) -> str:
+    """SHA-256 of a file's bytes, matching documents.content_hash"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def split_text(content: str, chunk_size: int = CHUNK_SIZE, chunk_overlap: int = CHUNK_OVERLAP) -> List[str]:
+    from langchain.text_splitter import RecursiveCharacterTextSplitter
+    splitter = RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap
+    )
+    return splitter.split_text(content)
+
+
+_cache: Optional[DiskCache] = None
+_cache_pid: Optional[int] = None
+
+def get_cache() -> DiskCache:
+    # Parse workers run in their own processes and each needs its own connection
+    global _cache, _cache_pid
+    if _cache is None or _cache_pid != os.getpid():
+        _cache = DiskCache(os.path.join(EXTRACTION_CACHE_DIR, "extraction.sqlite"), EXTRACTION_CACHE_MAX_BYTES)
+        _cache_pid = os.getpid()
+    return _cache
+
+def _pack(value) -> bytes:
+    return zlib.compress(json.dumps(value).encode("utf-8"))
+
+def _unpack(blob: bytes):
+    return json.loads(zlib.decompress(blob).decode("utf-8"))
+
+
+def extract_document(path: str, content_hash: Optional[str] = None) -> str:
+    """Extract text from a file, shared across endpoints through a content-addressed cache"""
+    content_hash = content_hash or file_hash(path)
+    key = f"text:{content_hash}"
+    cached = get_cache().get(key)
+    if cached is not None:
+        return _unpack(cached)
+
+    text = extract_path(path)
+    get_cache().set(key, _pack(text))
+    return text
+
+
+def split_document(path: str, content_hash: Optional[str] = None,
+                   chunk_size: int = CHUNK_SIZE, chunk_overlap: int = CHUNK_OVERLAP) -> List[str]:
+    """Return the chunk list for a file, cached per content hash and splitter settings"""
+    content_hash = content_hash or file_hash(path)
+    key = f"chunks:{content_hash}:{chunk_size}:{chunk_overlap}"
+    cached = get_cache().get(key)
+    if cached is not None:
+        return _unpack(cached)
+
+    chunks = split_text(extract_document(path, content_hash), chunk_size, chunk_overlap)
+    get_cache().set(key, _pack(chunks))
+    return chunks
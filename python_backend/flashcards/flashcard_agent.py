@@ -1,79 +1,54 @@
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_huggingface import HuggingFaceEmbeddings
 from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langgraph.graph import StateGraph, END, START
 from langgraph.graph.message import add_messages
+from langchain_core.callbacks.manager import adispatch_custom_event
+from langchain_core.runnables import RunnableConfig
 from dotenv import load_dotenv
-from typing import TypedDict, List, Literal, Annotated, Optional, Dict, Any, AsyncGenerator
-from pdfminer.high_level import extract_text
+from typing import TypedDict, List, Literal, Annotated, Optional, Dict, Any, AsyncGenerator, Tuple
 from pydantic import BaseModel
-from pptx import Presentation
-from docx import Document
+import asyncio
+import functools
 import logging
 
+from .extraction import extract_document, split_text
+from .history import estimate_tokens
+from .config import DIGEST_THRESHOLD_TOKENS, DIGEST_SECTION_TOKENS, DIGEST_CONCURRENCY, COMBINED_MAX_TOKENS
+from .executors import parse_executor
+from .registry import registry
+from .llm import get_llm
+from .result_cache import node_result_cache, prompt_fingerprint
+
 load_dotenv()
 
 # Setup logger for error reporting
 logger = logging.getLogger("app_logger")
 logger.setLevel(logging.DEBUG)  # or INFO in production
 
+class Flashcard(BaseModel):
+    question: str
+    answer: str
+
 class Flashcards(BaseModel):
-    question_1: str
-    answer_1: str
-    question_2: str
-    answer_2: str
-    question_3: str
-    answer_3: str
-    question_4: str
-    answer_4: str
-    question_5: str
-    answer_5: str
-    question_6: str
-    answer_6: str
-    question_7: str
-    answer_7: str
-    question_8: str
-    answer_8: str
-    question_9: str
-    answer_9: str
-    question_10: str
-    answer_10: str
+    cards: List[Flashcard]
+
+class QuizQuestion(BaseModel):
+    question: str
+    options: List[str]
+    answer: str
 
 class Quiz(BaseModel):
-    question_1: str
-    options_1: List[str]
-    answer_1: str
-    question_2: str
-    options_2: List[str]
-    answer_2: str
-    question_3: str
-    options_3: List[str]
-    answer_3: str
-    question_4: str
-    options_4: List[str]
-    answer_4: str
-    question_5: str
-    options_5: List[str]
-    answer_5: str
-    question_6: str
-    options_6: List[str]
-    answer_6: str
-    question_7: str
-    options_7: List[str]
-    answer_7: str
-    question_8: str
-    options_8: List[str]
-    answer_8: str
-    question_9: str
-    options_9: List[str]
-    answer_9: str
-    question_10: str
-    options_10: List[str]
-    answer_10: str
+    questions: List[QuizQuestion]
 
 class ImportantPoint(BaseModel):
     points: List[str]
 
+class StudyPack(BaseModel):
+    # Defaults let a partially streamed pack validate before every part has started
+    summary: str = ""
+    important_points: List[str] = []
+    flashcards: Flashcards = Flashcards(cards=[])
+    quiz: Quiz = Quiz(questions=[])
+
 class State(TypedDict):
     messages: Annotated[List, add_messages]
     teacher: Literal['Anil Deshmukh', 'Kavita Iyer', 'Raghav Sharma', 'Mary Fernandes']
@@ -83,67 +58,27 @@ class State(TypedDict):
     summarize: Optional[str]
     content: str
     important: Optional[ImportantPoint]
+    digest: Optional[Dict[str, Any]]
+    mode: Optional[Literal['auto', 'combined', 'fanout']]
     result: any
 
-def extract_pdf(pdf_path: str) -> str:
-    try:
-        text = extract_text(pdf_path)
-        return text
-    except Exception as e:
-        logger.error(f"PDF extraction failed for {pdf_path}: {str(e)}")
-        return ""
-
-def extract_pptx(pptx_path: str) -> str:
-    try:
-        prs = Presentation(pptx_path)
-        text_runs = []
-        for slide in prs.slides:
-            for shape in slide.shapes:
-                if hasattr(shape, "text") and shape.text:
-                    text_runs.append(shape.text)
-        return "\n".join(text_runs)
-    except Exception as e:
-        logger.error(f"PPTX extraction failed for {pptx_path}: {str(e)}")
-        return ""
-
-def extract_docx(docx_path: str) -> str:
-    try:
-        doc = Document(docx_path)
-        full_text = []
-        for para in doc.paragraphs:
-            if para.text:
-                full_text.append(para.text)
-        return "\n".join(full_text)
-    except Exception as e:
-        logger.error(f"DOCX extraction failed for {docx_path}: {str(e)}")
-        return ""
-
-def extract_file(state: State) -> str:
+async def extract_file(state: State) -> str:
     try:
         content = ""
         if state.get('pdf_path'):
             pdf_path = state.get('pdf_path')
-            if pdf_path.endswith('.pdf'):
-                content = extract_pdf(pdf_path)
-            elif pdf_path.endswith('.txt'):
-                try:
-                    with open(pdf_path, 'r') as file:
-                        content = file.read()
-                except Exception as e:
-                    logger.error(f"Reading TXT file failed: {pdf_path} : {str(e)}")
-                    content = ""
-            elif pdf_path.endswith('.pptx'):
-                content = extract_pptx(pdf_path)
-            elif pdf_path.endswith('.docx'):
-                content = extract_docx(pdf_path)
-            else:
-                logger.warning(f"Unsupported file extension for extraction: {pdf_path}")
+            try:
+                # Shared content-addressed cache: the same upload is only parsed once
+                content = await parse_executor.run(extract_document, pdf_path)
+            except Exception as e:
+                logger.error(f"Extraction failed for {pdf_path}: {str(e)}")
                 content = ""
         else:
             # If no file, fallback to last message in messages list safely
             messages = state.get('messages', [])
             if messages and isinstance(messages, list):
-                content = messages[-1] if messages else ""
+                last = messages[-1] if messages else ""
+                content = last.content if hasattr(last, "content") else last
             else:
                 logger.warning("State messages missing or invalid when extracting content.")
                 content = ""
@@ -153,65 +88,265 @@ def extract_file(state: State) -> str:
         logger.error(f"Unhandled exception in extract_file: {str(e)}")
         return ""
 
-async def summarize(state: State) -> Dict[str, Optional[str]]:
+SUMMARY_MODEL = 'gemini-2.5-flash'
+QUIZ_MODEL = 'gemini-2.5-flash'
+IMPORTANT_MODEL = 'gemini-1.5-flash'
+FLASHCARDS_MODEL = 'gemini-2.5-flash'
+DIGEST_MODEL = 'gemini-2.0-flash'
+STUDY_PACK_MODEL = 'gemini-2.5-flash'
+
+summary_prompt = ChatPromptTemplate.from_messages([
+    ("system", """
+        You are a summarizer. Your task is to take the provided text or query 
+        (which may come from a user message or an uploaded file) and generate a 
+        clear, concise summary. 
+        Focus on the main ideas, key details, and important context. 
+        Keep the language simple and easy to understand.
+    """),
+    ("human", "{content}")
+])
+
+quiz_prompt = ChatPromptTemplate.from_messages([
+    ("system", """
+        You are an expert educator. The user will provide a topic, and you must generate multiple-choice questions on that topic using Bloom’s Taxonomy.  
+        Create questions at different cognitive levels: Remember, Understand, Apply, Analyze, Evaluate, and Create.  
+
+        For each question:  
+        - Only write the question text (do not generate the options like A. B. C. D. etc. Don't do it at all costs).  
+        - Indicate which option letter (A, B, C, or D) is the correct answer.  
+        - Don't label the Bloom’s level.  
+
+        Do not explain the answer.  
+        Ensure progression from simple factual recall to higher-order critical thinking and creativity.
+    """),
+    ("human", "{content}")
+])
+
+important_prompt = ChatPromptTemplate.from_messages([
+    ("system", """You are an important points generator. Your job is to create key points from the provided content.
+        Focus on key concepts and important details. Make points clear and concise."""),
+    ("human", "Generate important points from this content: {content}")
+])
+
+flashcards_prompt = ChatPromptTemplate.from_messages([
+    ("system", """You are a flash card generator. Your job is to create 10 question-answer pairs from the provided content.
+        Focus on key concepts and important details. Make questions clear and concise."""),
+    ("human", "Generate 10 flashcards from this content: {content}")
+])
+
+digest_prompt = ChatPromptTemplate.from_messages([
+    ("system", """You condense one section of a longer document into study notes.
+        Keep every key concept, definition, fact, formula and example that a summary,
+        quiz, flashcards or list of important points could draw on. Drop filler and repetition.
+        Write dense plain-text notes, no preamble."""),
+    ("human", "{content}")
+])
+
+study_pack_prompt = ChatPromptTemplate.from_messages([
+    ("system", """You are an expert educator building a complete study pack from the provided content.
+        Produce all four parts in one response, in this order:
+        - summary: a clear, concise summary of the main ideas, key details and important context, in simple language.
+        - important_points: key points covering the key concepts and important details, each clear and concise.
+        - flashcards: 10 clear, concise question-answer pairs on key concepts and important details.
+        - quiz: 10 multiple-choice questions that progress through Bloom's Taxonomy levels
+          (Remember, Understand, Apply, Analyze, Evaluate, Create) without labelling the level.
+          Give four options per question and the correct option letter (A, B, C or D) as the answer. Do not explain answers."""),
+    ("human", "{content}")
+])
+
+def build_chains():
+    """Prompt | model chains for every generator node, built once and reused"""
+    return {
+        "digest": digest_prompt | get_llm(DIGEST_MODEL, temperature=0),
+        "study_pack": study_pack_prompt | get_llm(STUDY_PACK_MODEL).with_structured_output(StudyPack),
+        "summarize": summary_prompt | get_llm(SUMMARY_MODEL),
+        "quiz": quiz_prompt | get_llm(QUIZ_MODEL).with_structured_output(Quiz),
+        "important": important_prompt | get_llm(IMPORTANT_MODEL).with_structured_output(ImportantPoint),
+        "flashcards": flashcards_prompt | get_llm(FLASHCARDS_MODEL).with_structured_output(Flashcards),
+    }
+
+registry.register("flashcard_chains", build_chains)
+
+def get_chain(name: str):
+    return registry.get("flashcard_chains")[name]
+
+async def digest_sections(sections: List[str]) -> Tuple[List[str], int]:
+    """Digest sections concurrently, at most DIGEST_CONCURRENCY calls at a time; also returns how many failed"""
+    results = await get_chain("digest").abatch(
+        [{"content": section} for section in sections],
+        config={"max_concurrency": DIGEST_CONCURRENCY},
+        return_exceptions=True
+    )
+    digests = []
+    failed = 0
+    for section, result in zip(sections, results):
+        if isinstance(result, Exception):
+            # A failed section keeps its raw text rather than vanishing from the material
+            logger.error(f"Digest failed for one section: {result}")
+            digests.append(section)
+            failed += 1
+        else:
+            digests.append(result.content)
+    return digests, failed
+
+# Model and prompt fingerprint per cached node; editing one prompt only invalidates that node's results
+NODE_CACHE_SPECS = {
+    "digest": (f"{DIGEST_MODEL}:{DIGEST_THRESHOLD_TOKENS}:{DIGEST_SECTION_TOKENS}", prompt_fingerprint(digest_prompt)),
+    "study_pack": (STUDY_PACK_MODEL, prompt_fingerprint(study_pack_prompt, StudyPack)),
+    "summarize": (SUMMARY_MODEL, prompt_fingerprint(summary_prompt)),
+    "quiz": (QUIZ_MODEL, prompt_fingerprint(quiz_prompt, Quiz)),
+    "important": (IMPORTANT_MODEL, prompt_fingerprint(important_prompt, ImportantPoint)),
+    "flashcards": (FLASHCARDS_MODEL, prompt_fingerprint(flashcards_prompt, Flashcards)),
+}
+
+def _instruction(state: State) -> str:
+    messages = state.get('messages') or []
+    last = messages[-1] if messages else ""
+    return str(last.content if hasattr(last, "content") else last)
+
+def _cacheable(update: Dict[str, Any]) -> bool:
+    """Only complete results are stored; failures, partial digests and pass-through digests are recomputed"""
+    if not update or any(value is None for value in update.values()):
+        return False
+    digest_stats = update.get("digest")
+    if digest_stats is None:
+        return True
+    return digest_stats.get("mode") != "direct" and "error" not in digest_stats and not digest_stats.get("failed_sections")
+
+async def replay_events(update: Dict[str, Any], config: RunnableConfig):
+    """Re-dispatch the stream events a cached node update would have produced"""
+    for card in (update.get("flashcards") or {}).get("cards", []):
+        await adispatch_custom_event("flashcard", card, config=config)
+    for question in (update.get("quiz") or {}).get("questions", []):
+        await adispatch_custom_event("quiz_item", question, config=config)
+    if update.get("summarize") is not None:
+        await adispatch_custom_event("summary", {"summary": update["summarize"]}, config=config)
+    if update.get("important") is not None:
+        await adispatch_custom_event("important", {"points": update["important"]}, config=config)
+
+def cached_node(node: str):
+    """Serve a node's state update from the result cache, keyed by its input content and instruction"""
+    model, fingerprint = NODE_CACHE_SPECS[node]
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        async def wrapper(state: State, config: RunnableConfig):
+            content = state.get('content')
+            if not node_result_cache.enabled or not isinstance(content, str) or not content:
+                return await fn(state, config)
+
+            key = node_result_cache.key(node, model, fingerprint, content, _instruction(state))
+            try:
+                update = await node_result_cache.get(node, key)
+            except Exception as e:
+                logger.error(f"Result cache lookup failed for {node}: {str(e)}")
+                update = None
+            if update is not None:
+                await replay_events(update, config)
+                return update
+
+            update = await fn(state, config)
+            # Results built on a partially failed digest are as transient as the digest itself
+            degraded = (state.get('digest') or {}).get("failed_sections")
+            if _cacheable(update) and not degraded:
+                try:
+                    await node_result_cache.set(node, key, update)
+                except Exception as e:
+                    logger.error(f"Result cache store failed for {node}: {str(e)}")
+            return update
+        return wrapper
+    return decorator
+
+@cached_node("digest")
+async def digest(state: State, config: RunnableConfig):
+    """Map-reduce large documents into a digest the generators can take in one prompt"""
     try:
-        llm = ChatGoogleGenerativeAI(
-            model='gemini-2.5-flash',
-            temperature=0.7
-        )
+        content = state['content']
+        source_tokens = estimate_tokens(content) if isinstance(content, str) else 0
+        if source_tokens <= DIGEST_THRESHOLD_TOKENS:
+            return {"digest": {"mode": "direct", "source_tokens": source_tokens}}
+
+        rounds = 0
+        sections = 0
+        failed_sections = 0
+        # Map sections to digests, then reduce again while the joined digest is still too big
+        while estimate_tokens(content) > DIGEST_THRESHOLD_TOKENS and rounds < 3:
+            parts = await asyncio.to_thread(split_text, content, DIGEST_SECTION_TOKENS * 4, 200)
+            if len(parts) < 2:
+                break
+            digests, failed = await digest_sections(parts)
+            content = "\n\n".join(digests)
+            sections += len(parts)
+            failed_sections += failed
+            rounds += 1
+
+        stats = {
+            "mode": "map_reduce",
+            "source_tokens": source_tokens,
+            "digest_tokens": estimate_tokens(content),
+            "sections": sections,
+            "failed_sections": failed_sections,
+            "rounds": rounds,
+        }
+        logger.info(f"Digested document: {stats}")
+        return {"content": content, "digest": stats}
 
+    except Exception as e:
+        logger.error(f"Error in digest: {str(e)}")
+        return {"digest": {"mode": "direct", "error": str(e)}}
+
+async def stream_items(chain, inputs: Dict[str, Any], streams: Dict[str, Any], config: RunnableConfig):
+    """Run a structured-output chain, dispatching list items as soon as they are complete.
+
+    `streams` maps a custom event name to a function returning the list it
+    follows in the (partial) parsed output. While streaming, the last item
+    of a list may still be growing, so an item is dispatched once the next
+    one appears; whatever remains goes out when the stream ends.
+    """
+    emitted = {name: 0 for name in streams}
+    result = None
+    async for partial in chain.astream(inputs, config=config):
+        if partial is None:
+            continue
+        result = partial
+        for name, items_of in streams.items():
+            items = items_of(partial) or []
+            while emitted[name] < len(items) - 1:
+                await adispatch_custom_event(name, _plain(items[emitted[name]]), config=config)
+                emitted[name] += 1
+    for name, items_of in streams.items():
+        items = (items_of(result) or []) if result is not None else []
+        for item in items[emitted[name]:]:
+            await adispatch_custom_event(name, _plain(item), config=config)
+    return result
+
+def _plain(item):
+    return item.model_dump() if hasattr(item, 'model_dump') else item
+
+@cached_node("summarize")
+async def summarize(state: State, config: RunnableConfig) -> Dict[str, Optional[str]]:
+    try:
         content = state['content']
         if not content:
             raise ValueError("No content available to summarize.")
 
-        prompt = ChatPromptTemplate.from_messages([
-            ("system", """
-                You are a summarizer. Your task is to take the provided text or query 
-                (which may come from a user message or an uploaded file) and generate a 
-                clear, concise summary. 
-                Focus on the main ideas, key details, and important context. 
-                Keep the language simple and easy to understand.
-            """),
-            ("human", "{content}")
-        ])
-
-        chain = prompt | llm
-        result = await chain.ainvoke({"content": content})
+        result = await get_chain("summarize").ainvoke({"content": content}, config=config)
+        await adispatch_custom_event("summary", {"summary": result.content}, config=config)
         return {"summarize": result.content}
 
     except Exception as e:
         logger.error(f"Error in summarize: {str(e)}")
         return {"summarize": None}
 
-async def generate_quiz(state: State) -> Dict[str, Optional[Dict]]:
+@cached_node("quiz")
+async def generate_quiz(state: State, config: RunnableConfig) -> Dict[str, Optional[Dict]]:
     try:
-        llm = ChatGoogleGenerativeAI(
-            model='gemini-2.5-flash',
-            temperature=0.7
-        ).with_structured_output(Quiz)
-
         content = state['content']
         if not content:
             raise ValueError("No content available to generate quiz.")
 
-        prompt = ChatPromptTemplate.from_messages([
-            ("system", """
-                You are an expert educator. The user will provide a topic, and you must generate multiple-choice questions on that topic using Bloom’s Taxonomy.  
-                Create questions at different cognitive levels: Remember, Understand, Apply, Analyze, Evaluate, and Create.  
-
-                For each question:  
-                - Only write the question text (do not generate the options like A. B. C. D. etc. Don't do it at all costs).  
-                - Indicate which option letter (A, B, C, or D) is the correct answer.  
-                - Don't label the Bloom’s level.  
-
-                Do not explain the answer.  
-                Ensure progression from simple factual recall to higher-order critical thinking and creativity.
-            """),
-            ("human", "{content}")
-        ])
-
-        chain = prompt | llm
-        result = await chain.ainvoke({"content": content})
+        result = await stream_items(get_chain("quiz"), {"content": content},
+                                    {"quiz_item": lambda quiz: quiz.questions}, config)
 
         flashcard_dict = result.model_dump() if hasattr(result, 'model_dump') else None
         return {"quiz": flashcard_dict}
@@ -220,53 +355,33 @@ async def generate_quiz(state: State) -> Dict[str, Optional[Dict]]:
         logger.error(f"Error in generate_quiz: {str(e)}")
         return {"quiz": None}
 
-async def generate_important(state: State):
+@cached_node("important")
+async def generate_important(state: State, config: RunnableConfig):
     try:
-        llm = ChatGoogleGenerativeAI(
-            model='gemini-1.5-flash',
-            temperature=0.7
-        ).with_structured_output(ImportantPoint)
-
         content = state['content']
         if not content:
             raise ValueError("No content available to generate important points.")
 
-        prompt = ChatPromptTemplate.from_messages([
-            ("system", """You are an important points generator. Your job is to create key points from the provided content.
-                Focus on key concepts and important details. Make points clear and concise."""),
-            ("human", "Generate important points from this content: {content}")
-        ])
-
-        chain = prompt | llm
-        result = await chain.ainvoke({"content": content})
+        result = await get_chain("important").ainvoke({"content": content}, config=config)
         result = result.model_dump()
         
-        print(f"result generated: {result}")
+        logger.debug(f"Important points generated: {result}")
+        await adispatch_custom_event("important", {"points": result['points']}, config=config)
         return {"important": result['points']}
 
     except Exception as e:
         logger.error(f"Error in generate_important: {str(e)}")
-        return {"important_points": ImportantPoint(points=[])}
+        return {"important": None}
 
-async def generate_flashcards(state: State) -> Dict[str, Optional[Dict]]:
+@cached_node("flashcards")
+async def generate_flashcards(state: State, config: RunnableConfig) -> Dict[str, Optional[Dict]]:
     try:
-        llm = ChatGoogleGenerativeAI(
-            model='gemini-2.5-flash',
-            temperature=0.7
-        ).with_structured_output(Flashcards)
-
         content = state['content']
         if not content:
             raise ValueError("No content available to generate flashcards.")
 
-        prompt = ChatPromptTemplate.from_messages([
-            ("system", """You are a flash card generator. Your job is to create 10 question-answer pairs from the provided content.
-                Focus on key concepts and important details. Make questions clear and concise."""),
-            ("human", "Generate 10 flashcards from this content: {content}")
-        ])
-
-        chain = prompt | llm
-        result = await chain.ainvoke({"content": content})
+        result = await stream_items(get_chain("flashcards"), {"content": content},
+                                    {"flashcard": lambda flashcards: flashcards.cards}, config)
 
         flashcard_dict = result.model_dump() if hasattr(result, 'model_dump') else None
         return {"flashcards": flashcard_dict}
@@ -275,6 +390,48 @@ async def generate_flashcards(state: State) -> Dict[str, Optional[Dict]]:
         logger.error(f"Error in generate_flashcards: {str(e)}")
         return {"flashcards": None}
 
+@cached_node("study_pack")
+async def generate_study_pack(state: State, config: RunnableConfig):
+    """Summary, important points, flashcards and quiz from a single structured call"""
+    try:
+        content = state['content']
+        if not content:
+            raise ValueError("No content available to generate a study pack.")
+
+        result = await stream_items(get_chain("study_pack"), {"content": content}, {
+            "flashcard": lambda pack: pack.flashcards.cards,
+            "quiz_item": lambda pack: pack.quiz.questions,
+        }, config)
+        await adispatch_custom_event("summary", {"summary": result.summary}, config=config)
+        await adispatch_custom_event("important", {"points": result.important_points}, config=config)
+        return {
+            "summarize": result.summary,
+            "important": result.important_points,
+            "flashcards": result.flashcards.model_dump(),
+            "quiz": result.quiz.model_dump(),
+        }
+
+    except Exception as e:
+        logger.error(f"Error in generate_study_pack: {str(e)}")
+        return {"summarize": None, "important": None, "flashcards": None, "quiz": None}
+
+FANOUT_NODES = ["quiz", "flashcards", "summarize", "important"]
+GENERATION_MODES = ("auto", "combined", "fanout")
+
+def route_generation(state: State):
+    """One combined call for small content; four specialised calls in parallel otherwise.
+
+    Below COMBINED_MAX_TOKENS the shared prompt-processing cost dominates, so
+    sending the content once wins; above it the longest single structured
+    output makes the combined call slower than the parallel fan-out.
+    """
+    mode = state.get('mode') or 'auto'
+    if mode == 'auto':
+        content = state.get('content')
+        tokens = estimate_tokens(content) if isinstance(content, str) else 0
+        mode = 'combined' if tokens <= COMBINED_MAX_TOKENS else 'fanout'
+    return "study_pack" if mode == 'combined' else FANOUT_NODES
+
 async def chat(state: State) -> Dict[str, Optional[Any]]:
     try:
         return {
@@ -282,32 +439,44 @@ async def chat(state: State) -> Dict[str, Optional[Any]]:
                 "flashcards": state.get("flashcards"),
                 "quiz": state.get("quiz"),
                 "summarize": state.get("summarize"),
-                "important": state.get("important")
+                "important": state.get("important"),
+                "digest": state.get("digest"),
+                "mode": "combined" if route_generation(state) == "study_pack" else "fanout"
             }
         }
     except Exception as e:
         logger.error(f"Error in chat aggregation: {str(e)}")
         return {"result": None}
 
-# Build graph with error handling integrated
-graph_builder = StateGraph(State)
-graph_builder.add_node("quiz", generate_quiz)
-graph_builder.add_node("flashcards", generate_flashcards)
-graph_builder.add_node("summarize", summarize)
-graph_builder.add_node("extract", extract_file)
-graph_builder.set_entry_point("extract")
-graph_builder.add_node("important", generate_important)
-graph_builder.add_node("chat", chat)
-graph_builder.add_edge("extract", "quiz")
-graph_builder.add_edge("extract", "flashcards")
-graph_builder.add_edge("extract", "summarize")
-graph_builder.add_edge("extract", "important")
-graph_builder.add_edge("quiz", "chat")
-graph_builder.add_edge("flashcards", "chat")
-graph_builder.add_edge("summarize", "chat")
-graph_builder.add_edge("important", "chat")
-graph_builder.set_finish_point("chat")
-
-graph = graph_builder.compile()
-
-print(graph.get_graph().draw_mermaid())
+def build_graph():
+    """Compile the flashcard/quiz/summary graph"""
+    # Build graph with error handling integrated
+    graph_builder = StateGraph(State)
+    graph_builder.add_node("quiz", generate_quiz)
+    graph_builder.add_node("flashcards", generate_flashcards)
+    graph_builder.add_node("summarize", summarize)
+    graph_builder.add_node("extract", extract_file)
+    graph_builder.set_entry_point("extract")
+    graph_builder.add_node("important", generate_important)
+    graph_builder.add_node("digest", digest)
+    graph_builder.add_node("chat", chat)
+    graph_builder.add_edge("extract", "digest")
+    graph_builder.add_node("study_pack", generate_study_pack)
+    graph_builder.add_conditional_edges("digest", route_generation, ["study_pack", *FANOUT_NODES])
+    graph_builder.add_edge("study_pack", "chat")
+    graph_builder.add_edge("quiz", "chat")
+    graph_builder.add_edge("flashcards", "chat")
+    graph_builder.add_edge("summarize", "chat")
+    graph_builder.add_edge("important", "chat")
+    graph_builder.set_finish_point("chat")
+
+    return graph_builder.compile()
+
+registry.register("flashcard_graph", build_graph)
+
+def get_graph():
+    return registry.get("flashcard_graph")
+
+
+if __name__ == "__main__":
+    print(build_graph().get_graph().draw_mermaid())
@@ -0,0 +1,120 @@
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Set, Tuple
+from langchain.prompts import ChatPromptTemplate
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+import asyncio
+import contextvars
+import logging
+
+from .llm import get_llm, CHAT_MODEL
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_MAX_WORDS = 250
+
+summary_prompt = ChatPromptTemplate.from_messages([
+    ("system",
+     "You maintain a running summary of a tutoring conversation between a student and a teacher. "
+     "Extend the current summary with the new lines. Keep the topics covered, what the student "
+     "already understands or struggles with, and any open questions. "
+     f"Reply with the updated summary only, at most {SUMMARY_MAX_WORDS} words."),
+    ("user", "Current summary:\n{summary}\n\nNew lines:\n{lines}")
+])
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count; about four characters per token for English text"""
+    return len(text) // 4 + 1
+
+
+def is_conversational(message: BaseMessage) -> bool:
+    """Plain user and teacher turns; tool traffic is never replayed to the model"""
+    if isinstance(message, HumanMessage):
+        return bool(message.content)
+    return isinstance(message, AIMessage) and bool(message.content) and not message.tool_calls
+
+
+def split_turns(messages: Sequence[BaseMessage]) -> List[List[BaseMessage]]:
+    """Group messages into turns, each starting at a user message"""
+    turns: List[List[BaseMessage]] = []
+    for message in messages:
+        if isinstance(message, HumanMessage) or not turns:
+            turns.append([])
+        turns[-1].append(message)
+    return turns
+
+
+def fit_history(turns: Sequence[Sequence[BaseMessage]], budget: int) -> List[BaseMessage]:
+    """Newest turns first, as many whole turns as the budget allows"""
+    kept: List[List[BaseMessage]] = []
+    for turn in reversed(turns):
+        messages = [m for m in turn if is_conversational(m)]
+        cost = sum(estimate_tokens(m.content) for m in messages)
+        if cost > budget:
+            break
+        budget -= cost
+        kept.append(messages)
+    return [m for turn in reversed(kept) for m in turn]
+
+
+class HistorySummarizer:
+    """Folds turns that fell out of the window into a rolling summary.
+
+    Summaries are generated in the background so the request that pushes a
+    thread over the window never waits for them. A finished fold is handed
+    to the `save` callback given to `schedule`, which writes it into the
+    thread's checkpointed state; the next turn on that thread, in whichever
+    worker it lands, applies it with `take` and drops the folded messages.
+    A fold only applies on top of the summary it was built from, so a stale
+    one can't overwrite a newer summary.
+    """
+
+    def __init__(self, model: str = CHAT_MODEL):
+        self.model = model
+        self._running: Set[str] = set()
+        self._tasks: Set[asyncio.Task] = set()
+
+    @staticmethod
+    def take(thread_id: str, summary: Optional[str], pending: Optional[Dict[str, Any]]) -> Optional[Tuple[str, List[str]]]:
+        """Summary and the ids of the messages it replaces from the stored fold `pending`, if it extends `summary`"""
+        if not pending:
+            return None
+        if pending.get("base") != summary:
+            logger.info(f"Dropped a stale history summary for thread {thread_id}")
+            return None
+        return pending["summary"], pending["ids"]
+
+    def schedule(self, thread_id: str, summary: Optional[str], messages: Sequence[BaseMessage],
+                 save: Callable[[str, Dict[str, Any]], Awaitable[None]]):
+        """Fold `messages` into `summary` in the background and pass the result to `save`"""
+        if thread_id in self._running or not messages:
+            return
+        self._running.add(thread_id)
+        # An empty context keeps the graph run's callbacks away from the summary model,
+        # so its tokens never show up in the answer stream
+        task = contextvars.Context().run(asyncio.create_task, self._fold(thread_id, summary, list(messages), save))
+        # The loop only holds weak references to tasks
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _fold(self, thread_id: str, summary: Optional[str], messages: List[BaseMessage],
+                    save: Callable[[str, Dict[str, Any]], Awaitable[None]]):
+        try:
+            lines = "\n".join(
+                f"{'Student' if isinstance(m, HumanMessage) else 'Teacher'}: {m.content}"
+                for m in messages if is_conversational(m)
+            )
+            chain = summary_prompt | get_llm(self.model, temperature=0)
+            response = await chain.ainvoke({"summary": summary or "(none yet)", "lines": lines})
+            await save(thread_id, {
+                "base": summary,
+                "summary": response.content.strip(),
+                "ids": [m.id for m in messages if m.id],
+            })
+            logger.info(f"Folded {len(messages)} messages into the summary for thread {thread_id}")
+        except Exception as e:
+            logger.error(f"Error summarizing history for thread {thread_id}: {e}")
+        finally:
+            self._running.discard(thread_id)
+
+
+history_summarizer = HistorySummarizer()
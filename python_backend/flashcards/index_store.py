@@ -0,0 +1,127 @@
+from datetime import datetime
+from typing import List, Optional, Tuple
+from langchain_core.embeddings import Embeddings
+import numpy as np
+import json
+import os
+import re
+import shutil
+import uuid
+import logging
+
+from .config import INDEX_STORE_DIR
+
+logger = logging.getLogger(__name__)
+
+
+def _model_slug(model_name: str) -> str:
+    return re.sub(r"[^A-Za-z0-9._-]+", "__", model_name)
+
+
+class IndexStore:
+    """Document embeddings persisted on disk so any worker can reload them.
+
+    Each index is a directory holding `embeddings.npy` (float32, one row per
+    chunk), `chunks.json` and `meta.json`, keyed by the document content
+    hash and the embedding model name. Vectors are memory-mapped on load,
+    so loading costs a file open rather than a forward pass per chunk.
+    """
+
+    def __init__(self, root: str = INDEX_STORE_DIR):
+        self.root = root
+
+    def _dir(self, content_hash: str, model_name: str) -> str:
+        return os.path.join(self.root, _model_slug(model_name), content_hash)
+
+    def exists(self, content_hash: str, model_name: str) -> bool:
+        return os.path.exists(os.path.join(self._dir(content_hash, model_name), "meta.json"))
+
+    def save(self, content_hash: str, model_name: str, chunks: List[str], vectors: np.ndarray,
+             extra: Optional[dict] = None):
+        target = self._dir(content_hash, model_name)
+        if self.exists(content_hash, model_name):
+            return
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        if vectors.shape[0] != len(chunks):
+            raise ValueError(f"Got {vectors.shape[0]} vectors for {len(chunks)} chunks")
+
+        # Write into a scratch directory and rename it into place so readers never see a partial index
+        tmp = f"{target}.tmp-{uuid.uuid4().hex}"
+        os.makedirs(tmp)
+        try:
+            np.save(os.path.join(tmp, "embeddings.npy"), vectors)
+            with open(os.path.join(tmp, "chunks.json"), "w") as f:
+                json.dump(chunks, f)
+            with open(os.path.join(tmp, "meta.json"), "w") as f:
+                json.dump({
+                    "content_hash": content_hash,
+                    "model": model_name,
+                    "count": len(chunks),
+                    "dim": int(vectors.shape[1]) if vectors.ndim == 2 else 0,
+                    "created_at": datetime.now().isoformat(),
+                    **(extra or {}),
+                }, f)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            os.rename(tmp, target)
+            logger.info(f"Persisted index for {content_hash} ({len(chunks)} chunks, {model_name})")
+        except OSError:
+            # Another worker finished the same index first
+            shutil.rmtree(tmp, ignore_errors=True)
+            if not self.exists(content_hash, model_name):
+                raise
+        except Exception:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+
+    def meta(self, content_hash: str, model_name: str) -> Optional[dict]:
+        """Return the metadata recorded when the index was built"""
+        try:
+            with open(os.path.join(self._dir(content_hash, model_name), "meta.json"), "r") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def load(self, content_hash: str, model_name: str) -> Optional[Tuple[List[str], np.ndarray]]:
+        """Return (chunks, memory-mapped vectors), or None if not persisted"""
+        target = self._dir(content_hash, model_name)
+        if not self.exists(content_hash, model_name):
+            return None
+        try:
+            with open(os.path.join(target, "chunks.json"), "r") as f:
+                chunks = json.load(f)
+            vectors = np.load(os.path.join(target, "embeddings.npy"), mmap_mode="r")
+            return chunks, vectors
+        except Exception as e:
+            logger.error(f"Failed to load index {target}: {e}")
+            return None
+
+    def delete(self, content_hash: str, model_name: str):
+        shutil.rmtree(self._dir(content_hash, model_name), ignore_errors=True)
+
+
+class PrecomputedEmbeddings(Embeddings):
+    """Serves already-computed document vectors; queries go to the live model.
+
+    Lets vector stores that only accept texts be built from a persisted
+    index without re-running the embedding model.
+    """
+
+    def __init__(self, base: Embeddings, texts: List[str], vectors: np.ndarray):
+        self.base = base
+        self._lookup = dict(zip(texts, vectors))
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        missing = [t for t in texts if t not in self._lookup]
+        if missing:
+            self._lookup.update(zip(missing, self.base.embed_documents(missing)))
+        return [np.asarray(self._lookup[t], dtype=np.float32).tolist() for t in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.base.embed_query(text)
+
+    def release(self):
+        """Forget stored document vectors once the store has been built"""
+        self._lookup = {}
+
+
+index_store = IndexStore()
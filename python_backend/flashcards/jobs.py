@@ -0,0 +1,377 @@
+from contextlib import contextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple
+import asyncio
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+import logging
+
+from .config import (
+    FLASHCARD_JOB_WORKERS, FLASHCARD_JOB_TTL_SECONDS, FLASHCARD_JOB_MAX_QUEUE, FLASHCARD_JOB_DB_PATH,
+    FLASHCARD_JOB_POLL_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS jobs (
+        id TEXT PRIMARY KEY,
+        status TEXT NOT NULL,
+        inputs TEXT,
+        progress TEXT NOT NULL,
+        result TEXT,
+        error TEXT,
+        worker TEXT,
+        created_at REAL NOT NULL,
+        started_at REAL,
+        finished_at REAL,
+        version INTEGER NOT NULL DEFAULT 0
+    )""",
+    "CREATE INDEX IF NOT EXISTS jobs_status ON jobs(status, created_at)",
+]
+
+_FIELDS = ("id", "status", "progress", "result", "error", "created_at", "started_at", "finished_at", "version")
+
+
+class JobQueueFull(Exception):
+    """Raised when a job is submitted while the queue is at capacity"""
+
+
+def snapshot(row: Dict[str, Any]) -> Dict[str, Any]:
+    """API view of a stored job"""
+    progress = row["progress"]
+    return {
+        "job_id": row["id"],
+        "status": row["status"],
+        "progress": progress,
+        "completed_nodes": sum(1 for p in progress.values() if p["status"] not in ("pending", "running")),
+        "total_nodes": len(progress),
+        "created_at": row["created_at"],
+        "started_at": row["started_at"],
+        "finished_at": row["finished_at"],
+        "result": row["result"],
+        "error": row["error"],
+    }
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class JobStore:
+    """Job records in a SQLite file shared by every worker process on the host.
+
+    The table is also the queue: any process's workers claim the oldest
+    queued job inside an immediate transaction, so a job runs exactly once
+    and its status can be read from whichever process a request lands on.
+    """
+
+    def __init__(self, path: str = FLASHCARD_JOB_DB_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    def _connection(self) -> sqlite3.Connection:
+        # A connection must not cross a fork; each worker process opens its own
+        if self._conn is None or self._pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            for statement in _SCHEMA:
+                conn.execute(statement)
+            self._conn, self._pid = conn, os.getpid()
+        return self._conn
+
+    @contextmanager
+    def _cursor(self, write: bool = False) -> Iterator[sqlite3.Cursor]:
+        with self._lock:
+            cur = self._connection().cursor()
+            if write:
+                cur.execute("BEGIN IMMEDIATE")
+            try:
+                yield cur
+                if write:
+                    cur.execute("COMMIT")
+            except Exception:
+                if write:
+                    cur.execute("ROLLBACK")
+                raise
+            finally:
+                cur.close()
+
+    def insert(self, inputs: Dict[str, Any], nodes: List[str], max_queue: int) -> str:
+        job_id = uuid.uuid4().hex
+        progress = {node: {"status": "pending", "elapsed_ms": None} for node in nodes}
+        with self._cursor(write=True) as cur:
+            cur.execute("SELECT COUNT(*) FROM jobs WHERE status = 'queued'")
+            if cur.fetchone()[0] >= max_queue:
+                raise JobQueueFull(f"{max_queue} jobs are already waiting")
+            cur.execute(
+                "INSERT INTO jobs (id, status, inputs, progress, created_at) VALUES (?, 'queued', ?, ?, ?)",
+                (job_id, json.dumps(inputs), json.dumps(progress), time.time()),
+            )
+        return job_id
+
+    def claim(self, worker: str) -> Optional[Tuple[str, Dict[str, Any], Dict[str, Any], float]]:
+        """Mark the oldest queued job as running; returns (id, inputs, progress, started_at)"""
+        with self._cursor(write=True) as cur:
+            cur.execute("SELECT id, inputs, progress FROM jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1")
+            row = cur.fetchone()
+            if row is None:
+                return None
+            started_at = time.time()
+            # Inputs stay until the job finishes, so a job orphaned by a crash can still be cleaned up
+            cur.execute(
+                "UPDATE jobs SET status = 'running', worker = ?, started_at = ?, "
+                "version = version + 1 WHERE id = ?",
+                (worker, started_at, row[0]),
+            )
+        return row[0], json.loads(row[1]), json.loads(row[2]), started_at
+
+    def update(self, job_id: str, **fields):
+        for name in ("progress", "result"):
+            if name in fields:
+                fields[name] = json.dumps(fields[name])
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self._cursor(write=True) as cur:
+            cur.execute(
+                f"UPDATE jobs SET {assignments}, version = version + 1 WHERE id = ?",
+                (*fields.values(), job_id),
+            )
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._cursor() as cur:
+            cur.execute(f"SELECT {', '.join(_FIELDS)} FROM jobs WHERE id = ?", (job_id,))
+            row = cur.fetchone()
+        if row is None:
+            return None
+        job = dict(zip(_FIELDS, row))
+        job["progress"] = json.loads(job["progress"])
+        job["result"] = json.loads(job["result"]) if job["result"] is not None else None
+        return job
+
+    def version(self, job_id: str) -> Optional[int]:
+        with self._cursor() as cur:
+            cur.execute("SELECT version FROM jobs WHERE id = ?", (job_id,))
+            row = cur.fetchone()
+        return row[0] if row else None
+
+    def purge(self, ttl_seconds: int) -> int:
+        with self._cursor(write=True) as cur:
+            cur.execute("DELETE FROM jobs WHERE finished_at IS NOT NULL AND finished_at < ?", (time.time() - ttl_seconds,))
+            return cur.rowcount
+
+    def fail_orphans(self, host: str) -> List[Dict[str, Any]]:
+        """Fail jobs left running by processes on this host that no longer exist; returns their inputs"""
+        with self._cursor(write=True) as cur:
+            cur.execute("SELECT id, worker, inputs FROM jobs WHERE status = 'running' AND worker LIKE ?", (f"{host}:%",))
+            orphans = [(job_id, inputs) for job_id, worker, inputs in cur.fetchall()
+                       if not _pid_alive(int(worker.rsplit(":", 1)[1]))]
+            for job_id, _ in orphans:
+                cur.execute(
+                    "UPDATE jobs SET status = 'failed', error = 'Worker exited before the job finished', "
+                    "inputs = NULL, finished_at = ?, version = version + 1 WHERE id = ?",
+                    (time.time(), job_id),
+                )
+        return [json.loads(inputs) for _, inputs in orphans if inputs]
+
+    def counts(self) -> Dict[str, int]:
+        with self._cursor() as cur:
+            cur.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status")
+            return dict(cur.fetchall())
+
+
+def node_error(task: Dict[str, Any]) -> Optional[str]:
+    """Why a finished graph task counts as failed, or None if it succeeded.
+
+    Nodes catch their own exceptions and return empty values instead, so a
+    result with nothing but None in it is a failure too.
+    """
+    if task.get("error"):
+        return str(task["error"])
+    result = task.get("result")
+    if not result or (isinstance(result, dict) and all(value is None for value in result.values())):
+        return "node produced no output"
+    return None
+
+
+class GraphJobManager:
+    """Runs a compiled graph as background jobs on a fixed number of workers.
+
+    `submit` returns immediately; workers stream the graph's tasks into
+    the job's progress, where each node goes from pending to running and
+    then to done or failed (or skipped if routing never reached it), so
+    clients can poll or subscribe.
+    Jobs, their progress and results live in a `JobStore` shared by all
+    worker processes, so any of them can serve a job's status and any of
+    them may run it. Finished jobs are kept for `ttl_seconds`.
+    `on_finish(inputs)` runs once a job is over, whatever its outcome.
+    """
+
+    def __init__(self, get_graph: Callable[[], Any], nodes: List[str], result_node: str,
+                 format_result: Callable[[Any], Any], build_state: Callable[[Dict[str, Any]], Dict[str, Any]],
+                 store: Optional[JobStore] = None, max_workers: int = FLASHCARD_JOB_WORKERS,
+                 ttl_seconds: int = FLASHCARD_JOB_TTL_SECONDS, max_queue: int = FLASHCARD_JOB_MAX_QUEUE,
+                 poll_seconds: float = FLASHCARD_JOB_POLL_SECONDS,
+                 on_finish: Optional[Callable[[Dict[str, Any]], None]] = None):
+        self.get_graph = get_graph
+        self.nodes = nodes
+        self.result_node = result_node
+        self.format_result = format_result
+        self.build_state = build_state
+        self.store = store or JobStore()
+        self.max_workers = max_workers
+        self.ttl_seconds = ttl_seconds
+        self.max_queue = max_queue
+        self.poll_seconds = poll_seconds
+        self.on_finish = on_finish
+        self.host = socket.gethostname()
+        self._workers: List[asyncio.Task] = []
+        self._submitted: Optional[asyncio.Event] = None
+
+    @property
+    def worker_id(self) -> str:
+        return f"{self.host}:{os.getpid()}"
+
+    def start(self):
+        if self._workers:
+            return
+        self._submitted = asyncio.Event()
+        try:
+            orphans = self.store.fail_orphans(self.host)
+            if orphans:
+                logger.warning(f"Marked {len(orphans)} jobs of exited workers as failed")
+            for inputs in orphans:
+                self._finished(inputs)
+        except Exception as e:
+            logger.error(f"Error recovering orphaned jobs: {e}")
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.max_workers)]
+
+    async def stop(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def submit(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        """Queue a job for `inputs` (JSON-serializable; `build_state` turns them into graph input)"""
+        self.start()
+        await asyncio.to_thread(self.store.purge, self.ttl_seconds)
+        job_id = await asyncio.to_thread(self.store.insert, inputs, self.nodes, self.max_queue)
+        self._submitted.set()
+        return await self.get(job_id)
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job = await asyncio.to_thread(self.store.get, job_id)
+        if job is None or (job["finished_at"] and job["finished_at"] < time.time() - self.ttl_seconds):
+            return None
+        return snapshot(job)
+
+    async def _worker(self):
+        while True:
+            try:
+                claimed = await asyncio.to_thread(self.store.claim, self.worker_id)
+            except Exception as e:
+                logger.error(f"Error claiming a job: {e}")
+                claimed = None
+            if claimed is None:
+                # Jobs submitted to this process wake a worker at once; other processes' are seen on the next poll
+                self._submitted.clear()
+                try:
+                    await asyncio.wait_for(self._submitted.wait(), self.poll_seconds)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self._run(*claimed)
+
+    async def _run(self, job_id: str, inputs: Dict[str, Any], progress: Dict[str, Any], started_at: float):
+        try:
+            output = None
+            # Task events mark each node when it starts and again with its result or error
+            async for task in self.get_graph().astream(self.build_state(inputs), stream_mode="tasks"):
+                node = task["name"]
+                finished = "result" in task or "error" in task
+                if finished and node == self.result_node:
+                    output = task.get("result")
+                if node not in progress:
+                    continue
+                if not finished:
+                    progress[node] = {"status": "running", "elapsed_ms": None}
+                else:
+                    error = node_error(task)
+                    progress[node] = {
+                        "status": "failed" if error else "done",
+                        "elapsed_ms": round((time.time() - started_at) * 1000, 1),
+                    }
+                    if error:
+                        progress[node]["error"] = error
+                await asyncio.to_thread(self.store.update, job_id, progress=progress)
+            result = self.format_result(output)
+            # Conditional routing means some nodes never run
+            for node_progress in progress.values():
+                if node_progress["status"] == "pending":
+                    node_progress["status"] = "skipped"
+            fields = {"status": "succeeded", "progress": progress, "result": result}
+        except Exception as e:
+            logger.error(f"Job {job_id} failed: {e}")
+            for node_progress in progress.values():
+                if node_progress["status"] == "running":
+                    node_progress["status"] = "failed"
+            fields = {"status": "failed", "progress": progress, "error": str(e)}
+        try:
+            await asyncio.to_thread(self.store.update, job_id, finished_at=time.time(), inputs=None, **fields)
+        except Exception as e:
+            logger.error(f"Error recording the outcome of job {job_id}: {e}")
+        await asyncio.to_thread(self._finished, inputs)
+
+    def _finished(self, inputs: Dict[str, Any]):
+        if self.on_finish:
+            try:
+                self.on_finish(inputs)
+            except Exception as e:
+                logger.error(f"Error cleaning up after a job: {e}")
+
+    async def subscribe(self, job_id: str, keepalive_seconds: float = 15.0) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """Yield a snapshot on every change until the job finishes; None marks a keep-alive tick"""
+        seen = -1
+        idle = 0.0
+        while True:
+            version = await asyncio.to_thread(self.store.version, job_id)
+            if version is None:
+                return
+            if version != seen:
+                seen = version
+                idle = 0.0
+                job = await self.get(job_id)
+                if job is None:
+                    return
+                yield job
+                if job["status"] in ("succeeded", "failed"):
+                    return
+            elif idle >= keepalive_seconds:
+                idle = 0.0
+                yield None
+            await asyncio.sleep(self.poll_seconds)
+            idle += self.poll_seconds
+
+    async def stats(self) -> Dict[str, int]:
+        await asyncio.to_thread(self.store.purge, self.ttl_seconds)
+        statuses = await asyncio.to_thread(self.store.counts)
+        return {
+            "workers": len(self._workers),
+            "queued": statuses.get("queued", 0),
+            "retained": sum(statuses.values()),
+            **statuses,
+        }
@@ -0,0 +1,76 @@
+from typing import Dict, Tuple
+from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
+import os
+import threading
+import logging
+
+from .registry import registry
+from .teachers import anil_prompt, kavita_prompt, raghav_prompt, mary_prompt
+
+logger = logging.getLogger(__name__)
+
+CHAT_MODEL = 'gemini-2.0-flash'
+
+TEACHER_PROMPTS = {
+    'Anil Deshmukh': anil_prompt,
+    'Kavita Iyer': kavita_prompt,
+    'Raghav Sharma': raghav_prompt,
+    'Mary Fernandes': mary_prompt,
+}
+
+_clients: Dict[Tuple[str, float], object] = {}
+_clients_lock = threading.Lock()
+
+
+def get_llm(model: str = CHAT_MODEL, temperature: float = 0.7):
+    """Shared Gemini client per (model, temperature).
+
+    The client owns its transport, so reusing it keeps connections warm
+    instead of building a fresh client for every message or graph node.
+    """
+    key = (model, temperature)
+    llm = _clients.get(key)
+    if llm is not None:
+        return llm
+    with _clients_lock:
+        llm = _clients.get(key)
+        if llm is None:
+            from langchain_google_genai import ChatGoogleGenerativeAI
+
+            api_key = os.getenv('GOOGLE_API_KEY')
+            if not api_key:
+                raise ValueError("GOOGLE_API_KEY environment variable is not set")
+            llm = ChatGoogleGenerativeAI(
+                model=model,
+                google_api_key=api_key,
+                temperature=temperature
+            )
+            _clients[key] = llm
+            logger.info(f"Google LLM {model} (temperature={temperature}) initialized")
+    return llm
+
+
+def build_teacher_chains():
+    """One prompt | llm.bind_tools chain per teacher persona"""
+    from .agent import tools
+
+    llm = get_llm(CHAT_MODEL).bind_tools(tools)
+    chains = {}
+    for teacher, system_prompt in TEACHER_PROMPTS.items():
+        prompt_template = ChatPromptTemplate.from_messages([
+            ("system", system_prompt + "{summary}"),
+            MessagesPlaceholder("history", optional=True),
+            ("user", "{input}"),
+            # The model's tool calls for this question and their results, when answering after a search
+            MessagesPlaceholder("tool_turn", optional=True)
+        ])
+        chains[teacher] = prompt_template | llm
+    return chains
+
+registry.register("teacher_chains", build_teacher_chains)
+
+
+def get_teacher_chain(teacher: str):
+    """Precompiled chain for a teacher; unknown names fall back to Mary Fernandes"""
+    chains = registry.get("teacher_chains")
+    return chains.get(teacher, chains['Mary Fernandes'])
@@ -0,0 +1,138 @@
+from typing import Any, Iterable, List, Optional, Tuple
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+import numpy as np
+import hashlib
+
+
+def chunk_id(text: str) -> str:
+    """Stable id for a chunk, derived from its text"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:32]
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    # Model output is usually normalized already; avoid copying an mmap'd matrix for nothing
+    if vectors.size == 0 or np.allclose(norms, 1.0, atol=1e-3):
+        return vectors
+    return vectors / np.maximum(norms, 1e-12)
+
+
+class NumpyVectorStore(VectorStore):
+    """Exact top-k retriever over a contiguous matrix of normalized embeddings.
+
+    A per-document index holds a few hundred chunks, where one matrix-vector
+    product plus argpartition beats an HNSW collection on both build time
+    and memory, and results are exact rather than approximate.
+    """
+
+    def __init__(self, embedding: Embeddings, texts: Optional[List[str]] = None,
+                 vectors: Optional[np.ndarray] = None, metadatas: Optional[List[dict]] = None,
+                 ids: Optional[List[str]] = None):
+        self._embedding = embedding
+        self.texts: List[str] = list(texts or [])
+        dim = vectors.shape[1] if vectors is not None and vectors.ndim == 2 else 0
+        self.matrix = _normalize(np.asarray(vectors, dtype=np.float32)) if vectors is not None and len(self.texts) else np.zeros((0, dim), dtype=np.float32)
+        self.metadatas: List[dict] = list(metadatas) if metadatas else [{} for _ in self.texts]
+        self.ids: List[str] = list(ids) if ids else [chunk_id(t) for t in self.texts]
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self._embedding
+
+    def add_embeddings(self, texts: List[str], vectors: np.ndarray,
+                       metadatas: Optional[List[dict]] = None, ids: Optional[List[str]] = None) -> List[str]:
+        """Append chunks whose vectors are already known"""
+        texts = list(texts)
+        if not texts:
+            return []
+        vectors = _normalize(np.asarray(vectors, dtype=np.float32))
+        ids = list(ids) if ids else [chunk_id(t) for t in texts]
+        self.matrix = np.vstack([self.matrix, vectors]) if len(self.texts) else np.ascontiguousarray(vectors)
+        self.texts.extend(texts)
+        self.metadatas.extend(metadatas or [{} for _ in texts])
+        self.ids.extend(ids)
+        return ids
+
+    def add_texts(self, texts: Iterable[str], metadatas: Optional[List[dict]] = None,
+                  ids: Optional[List[str]] = None, **kwargs: Any) -> List[str]:
+        texts = list(texts)
+        if not texts:
+            return []
+        vectors = np.asarray(self._embedding.embed_documents(texts), dtype=np.float32)
+        return self.add_embeddings(texts, vectors, metadatas, ids)
+
+    def delete(self, ids: Optional[List[str]] = None, **kwargs: Any) -> Optional[bool]:
+        if not ids:
+            return False
+        drop = set(ids)
+        keep = [i for i, existing in enumerate(self.ids) if existing not in drop]
+        if len(keep) == len(self.ids):
+            return False
+        self.matrix = self.matrix[keep]
+        self.texts = [self.texts[i] for i in keep]
+        self.metadatas = [self.metadatas[i] for i in keep]
+        self.ids = [self.ids[i] for i in keep]
+        return True
+
+    def get_by_ids(self, ids: List[str]) -> List[Document]:
+        positions = {existing: i for i, existing in enumerate(self.ids)}
+        return [
+            Document(id=self.ids[positions[i]], page_content=self.texts[positions[i]], metadata=self.metadatas[positions[i]])
+            for i in ids if i in positions
+        ]
+
+    def _top_k(self, query_vector: List[float], k: int) -> List[Tuple[int, float]]:
+        if not self.texts:
+            return []
+        query = _normalize(np.asarray(query_vector, dtype=np.float32))
+        scores = self.matrix @ query
+        k = min(k, len(scores))
+        if k < len(scores):
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(len(scores))
+        top = top[np.argsort(-scores[top])]
+        return [(int(i), float(scores[i])) for i in top]
+
+    def _document(self, position: int) -> Document:
+        return Document(id=self.ids[position], page_content=self.texts[position], metadata=self.metadatas[position])
+
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 4, **kwargs: Any) -> List[Document]:
+        return [self._document(i) for i, _ in self._top_k(embedding, k)]
+
+    def similarity_search_with_score_by_vector(self, embedding: List[float], k: int = 4) -> List[Tuple[Document, float]]:
+        return [(self._document(i), score) for i, score in self._top_k(embedding, k)]
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs: Any) -> List[Document]:
+        return self.similarity_search_by_vector(self._embedding.embed_query(query), k)
+
+    def similarity_search_with_score(self, query: str, k: int = 4, **kwargs: Any) -> List[Tuple[Document, float]]:
+        return self.similarity_search_with_score_by_vector(self._embedding.embed_query(query), k)
+
+    def _select_relevance_score_fn(self):
+        # Scores are cosine similarities already
+        return lambda score: score
+
+    def nbytes(self) -> int:
+        """Resident size of vectors and chunk text"""
+        return int(self.matrix.nbytes) + sum(len(t.encode("utf-8")) for t in self.texts)
+
+    def delete_collection(self):
+        """Release everything; mirrors Chroma so callers can treat both alike"""
+        self.matrix = np.zeros((0, self.matrix.shape[1] if self.matrix.ndim == 2 else 0), dtype=np.float32)
+        self.texts, self.metadatas, self.ids = [], [], []
+
+    @classmethod
+    def from_arrays(cls, texts: List[str], vectors: np.ndarray, embedding: Embeddings,
+                    metadatas: Optional[List[dict]] = None, ids: Optional[List[str]] = None) -> "NumpyVectorStore":
+        """Build from precomputed vectors, e.g. a memory-mapped persisted index"""
+        return cls(embedding, texts, vectors, metadatas, ids)
+
+    @classmethod
+    def from_texts(cls, texts: List[str], embedding: Embeddings, metadatas: Optional[List[dict]] = None,
+                   ids: Optional[List[str]] = None, **kwargs: Any) -> "NumpyVectorStore":
+        texts = list(texts)
+        vectors = np.asarray(embedding.embed_documents(texts), dtype=np.float32) if texts else None
+        return cls(embedding, texts, vectors, metadatas, ids)
@@ -0,0 +1,128 @@
+from typing import Any, Callable, Dict, List, Optional
+import asyncio
+import threading
+import time
+import logging
+
+from .config import WARMUP_RETRY_SECONDS, WARMUP_MAX_RETRY_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+class _Component:
+    __slots__ = ("factory", "warm", "instance", "loaded", "warmed", "degraded", "seconds", "error", "lock")
+
+    def __init__(self, factory: Callable[[], Any], warm: Optional[Callable[[Any], None]]):
+        self.factory = factory
+        self.warm = warm
+        self.instance = None
+        self.loaded = False
+        self.warmed = False
+        # Loaded, but its warm callback failed; usable, the first request pays for the lazy setup
+        self.degraded = False
+        self.seconds = 0.0
+        self.error: Optional[str] = None
+        self.lock = threading.Lock()
+
+
+class ComponentRegistry:
+    """Heavy components (models, graphs, clients) built on first use.
+
+    Modules register a factory at import time, which is cheap; the object
+    is only built when `get` is first called or when `warm_up` runs in the
+    background after startup. An optional `warm` callback exercises the
+    component once (e.g. a dummy embedding) so the first real request
+    doesn't pay for lazy initialisation inside the library either.
+
+    A component that fails to load is retried with backoff; one that loads
+    but fails its warm callback counts as ready but degraded, with the
+    error reported by `status`.
+    """
+
+    def __init__(self):
+        self._components: Dict[str, _Component] = {}
+
+    def register(self, name: str, factory: Callable[[], Any], warm: Optional[Callable[[Any], None]] = None):
+        self._components[name] = _Component(factory, warm)
+
+    def get(self, name: str) -> Any:
+        component = self._components[name]
+        if component.loaded:
+            return component.instance
+        with component.lock:
+            if not component.loaded:
+                started = time.perf_counter()
+                try:
+                    component.instance = component.factory()
+                except Exception as e:
+                    component.error = str(e)
+                    raise
+                component.seconds += time.perf_counter() - started
+                component.loaded = True
+                component.error = None
+                logger.info(f"Loaded component '{name}' in {component.seconds:.2f}s")
+        return component.instance
+
+    def is_loaded(self, name: str) -> bool:
+        return self._components[name].loaded
+
+    def _warm(self, name: str):
+        component = self._components[name]
+        instance = self.get(name)
+        if component.warm and not component.warmed:
+            started = time.perf_counter()
+            try:
+                component.warm(instance)
+            except Exception as e:
+                component.degraded = True
+                component.error = str(e)
+                logger.error(f"Warm-up failed for component '{name}', serving it cold: {e}")
+                return
+            finally:
+                component.seconds += time.perf_counter() - started
+            component.degraded = False
+            component.error = None
+        component.warmed = True
+
+    async def warm_up(self, names: Optional[List[str]] = None):
+        """Build and exercise components off the event loop, retrying failed loads with backoff"""
+        pending = list(names or self._components)
+        delay = WARMUP_RETRY_SECONDS
+        while True:
+            failed = []
+            for name in pending:
+                try:
+                    await asyncio.to_thread(self._warm, name)
+                except Exception as e:
+                    self._components[name].error = str(e)
+                    logger.error(f"Loading component '{name}' failed: {e}")
+                if not self._components[name].loaded:
+                    failed.append(name)
+            if not failed:
+                break
+            logger.info(f"Retrying components {failed} in {delay:.0f}s")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, WARMUP_MAX_RETRY_SECONDS)
+            pending = failed
+        logger.info("Component warm-up finished")
+
+    def ready(self) -> bool:
+        return all(c.loaded and (c.warmed or c.degraded or not c.warm) for c in self._components.values())
+
+    def degraded(self) -> bool:
+        return any(c.degraded for c in self._components.values())
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            name: {
+                "loaded": c.loaded,
+                "warm": c.loaded and (c.warmed or not c.warm),
+                "degraded": c.degraded,
+                "seconds": round(c.seconds, 3),
+                "error": c.error,
+            }
+            for name, c in self._components.items()
+        }
+
+
+registry = ComponentRegistry()
@@ -0,0 +1,133 @@
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+import itertools
+import threading
+import time
+import logging
+
+from .config import RESPONSE_CACHE_THRESHOLD, RESPONSE_CACHE_TTL_SECONDS, RESPONSE_CACHE_MAX_ENTRIES
+
+logger = logging.getLogger(__name__)
+
+
+class _Entry:
+    __slots__ = ("id", "partition", "vector", "question", "answer", "created_at")
+
+    def __init__(self, entry_id: int, partition: Tuple[str, str], vector: np.ndarray, question: str, answer: str):
+        self.id = entry_id
+        self.partition = partition
+        self.vector = vector
+        self.question = question
+        self.answer = answer
+        self.created_at = time.time()
+
+
+class SemanticResponseCache:
+    """Tutor answers reused for near-identical questions.
+
+    Entries are partitioned by (teacher, document content hash), so a hit
+    always comes from the same persona answering against the same notes.
+    Within a partition the closest cached question wins if its cosine
+    similarity reaches `threshold`. Entries expire after `ttl_seconds` and
+    the least recently used ones are dropped beyond `max_entries`.
+
+    The cache lives in this process's memory only: each uvicorn worker
+    keeps its own entries and a restart starts empty.
+    """
+
+    def __init__(self, threshold: float = RESPONSE_CACHE_THRESHOLD, ttl_seconds: int = RESPONSE_CACHE_TTL_SECONDS,
+                 max_entries: int = RESPONSE_CACHE_MAX_ENTRIES):
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[int, _Entry]" = OrderedDict()
+        self._partitions: Dict[Tuple[str, str], Dict[int, _Entry]] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def _normalize(vector) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _remove(self, entry: _Entry):
+        self._entries.pop(entry.id, None)
+        partition = self._partitions.get(entry.partition)
+        if partition is not None:
+            partition.pop(entry.id, None)
+            if not partition:
+                del self._partitions[entry.partition]
+
+    def _expire(self):
+        cutoff = time.time() - self.ttl_seconds
+        for entry in [e for e in self._entries.values() if e.created_at < cutoff]:
+            self._remove(entry)
+            self.expirations += 1
+
+    def lookup(self, teacher: str, doc_hash: Optional[str], vector) -> Optional[Dict[str, Any]]:
+        """Cached answer and its provenance, or None"""
+        query = self._normalize(vector)
+        with self._lock:
+            self._expire()
+            candidates: List[_Entry] = list(self._partitions.get((teacher, doc_hash or ""), {}).values())
+            if candidates:
+                scores = np.stack([e.vector for e in candidates]) @ query
+                best = int(np.argmax(scores))
+                if scores[best] >= self.threshold:
+                    entry = candidates[best]
+                    self._entries.move_to_end(entry.id)
+                    self.hits += 1
+                    return {
+                        "answer": entry.answer,
+                        "provenance": {
+                            "hit": True,
+                            "entry_id": entry.id,
+                            "similarity": round(float(scores[best]), 4),
+                            "cached_question": entry.question,
+                            "age_seconds": round(time.time() - entry.created_at, 1),
+                        },
+                    }
+            self.misses += 1
+        return None
+
+    def store(self, teacher: str, doc_hash: Optional[str], vector, question: str, answer: str) -> int:
+        partition = (teacher, doc_hash or "")
+        with self._lock:
+            entry = _Entry(next(self._ids), partition, self._normalize(vector), question, answer)
+            self._entries[entry.id] = entry
+            self._partitions.setdefault(partition, {})[entry.id] = entry
+            while len(self._entries) > self.max_entries:
+                _, oldest = next(iter(self._entries.items()))
+                self._remove(oldest)
+                self.evictions += 1
+        return entry.id
+
+    def invalidate(self, doc_hash: str):
+        """Forget every answer given against a document"""
+        with self._lock:
+            for entry in [e for e in self._entries.values() if e.partition[1] == doc_hash]:
+                self._remove(entry)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "partitions": len(self._partitions),
+                "max_entries": self.max_entries,
+                "threshold": self.threshold,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+response_cache = SemanticResponseCache()
@@ -0,0 +1,82 @@
+from typing import Any, Dict, Optional, Type
+from pydantic import BaseModel
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import zlib
+import logging
+
+from .config import FLASHCARD_CACHE_ENABLED, FLASHCARD_CACHE_DIR, FLASHCARD_CACHE_MAX_BYTES
+from .disk_cache import DiskCache
+
+logger = logging.getLogger(__name__)
+
+
+def prompt_fingerprint(prompt, schema: Optional[Type[BaseModel]] = None) -> str:
+    """Hash of a chat prompt's templates and the output schema, so editing either invalidates results"""
+    parts = [
+        [type(message).__name__, getattr(getattr(message, "prompt", None), "template", str(message))]
+        for message in prompt.messages
+    ]
+    if schema is not None:
+        parts.append(schema.model_json_schema())
+    return hashlib.sha256(json.dumps(parts, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+
+class NodeResultCache:
+    """Persistent per-node cache of flashcard graph results.
+
+    Each node's state update is stored under hash(node, model, prompt
+    fingerprint, input content, instruction), so changing one node's prompt
+    or model only invalidates that node's entries. Entries share one
+    size-capped SQLite file with LRU eviction.
+    """
+
+    def __init__(self, cache: Optional[DiskCache] = None, enabled: bool = FLASHCARD_CACHE_ENABLED):
+        self.enabled = enabled
+        self.cache = cache or DiskCache(os.path.join(FLASHCARD_CACHE_DIR, "nodes.sqlite"), FLASHCARD_CACHE_MAX_BYTES)
+        self._counts: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(node: str, model: str, fingerprint: str, content: str, message: str) -> str:
+        content_hash = hashlib.sha256(content.encode("utf-8")).hexdigest()
+        return hashlib.sha256(
+            json.dumps([node, model, fingerprint, content_hash, message]).encode("utf-8")
+        ).hexdigest()
+
+    def _count(self, node: str, outcome: str):
+        with self._lock:
+            counts = self._counts.setdefault(node, {"hits": 0, "misses": 0, "stores": 0})
+            counts[outcome] += 1
+
+    async def get(self, node: str, key: str) -> Optional[Dict[str, Any]]:
+        blob = await asyncio.to_thread(self.cache.get, key)
+        if blob is None:
+            self._count(node, "misses")
+            return None
+        self._count(node, "hits")
+        return json.loads(zlib.decompress(blob).decode("utf-8"))
+
+    async def set(self, node: str, key: str, update: Dict[str, Any]):
+        try:
+            blob = zlib.compress(json.dumps(update).encode("utf-8"))
+        except TypeError as e:
+            logger.error(f"Result of node '{node}' is not cacheable: {e}")
+            return
+        await asyncio.to_thread(self.cache.set, key, blob)
+        self._count(node, "stores")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            nodes = {
+                node: {**counts, "hit_ratio": round(counts["hits"] / (counts["hits"] + counts["misses"]), 4)
+                       if counts["hits"] + counts["misses"] else 0.0}
+                for node, counts in self._counts.items()
+            }
+        return {"enabled": self.enabled, "nodes": nodes, "storage": self.cache.stats()}
+
+
+node_result_cache = NodeResultCache()
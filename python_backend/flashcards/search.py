@@ -0,0 +1,151 @@
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+import asyncio
+import hashlib
+import importlib
+import json
+import os
+import re
+import time
+import weakref
+import logging
+
+from .config import (
+    SEARCH_BACKEND, SEARCH_CACHE_DIR, SEARCH_CACHE_MAX_BYTES, SEARCH_CACHE_TTL_SECONDS,
+    SEARCH_TIMEOUT_SECONDS, SEARCH_MAX_CONCURRENCY,
+)
+from .disk_cache import DiskCache
+
+logger = logging.getLogger(__name__)
+
+# A backend takes the normalized query and returns the result text
+SearchBackend = Callable[[str], Awaitable[str]]
+
+
+class SerpApiBackend:
+    """SerpAPI over its async client; one wrapper shared by every search"""
+
+    def __init__(self):
+        self._wrapper = None
+
+    async def __call__(self, query: str) -> str:
+        if self._wrapper is None:
+            from langchain_community.utilities import SerpAPIWrapper
+            self._wrapper = SerpAPIWrapper()
+        return await self._wrapper.arun(query)
+
+
+def load_backend(spec: str) -> SearchBackend:
+    """"serpapi", or "package.module:attribute" naming an async callable (e.g. a local stub)"""
+    if spec == "serpapi":
+        return SerpApiBackend()
+    module_name, _, attribute = spec.partition(":")
+    return getattr(importlib.import_module(module_name), attribute)
+
+
+def normalize_query(query: str) -> str:
+    return re.sub(r"\s+", " ", query).strip().lower()
+
+
+class SearchService:
+    """Web search with a persistent cache, a timeout and a concurrency cap.
+
+    Results are cached on disk by normalized query for `ttl_seconds`, so
+    every worker process shares them. Identical queries in flight at the
+    same time share one backend call, at most `max_concurrency` backend
+    calls run at once, and each is abandoned after `timeout` seconds.
+    The shared call runs in its own task, so it carries on for the other
+    callers when the one that started it is cancelled.
+    """
+
+    def __init__(self, backend: Optional[SearchBackend] = None, cache: Optional[DiskCache] = None,
+                 ttl_seconds: int = SEARCH_CACHE_TTL_SECONDS, timeout: float = SEARCH_TIMEOUT_SECONDS,
+                 max_concurrency: int = SEARCH_MAX_CONCURRENCY):
+        self._backend = backend
+        self.cache = cache or DiskCache(os.path.join(SEARCH_CACHE_DIR, "search.sqlite"), SEARCH_CACHE_MAX_BYTES)
+        self.ttl_seconds = ttl_seconds
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        # Semaphores and tasks belong to one event loop, so each loop gets its own
+        # (semaphore, in-flight calls by query key) per loop
+        self._loops: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self.backend_calls = 0
+        self.deduplicated = 0
+        self.timeouts = 0
+        self.errors = 0
+
+    @property
+    def backend(self) -> SearchBackend:
+        if self._backend is None:
+            self._backend = load_backend(SEARCH_BACKEND)
+        return self._backend
+
+    def set_backend(self, backend: SearchBackend):
+        self._backend = backend
+
+    def _loop_state(self) -> Tuple[asyncio.Semaphore, Dict[str, asyncio.Task]]:
+        loop = asyncio.get_running_loop()
+        state = self._loops.get(loop)
+        if state is None:
+            state = self._loops[loop] = (asyncio.Semaphore(self.max_concurrency), {})
+        return state
+
+    async def search(self, query: str) -> str:
+        normalized = normalize_query(query)
+        key = hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+        cached = await asyncio.to_thread(self.cache.get, key)
+        if cached is not None:
+            entry = json.loads(cached)
+            if time.time() - entry["stored_at"] < self.ttl_seconds:
+                return entry["result"]
+
+        _, in_flight = self._loop_state()
+        task = in_flight.get(key)
+        if task is not None:
+            self.deduplicated += 1
+        else:
+            task = asyncio.get_running_loop().create_task(self._fetch(key, normalized))
+            in_flight[key] = task
+            task.add_done_callback(lambda done: self._fetched(key, done))
+        # Cancelling one caller leaves the shared call running for the others
+        return await asyncio.shield(task)
+
+    async def _fetch(self, key: str, query: str) -> str:
+        result = await self._call_backend(query)
+        entry = json.dumps({"result": result, "stored_at": time.time()}).encode("utf-8")
+        await asyncio.to_thread(self.cache.set, key, entry)
+        return result
+
+    def _fetched(self, key: str, task: asyncio.Task):
+        _, in_flight = self._loop_state()
+        if in_flight.get(key) is task:
+            del in_flight[key]
+        # Marked as retrieved so a failure nobody waited on isn't logged as unhandled
+        if not task.cancelled():
+            task.exception()
+
+    async def _call_backend(self, query: str) -> str:
+        semaphore, _ = self._loop_state()
+        async with semaphore:
+            self.backend_calls += 1
+            try:
+                return str(await asyncio.wait_for(self.backend(query), self.timeout))
+            except asyncio.TimeoutError:
+                self.timeouts += 1
+                raise TimeoutError(f"Search timed out after {self.timeout:g}s")
+            except Exception:
+                self.errors += 1
+                raise
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "backend_calls": self.backend_calls,
+            "deduplicated": self.deduplicated,
+            "in_flight": sum(len(in_flight) for _, in_flight in list(self._loops.values())),
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+            "cache": self.cache.stats(),
+        }
+
+
+search_service = SearchService()
@@ -0,0 +1,93 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional
+import functools
+import inspect
+import threading
+import time
+
+
+class RunTimings:
+    """Start and end of every graph node executed during one request"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.spans: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def record(self, node: str, start: float, end: float):
+        with self._lock:
+            self.spans.append({"node": node, "start": start - self.started, "end": end - self.started})
+
+    def critical_path(self) -> List[Dict[str, Any]]:
+        """Walk back from the last node to finish, each time to the node that finished just before it started"""
+        spans = sorted(self.spans, key=lambda s: s["end"])
+        if not spans:
+            return []
+        path = [spans[-1]]
+        while True:
+            blockers = [s for s in spans if s["end"] <= path[-1]["start"] + 1e-4 and s is not path[-1]]
+            if not blockers:
+                break
+            path.append(max(blockers, key=lambda s: s["end"]))
+        return list(reversed(path))
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            spans = list(self.spans)
+        path = self.critical_path()
+        return {
+            "wall_ms": round((time.perf_counter() - self.started) * 1000, 1),
+            # What the nodes would cost back to back, i.e. without any fan-out
+            "serial_ms": round(sum(s["end"] - s["start"] for s in spans) * 1000, 1),
+            "critical_path": [s["node"] for s in path],
+            "critical_path_ms": round((path[-1]["end"] - path[0]["start"]) * 1000, 1) if path else 0.0,
+            "nodes": [
+                {"node": s["node"], "start_ms": round(s["start"] * 1000, 1), "duration_ms": round((s["end"] - s["start"]) * 1000, 1)}
+                for s in sorted(spans, key=lambda s: s["start"])
+            ],
+        }
+
+
+_current: ContextVar[Optional[RunTimings]] = ContextVar("run_timings", default=None)
+
+
+@contextmanager
+def track_timings() -> Iterator[RunTimings]:
+    """Collect node timings for graph runs started inside the block"""
+    timings = RunTimings()
+    token = _current.set(timings)
+    try:
+        yield timings
+    finally:
+        try:
+            _current.reset(token)
+        except ValueError:
+            # A streaming response may be closed from another context; the var dies with its task anyway
+            pass
+
+
+def timed(node: str) -> Callable:
+    """Record a graph node's span in the current request's timings, if any are being tracked"""
+    def decorator(fn: Callable) -> Callable:
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                timings, start = _current.get(), time.perf_counter()
+                try:
+                    return await fn(*args, **kwargs)
+                finally:
+                    if timings is not None:
+                        timings.record(node, start, time.perf_counter())
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            timings, start = _current.get(), time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                if timings is not None:
+                    timings.record(node, start, time.perf_counter())
+        return wrapper
+    return decorator
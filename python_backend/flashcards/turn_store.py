@@ -0,0 +1,39 @@
+from typing import Any, Dict, Hashable, Optional, Tuple
+import threading
+import time
+
+from .config import RETRIEVAL_TTL_SECONDS
+
+
+class TurnStore:
+    """Per-turn data handed from one graph node to a later one in the same run.
+
+    Lives in process memory instead of graph state, so it is never written to
+    a checkpoint. Entries a run never collects (cancelled or failed turns)
+    are dropped after `ttl_seconds`.
+    """
+
+    def __init__(self, ttl_seconds: int = RETRIEVAL_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[Hashable, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+
+    def put(self, key: Hashable, value: Any):
+        with self._lock:
+            self._purge()
+            self._entries[key] = (time.monotonic(), value)
+
+    def pop(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            self._purge()
+            entry = self._entries.pop(key, None)
+        return entry[1] if entry else None
+
+    def _purge(self):
+        cutoff = time.monotonic() - self.ttl_seconds
+        for key in [k for k, (stored_at, _) in self._entries.items() if stored_at < cutoff]:
+            del self._entries[key]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
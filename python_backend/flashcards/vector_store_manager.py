@@ -0,0 +1,187 @@
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional, Set
+import threading
+import time
+import logging
+
+from .config import VECTOR_STORE_MAX_BYTES, VECTOR_STORE_TTL_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# all-MiniLM-L6-v2 output size
+DEFAULT_EMBEDDING_DIM = 384
+
+
+def estimate_store_bytes(chunks: List[str], dim: int = DEFAULT_EMBEDDING_DIM) -> int:
+    """Rough resident size of an in-memory index over `chunks`.
+
+    Counts float32 vectors twice (HNSW graph plus the backing table), the
+    chunk text twice (document column plus FTS copy) and a fixed per-row
+    overhead for ids, metadata and graph links.
+    """
+    text_bytes = sum(len(chunk.encode("utf-8")) for chunk in chunks)
+    return len(chunks) * (dim * 4 * 2 + 512) + text_bytes * 2
+
+
+class _Entry:
+    __slots__ = ("store", "size", "last_access", "pins")
+
+    def __init__(self, store: Any, size: int):
+        self.store = store
+        self.size = size
+        self.last_access = time.monotonic()
+        self.pins: Set[str] = set()
+
+
+class VectorStoreManager:
+    """Holds per-document vector stores within a byte budget.
+
+    Stores are evicted least-recently-used first once the budget is
+    exceeded, and unconditionally after `ttl_seconds` without access.
+    Stores pinned by an in-flight request are never evicted; one that is
+    removed or replaced while pinned is released at its last unpin.
+    """
+
+    def __init__(self, max_bytes: int = VECTOR_STORE_MAX_BYTES, ttl_seconds: int = VECTOR_STORE_TTL_SECONDS,
+                 on_evict: Optional[Callable[[str, Any], None]] = None):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.on_evict = on_evict
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        # Entries taken out of the cache while still pinned, released at their last unpin
+        self._retired: Dict[str, List[_Entry]] = {}
+        self._lock = threading.RLock()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str, owner: Optional[str] = None) -> Optional[Any]:
+        """Resident store for `key`; with `owner`, it is returned already pinned"""
+        with self._lock:
+            self._expire()
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            entry.last_access = time.monotonic()
+            self._entries.move_to_end(key)
+            if owner is not None:
+                entry.pins.add(owner)
+            self.hits += 1
+            return entry.store
+
+    def put(self, key: str, store: Any, size_bytes: int, owner: Optional[str] = None) -> Any:
+        """Insert a store, pinned for `owner` if given; the new entry itself is never evicted to make room"""
+        with self._lock:
+            old = self._entries.pop(key, None)
+            entry = _Entry(store, size_bytes)
+            if old is not None:
+                self.total_bytes -= old.size
+                if old.store is store:
+                    entry.pins = old.pins
+                else:
+                    self._retire(key, old)
+            if owner is not None:
+                entry.pins.add(owner)
+            self._entries[key] = entry
+            self.total_bytes += size_bytes
+            self._expire()
+            self._shrink(keep=key)
+            return store
+
+    def discard(self, key: str) -> bool:
+        """Remove `key`; its store is released now, or at the last unpin if in use"""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return False
+            self.total_bytes -= entry.size
+            self._retire(key, entry)
+            return True
+
+    def pin(self, key: str, owner: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.pins.add(owner)
+
+    def unpin(self, key: str, owner: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and owner in entry.pins:
+                entry.pins.discard(owner)
+            else:
+                retired = self._retired.get(key, [])
+                for old in [e for e in retired if owner in e.pins]:
+                    old.pins.discard(owner)
+                    if not old.pins:
+                        retired.remove(old)
+                        self._release(key, old.store)
+                if not retired:
+                    self._retired.pop(key, None)
+            self._shrink()
+
+    @contextmanager
+    def pinned(self, key: str, owner: str):
+        """Keep `key` resident while `owner` is using it"""
+        self.pin(key, owner)
+        try:
+            yield
+        finally:
+            self.unpin(key, owner)
+
+    def _evict(self, key: str, expired: bool = False):
+        entry = self._entries.pop(key)
+        self.total_bytes -= entry.size
+        if expired:
+            self.expirations += 1
+        else:
+            self.evictions += 1
+        logger.info(f"{'Expired' if expired else 'Evicted'} vector store {key} ({entry.size} bytes)")
+        self._release(key, entry.store)
+
+    def _retire(self, key: str, entry: _Entry):
+        if entry.pins:
+            self._retired.setdefault(key, []).append(entry)
+        else:
+            self._release(key, entry.store)
+
+    def _release(self, key: str, store: Any):
+        if self.on_evict:
+            try:
+                self.on_evict(key, store)
+            except Exception as e:
+                logger.error(f"Error releasing vector store {key}: {e}")
+
+    def _expire(self):
+        deadline = time.monotonic() - self.ttl_seconds
+        for key in [k for k, e in self._entries.items() if e.last_access < deadline and not e.pins]:
+            self._evict(key, expired=True)
+
+    def _shrink(self, keep: Optional[str] = None):
+        # Oldest entries come first in the OrderedDict
+        for key in list(self._entries):
+            if self.total_bytes <= self.max_bytes:
+                break
+            if key != keep and not self._entries[key].pins:
+                self._evict(key)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "stores": len(self._entries),
+                "pinned": sum(1 for e in self._entries.values() if e.pins),
+                "retired": sum(len(entries) for entries in self._retired.values()),
+                "bytes": self.total_bytes,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
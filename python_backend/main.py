@@ -1,4 +1,4 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException, Form
+from fastapi import FastAPI, File, UploadFile, HTTPException, Form, BackgroundTasks
 from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
@@ -10,10 +10,20 @@ import os
 import uuid
 import logging
 from datetime import datetime
-from flashcards.flashcard_agent import graph
-from flashcards.agent import agent
+from flashcards.flashcard_agent import get_graph, GENERATION_MODES
+from flashcards.agent import get_agent, prepare_pdf_rag, reindex_revision, vector_stores, embedding_service, checkpoint_stats, compact_checkpoints
 from langchain_core.messages import HumanMessage
-from flashcards.video_agent import graph_story
+from flashcards.video_agent import get_graph_story
+from flashcards.registry import registry
+from flashcards.documents import document_store
+from flashcards.config import ALLOWED_EXTENSIONS, EMBEDDING_MODEL_KEY, CHECKPOINT_BACKEND, CHECKPOINT_COMPACT_INTERVAL_SECONDS, FLASHCARD_JOB_UPLOAD_DIR
+from flashcards.index_store import index_store
+from flashcards.response_cache import response_cache
+from flashcards.search import search_service
+from flashcards.result_cache import node_result_cache
+from flashcards.timings import track_timings
+from flashcards.jobs import GraphJobManager, JobQueueFull
+from flashcards.executors import executor_stats, shutdown_executors
 
 app = FastAPI(title="Teacher Agent API", version="1.0.0")
 
@@ -32,6 +42,8 @@ class ChatRequest(BaseModel):
     message: str
     teacher: str = "Anil Deshmukh"
     thread_id: str = "default"
+    doc_id: Optional[str] = None
+    stream: bool = False
 
 class ChatWithPDFRequest(BaseModel):
     message: str
@@ -49,6 +61,118 @@ class HistoryResponse(BaseModel):
 
 uploaded_files = {}
 
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+def sse_event(event: str, data: dict) -> str:
+    """Format one server-sent event frame"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def chunk_text(chunk) -> str:
+    """Text carried by a streamed message chunk, whitespace preserved"""
+    content = getattr(chunk, 'content', '')
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return ''.join(
+            item.get('text', '') if isinstance(item, dict) else str(item)
+            for item in content
+        )
+    return ''
+
+async def stream_agent_events(state: dict, thread_id: str, extra: dict):
+    """Run the agent and relay retrieval, token and final frames as SSE"""
+    config = {"configurable": {"thread_id": thread_id}}
+    try:
+        with track_timings() as timings:
+            async for event in get_agent().astream_events(state, config=config, version="v2"):
+                kind = event["event"]
+                if kind == "on_custom_event" and event["name"] == "retrieval":
+                    yield sse_event("retrieval", event["data"])
+                elif kind == "on_chat_model_stream" and event.get("metadata", {}).get("langgraph_node") == "chat":
+                    text = chunk_text(event["data"]["chunk"])
+                    if text:
+                        yield sse_event("token", {"text": text})
+
+        snapshot = await get_agent().aget_state(config)
+        last_message = snapshot.values['messages'][-1]
+        yield sse_event("done", {
+            "status": "success",
+            "thread_id": thread_id,
+            **extra,
+            "response": extract_message_content(last_message),
+            "cache": last_message.response_metadata.get("cache"),
+            "timings": timings.summary()
+        })
+    except Exception as e:
+        logger.error(f"Error while streaming agent response: {e}")
+        yield sse_event("error", {"status": "error", "detail": str(e)})
+
+def forget_document(doc_id: str):
+    """Drop everything derived from a document that is gone from the store"""
+    index_store.delete(doc_id, EMBEDDING_MODEL_KEY)
+    response_cache.invalidate(doc_id)
+    # A store still being queried is released once its last reader unpins it
+    vector_stores.discard(doc_id)
+
+# Documents pushed out by the store's disk budget take their indexes and cached answers with them
+document_store.on_evict = forget_document
+
+async def index_document(doc_id: str, previous_doc_id: Optional[str] = None):
+    """Build the vector index for a freshly uploaded document"""
+    try:
+        await prepare_pdf_rag(doc_id, previous_doc_id=previous_doc_id)
+    except Exception as e:
+        logger.error(f"Error indexing document {doc_id}: {e}")
+
+@app.post("/documents")
+async def create_document(
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    previous_doc_id: Optional[str] = Form(None)
+):
+    """Upload a document once and get a doc_id to chat against.
+
+    Pass `previous_doc_id` when uploading a revision so unchanged chunks keep their embeddings.
+    """
+    file_extension = os.path.splitext(file.filename.lower())[1]
+    if file_extension not in ALLOWED_EXTENSIONS:
+        return JSONResponse(
+            {"status": "error", "detail": "Only PDF, DOCX, and PPTX files are supported"},
+            status_code=400
+        )
+    if previous_doc_id and not document_store.get(previous_doc_id):
+        return JSONResponse({"status": "error", "detail": "Previous document not found"}, status_code=404)
+
+    try:
+        content = await file.read()
+        record = await asyncio.to_thread(document_store.save, content, file.filename)
+        # Index in the background so the first question doesn't pay for it
+        background_tasks.add_task(index_document, record["doc_id"], previous_doc_id)
+        return JSONResponse({"status": "success", **record})
+    except Exception as e:
+        logger.error(f"Error storing document: {e}")
+        return JSONResponse(
+            {"status": "error", "detail": str(e)},
+            status_code=500
+        )
+
+@app.get("/documents/{doc_id}")
+async def get_document(doc_id: str):
+    """Return the stored record for a document"""
+    record = document_store.get(doc_id)
+    if not record:
+        return JSONResponse({"status": "error", "detail": "Document not found"}, status_code=404)
+    # Includes the embedding cache hit ratio once the index has been built
+    return JSONResponse({"status": "success", **record, "index": index_store.meta(doc_id, EMBEDDING_MODEL_KEY)})
+
+@app.delete("/documents/{doc_id}")
+async def delete_document(doc_id: str):
+    """Delete a stored document along with its persisted and in-memory index"""
+    if not document_store.delete(doc_id):
+        return JSONResponse({"status": "error", "detail": "Document not found"}, status_code=404)
+    forget_document(doc_id)
+    return JSONResponse({"status": "success", "doc_id": doc_id})
+
 @app.post("/chat")
 async def chat_endpoint(request: ChatRequest):
     """Simple chat endpoint"""
@@ -56,10 +180,23 @@ async def chat_endpoint(request: ChatRequest):
         state = {
             "messages": [HumanMessage(content=request.message)],
             "teacher": request.teacher,
-            "pdf_path": None,
         }
+        # Without a doc_id the thread keeps whatever document it was using
+        if request.doc_id:
+            if not document_store.get(request.doc_id):
+                return JSONResponse({"status": "error", "detail": "Document not found"}, status_code=404)
+            state["doc_id"] = request.doc_id
+
+        if request.stream:
+            return StreamingResponse(
+                stream_agent_events(state, request.thread_id, {"doc_id": request.doc_id}),
+                media_type="text/event-stream",
+                headers=SSE_HEADERS
+            )
 
-        result = await agent.ainvoke(state, config={"configurable": {"thread_id": request.thread_id}})
+        with track_timings() as timings:
+            result = await get_agent().ainvoke(state, config={"configurable": {"thread_id": request.thread_id}})
+        logger.info(f"Agent run for thread {request.thread_id}: {timings.summary()}")
 
         if isinstance(result, dict) and 'messages' in result:
             response = result['messages'][-1]
@@ -68,7 +205,10 @@ async def chat_endpoint(request: ChatRequest):
             return JSONResponse({
                 "status": "success",
                 "thread_id": request.thread_id,
-                "response": response_content
+                "doc_id": result.get("doc_id"),
+                "response": response_content,
+                "cache": response.response_metadata.get("cache"),
+                "timings": timings.summary()
             })
         else:
             raise ValueError("Invalid response format from graph")
@@ -134,59 +274,82 @@ def extract_message_content(message):
 
 @app.post("/upload-and-chat")
 async def upload_and_chat_endpoint(
-    file: UploadFile = File(...),
+    file: Optional[UploadFile] = File(None),
     message: str = Form(...),
     teacher: str = Form("Anil Deshmukh"),
-    thread_id: Optional[str] = Form(None)
+    thread_id: Optional[str] = Form(None),
+    doc_id: Optional[str] = Form(None),
+    stream: bool = Form(False)
 ):
-    """Upload document and chat endpoint - supports PDF, DOCX, and PPTX"""
-    logger.info(f"Received request - thread_id: {thread_id}, message: {message}, teacher: {teacher}")
-    logger.info(f"File received: {file.filename}")
-    
+    """Upload document (or reference a stored doc_id) and chat endpoint - supports PDF, DOCX, and PPTX"""
+    logger.info(f"Received request - thread_id: {thread_id}, message: {message}, teacher: {teacher}, doc_id: {doc_id}")
+
     # Generate thread_id if not provided
     if thread_id is None:
         thread_id = str(uuid.uuid4())
         logger.info(f"Generated new thread_id: {thread_id}")
 
-    temp_file_path = None
+    reindex = None
     try:
-        # Validate file type
-        allowed_extensions = ['.pdf', '.docx', '.pptx']
-        file_extension = os.path.splitext(file.filename.lower())[1]
-        
-        if file_extension not in allowed_extensions:
+        if file is not None:
+            logger.info(f"File received: {file.filename}")
+            # Validate file type
+            file_extension = os.path.splitext(file.filename.lower())[1]
+
+            if file_extension not in ALLOWED_EXTENSIONS:
+                return JSONResponse(
+                    {"status": "error", "detail": "Only PDF, DOCX, and PPTX files are supported"},
+                    status_code=400
+                )
+
+            # Store uploaded file so its index survives across questions
+            content = await file.read()
+            record = await asyncio.to_thread(document_store.save, content, file.filename)
+
+            # A revised file on an existing thread only embeds the chunks that changed
+            snapshot = await get_agent().aget_state({"configurable": {"thread_id": thread_id}})
+            previous_doc_id = snapshot.values.get("doc_id")
+            if previous_doc_id and previous_doc_id != record["doc_id"]:
+                reindex = await reindex_revision(record["doc_id"], previous_doc_id)
+        elif doc_id:
+            record = document_store.get(doc_id)
+            if not record:
+                return JSONResponse({"status": "error", "detail": "Document not found"}, status_code=404)
+        else:
             return JSONResponse(
-                {"status": "error", "detail": "Only PDF, DOCX, and PPTX files are supported"},
+                {"status": "error", "detail": "Either a file or a doc_id is required"},
                 status_code=400
             )
 
-        # Save uploaded file
-        content = await file.read()
-        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=file_extension)
-        temp_file.write(content)
-        temp_file.close()
-        temp_file_path = temp_file.name
-
-        uploaded_files[thread_id] = temp_file_path
-
         # Build state for chat with document
         state = {
             "messages": [HumanMessage(content=message)],
             "teacher": teacher,
-            "pdf_path": temp_file_path,
-            "user_id": thread_id
+            "doc_id": record["doc_id"],
         }
 
+        if stream:
+            return StreamingResponse(
+                stream_agent_events(state, thread_id, {"doc_id": record["doc_id"], "filename": record["filename"], "reindex": reindex}),
+                media_type="text/event-stream",
+                headers=SSE_HEADERS
+            )
+
         # Execute graph directly
-        result = await agent.ainvoke(state, config={"configurable": {"thread_id": thread_id}})
+        with track_timings() as timings:
+            result = await get_agent().ainvoke(state, config={"configurable": {"thread_id": thread_id}})
         print("got the info: ", result)
         if result:
             points = result['messages'][-1].content
             return JSONResponse({
                 "status": "success",
                 "thread_id": thread_id,
-                "filename": file.filename,
-                "response": points
+                "doc_id": record["doc_id"],
+                "filename": record["filename"],
+                "reindex": reindex,
+                "response": points,
+                "cache": result['messages'][-1].response_metadata.get("cache"),
+                "timings": timings.summary()
             })
         else:
             raise ValueError("Invalid response format from graph")
@@ -197,22 +360,93 @@ async def upload_and_chat_endpoint(
             {"status": "error", "detail": str(e)},
             status_code=500
         )
-    finally:
-        if temp_file_path and os.path.exists(temp_file_path):
-            try:
-                os.unlink(temp_file_path)
-                uploaded_files.pop(thread_id, None)
-            except Exception as e:
-                logger.error(f"Error cleaning up temp file: {e}")
+
+def invalid_mode_response(mode: str) -> Optional[JSONResponse]:
+    """400 for a generation mode the flashcard graph doesn't know"""
+    if mode in GENERATION_MODES:
+        return None
+    return JSONResponse(
+        {"status": "error", "detail": f"mode must be one of: {', '.join(GENERATION_MODES)}"},
+        status_code=400,
+    )
+
+def format_flashcard_result(result: dict) -> dict:
+    """Turn the flashcard graph's aggregated output into the API response shape"""
+    # Node failures leave None behind; empty entries are dropped
+    cards = (result.get('flashcards') or {}).get('cards', [])
+    questions = (result.get('quiz') or {}).get('questions', [])
+    flashcards = [card for card in cards if card.get('question')]
+    quiz = [question for question in questions if question.get('question')]
+
+    return {
+        "flashcards": flashcards,
+        'quiz': quiz,
+        'summary': result['summarize'],
+        "important": result['important'],
+        "digest": result.get('digest'),
+        "mode": result.get('mode'),
+    }
+
+def format_flashcard_job_result(output: dict) -> dict:
+    """Result of a background flashcard job; output is the aggregating node's update"""
+    formatted = format_flashcard_result(output['result'])
+    if not formatted["flashcards"]:
+        raise ValueError("No flashcards were generated")
+    return formatted
+
+def flashcard_job_state(inputs: dict) -> dict:
+    """Graph input for a stored flashcard job"""
+    return {
+        "messages": [HumanMessage(content=inputs["message"])],
+        "teacher": inputs["teacher"],
+        "pdf_path": inputs["pdf_path"],
+        "mode": inputs["mode"],
+    }
+
+def save_one_shot_upload(content: bytes, directory: Optional[str] = None) -> str:
+    """Write an upload needed for a single generation run; the caller removes it afterwards"""
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    fd, path = tempfile.mkstemp(suffix=".pdf", dir=directory)
+    with os.fdopen(fd, "wb") as f:
+        f.write(content)
+    return path
+
+def remove_one_shot_upload(path: Optional[str]):
+    if not path:
+        return
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        logger.error(f"Error removing temp file: {e}")
+
+def cleanup_flashcard_job(inputs: dict):
+    """Remove a finished job's upload"""
+    remove_one_shot_upload(inputs.get("pdf_path"))
+
+flashcard_jobs = GraphJobManager(
+    get_graph,
+    nodes=["extract", "digest", "study_pack", "quiz", "flashcards", "summarize", "important"],
+    result_node="chat",
+    format_result=format_flashcard_job_result,
+    build_state=flashcard_job_state,
+    on_finish=cleanup_flashcard_job,
+)
 
 @app.post("/flashcards")
 async def flashcard_generation(
     file: Optional[UploadFile] = None,
     message: str = Form("Generate flashcards from the following content"),  # Use Form
     teacher: str = Form("Anil Deshmukh"),  # Use Form
-    thread_id: Optional[str] = Form(None)  # Use Form
+    thread_id: Optional[str] = Form(None),  # Use Form
+    mode: str = Form("auto")  # "auto", "combined" or "fanout"
 ):
     """Direct flashcard generation endpoint"""
+    invalid = invalid_mode_response(mode)
+    if invalid:
+        return invalid
     if thread_id is None:
         thread_id = str(uuid.uuid4())
 
@@ -242,44 +476,22 @@ async def flashcard_generation(
             "messages": [HumanMessage(content=message)],
             "teacher": teacher,
             "pdf_path": temp_file_path,
+            "mode": mode,
         }
 
         # Generate flashcards
         try:
-            result = await graph.ainvoke(state)
+            result = await get_graph().ainvoke(state)
             print(result)
-            result = result['result']
-            flashcards = []
-            quiz = []
-            for i in range(1, 11):
-                question_key = f"question_{i}"
-                answer_key = f"answer_{i}"
-                
-                if result['flashcards'][question_key]:
-                    flashcards.append({
-                        "question": result['flashcards'][question_key],
-                        "answer": result['flashcards'][answer_key]
-                    })
-                if result['quiz'][question_key]:
-                    quiz.append({
-                        "question": result['quiz'][question_key],
-                        "options": result['quiz'][f"options_{i}"],
-                        "answer": result['quiz'][answer_key]
-                    })
-
-            if not flashcards:
+            formatted = format_flashcard_result(result['result'])
+
+            if not formatted["flashcards"]:
                 return JSONResponse(
                     {"status": "error", "detail": "No flashcards were generated"},
                     status_code=500
                 )
 
-            return JSONResponse({
-                "status": "success",
-                "flashcards": flashcards,
-                'quiz': quiz,
-                'summary': result['summarize'],
-                "important": result['important'],
-            })
+            return JSONResponse({"status": "success", **formatted})
 
         except Exception as e:
             logger.error(f"Error in graph invocation: {e}")
@@ -309,6 +521,136 @@ async def flashcard_generation(
             except Exception as e:
                 logger.error(f"Error removing temp directory: {e}")
 
+def ndjson_line(kind: str, data) -> str:
+    return json.dumps({"type": kind, "data": data}) + "\n"
+
+@app.post("/flashcards/stream")
+async def stream_flashcards(
+    file: Optional[UploadFile] = None,
+    message: str = Form("Generate flashcards from the following content"),
+    teacher: str = Form("Anil Deshmukh"),
+    mode: str = Form("auto"),
+):
+    """Stream flashcards, quiz items, the summary and important points as NDJSON lines as they are generated"""
+    invalid = invalid_mode_response(mode)
+    if invalid:
+        return invalid
+    pdf_path = None
+    if file:
+        if not file.filename.lower().endswith(".pdf"):
+            return JSONResponse(
+                {"status": "error", "detail": "Only PDF files supported"},
+                status_code=400,
+            )
+        # One-shot uploads stay out of the document store and are removed when the stream ends
+        pdf_path = await asyncio.to_thread(save_one_shot_upload, await file.read())
+        await file.close()
+
+    state = {
+        "messages": [HumanMessage(content=message)],
+        "teacher": teacher,
+        "pdf_path": pdf_path,
+        "mode": mode,
+    }
+
+    async def lines():
+        counts = {"flashcard": 0, "quiz_item": 0}
+        try:
+            result = None
+            async for event in get_graph().astream_events(state, version="v2"):
+                if event["event"] == "on_custom_event" and event["name"] in ("flashcard", "quiz_item", "summary", "important"):
+                    if event["name"] in counts:
+                        counts[event["name"]] += 1
+                    yield ndjson_line(event["name"], event["data"])
+                elif event["event"] == "on_chain_end" and event.get("name") == "LangGraph":
+                    result = event["data"].get("output", {}).get("result")
+            yield ndjson_line("done", {
+                "flashcards": counts["flashcard"],
+                "quiz": counts["quiz_item"],
+                "mode": (result or {}).get("mode"),
+                "digest": (result or {}).get("digest"),
+            })
+        except Exception as e:
+            logger.error(f"Error while streaming flashcards: {e}")
+            yield ndjson_line("error", {"detail": str(e)})
+        finally:
+            remove_one_shot_upload(pdf_path)
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson", headers=SSE_HEADERS)
+
+@app.post("/flashcards/jobs")
+async def create_flashcard_job(
+    file: Optional[UploadFile] = None,
+    message: str = Form("Generate flashcards from the following content"),
+    teacher: str = Form("Anil Deshmukh"),
+    mode: str = Form("auto"),
+):
+    """Start flashcard generation in the background and return a job id to poll"""
+    invalid = invalid_mode_response(mode)
+    if invalid:
+        return invalid
+    pdf_path = None
+    try:
+        if file:
+            if not file.filename.lower().endswith(".pdf"):
+                return JSONResponse(
+                    {"status": "error", "detail": "Only PDF files supported"},
+                    status_code=400,
+                )
+            # Outlives the request and is visible to every worker; removed once the job is over
+            pdf_path = await asyncio.to_thread(save_one_shot_upload, await file.read(), FLASHCARD_JOB_UPLOAD_DIR)
+            await file.close()
+
+        job = await flashcard_jobs.submit({
+            "message": message,
+            "teacher": teacher,
+            "pdf_path": pdf_path,
+            "mode": mode,
+        })
+        return JSONResponse({
+            "status": "success",
+            "job_id": job["job_id"],
+            "job_status": job["status"],
+            "status_url": f"/flashcards/jobs/{job['job_id']}",
+            "events_url": f"/flashcards/jobs/{job['job_id']}/events",
+        }, status_code=202)
+
+    except JobQueueFull as e:
+        remove_one_shot_upload(pdf_path)
+        return JSONResponse({"status": "error", "detail": str(e)}, status_code=503)
+    except Exception as e:
+        logger.error(f"Error creating flashcard job: {e}")
+        remove_one_shot_upload(pdf_path)
+        return JSONResponse({"status": "error", "detail": str(e)}, status_code=500)
+
+@app.get("/flashcards/jobs/{job_id}")
+async def get_flashcard_job(job_id: str):
+    """Progress of a flashcard job, and its result once finished"""
+    job = await flashcard_jobs.get(job_id)
+    if job is None:
+        return JSONResponse({"status": "error", "detail": "Job not found or expired"}, status_code=404)
+    return JSONResponse({"status": "success", **job})
+
+@app.get("/flashcards/jobs/{job_id}/events")
+async def flashcard_job_events(job_id: str):
+    """Server-sent progress frames for a flashcard job, ending with the result"""
+    if await flashcard_jobs.get(job_id) is None:
+        return JSONResponse({"status": "error", "detail": "Job not found or expired"}, status_code=404)
+
+    async def events():
+        async for snapshot in flashcard_jobs.subscribe(job_id):
+            if snapshot is None:
+                # Comment frame so idle proxies keep the connection open
+                yield ": keep-alive\n\n"
+            elif snapshot["status"] == "succeeded":
+                yield sse_event("done", snapshot)
+            elif snapshot["status"] == "failed":
+                yield sse_event("error", snapshot)
+            else:
+                yield sse_event("progress", snapshot)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
 @app.post("/story")
 async def story(
     file: UploadFile = File(...),
@@ -349,7 +691,7 @@ async def story(
         }
 
         # Execute graph directly
-        result = await graph_story.ainvoke(state, config={"configurable": {"thread_id": thread_id}})
+        result = await get_graph_story().ainvoke(state, config={"configurable": {"thread_id": thread_id}})
         
         if result['result']:
             response_content = result['result']['content']
@@ -382,14 +724,93 @@ async def health_check():
     """Health check endpoint"""
     return {"status": "healthy", "timestamp": datetime.now().isoformat()}
 
+@app.get("/metrics/executors")
+async def executor_metrics():
+    """Queue depth and throughput of the parse/embed/query pools"""
+    return {"status": "success", "executors": executor_stats()}
+
+@app.get("/metrics/vector-stores")
+async def vector_store_metrics():
+    """Residency, budget and hit/miss/eviction counters of the vector store manager"""
+    return {"status": "success", "vector_stores": vector_stores.stats()}
+
+@app.get("/metrics/embeddings")
+async def embedding_metrics():
+    """Micro-batching statistics of the embedding service"""
+    return {"status": "success", "embeddings": embedding_service.stats()}
+
+@app.get("/metrics/response-cache")
+async def response_cache_metrics():
+    """Hit ratio and size of the semantic answer cache"""
+    return {"status": "success", "response_cache": response_cache.stats()}
+
+@app.get("/metrics/search")
+async def search_metrics():
+    """Backend calls, deduplication, timeouts and cache state of the search tool"""
+    return {"status": "success", "search": search_service.stats()}
+
+@app.get("/metrics/flashcard-jobs")
+async def flashcard_job_metrics():
+    """Worker, queue and retention counts of the flashcard job manager"""
+    return {"status": "success", "jobs": await flashcard_jobs.stats()}
+
+@app.get("/metrics/flashcard-cache")
+async def flashcard_cache_metrics():
+    """Per-node hits and misses and storage use of the flashcard result cache"""
+    return {"status": "success", "flashcard_cache": node_result_cache.stats()}
+
+@app.get("/metrics/checkpoints")
+async def checkpoint_metrics():
+    """Checkpoint write sizes and latencies across all conversations"""
+    return {"status": "success", "checkpoints": checkpoint_stats()}
+
+@app.get("/metrics/checkpoints/{thread_id}")
+async def thread_checkpoint_metrics(thread_id: str):
+    """Checkpoint write sizes, latencies and resident bytes for one conversation"""
+    stats = checkpoint_stats(thread_id)
+    if stats is None:
+        return JSONResponse({"status": "error", "detail": "Thread not found"}, status_code=404)
+    return {"status": "success", "thread_id": thread_id, "checkpoints": stats}
+
+@app.get("/ready")
+async def readiness_check():
+    """Readiness endpoint: 200 once every heavy component is loaded and warm, or loaded but degraded"""
+    ready = registry.ready()
+    status = ("degraded" if registry.degraded() else "ready") if ready else "warming"
+    return JSONResponse(
+        {"status": status, "components": registry.status()},
+        status_code=200 if ready else 503
+    )
+
+async def compact_checkpoints_periodically():
+    """Expire idle conversations and reclaim checkpoint database space"""
+    while True:
+        await asyncio.sleep(CHECKPOINT_COMPACT_INTERVAL_SECONDS)
+        try:
+            await asyncio.to_thread(compact_checkpoints)
+        except Exception as e:
+            logger.error(f"Checkpoint compaction failed: {e}")
+
 @app.on_event("startup")
 async def startup_event():
     logger.info("Teacher Agent API starting up...")
+    # Load models and compile graphs in the background; /health answers immediately, /ready once done
+    app.state.warm_up_task = asyncio.create_task(registry.warm_up())
+    flashcard_jobs.start()
+    app.state.compaction_task = None
+    if CHECKPOINT_BACKEND == "sqlite":
+        app.state.compaction_task = asyncio.create_task(compact_checkpoints_periodically())
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     logger.info("Teacher Agent API shutting down...")
+    app.state.warm_up_task.cancel()
+    if app.state.compaction_task:
+        app.state.compaction_task.cancel()
+    await flashcard_jobs.stop()
+    await embedding_service.close()
+    shutdown_executors()
 
 
 if __name__ == "__main__":
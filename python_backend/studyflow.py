@@ -1,19 +1,15 @@
-from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain.prompts import ChatPromptTemplate
 from langchain_core.messages import HumanMessage, AIMessage
 from dotenv import load_dotenv
-import os
+from flashcards.llm import get_llm
 
 # Load environment variables
 load_dotenv()
 
 class StudyPlanGenerator:
     def __init__(self, model='gemini-pro'):
-        self.llm = ChatGoogleGenerativeAI(
-            model=model,
-            temperature=0.7,
-            google_api_key=os.getenv('GOOGLE_API_KEY')
-        )
+        # Shared client: generators created per request reuse one connection
+        self.llm = get_llm(model, temperature=0.7)
         
         # Define the prompt template
         self.prompt_template = ChatPromptTemplate.from_messages([
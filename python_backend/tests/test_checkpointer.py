@@ -0,0 +1,91 @@
+import operator
+import sqlite3
+from typing import Annotated, List, TypedDict
+
+import pytest
+
+pytest.importorskip("langgraph")
+from langgraph.graph import StateGraph, START, END
+
+from flashcards.checkpointer import SqliteCheckpointSaver
+
+
+class State(TypedDict):
+    log: Annotated[List[str], operator.add]
+    notes: str
+
+
+def build_graph(saver):
+    graph = StateGraph(State)
+    graph.add_node("step", lambda state: {"log": ["step"]})
+    graph.add_edge(START, "step")
+    graph.add_edge("step", END)
+    return graph.compile(checkpointer=saver)
+
+
+def test_state_round_trips_through_a_new_saver(tmp_path):
+    path = str(tmp_path / "checkpoints.sqlite")
+    config = {"configurable": {"thread_id": "thread-1"}}
+    build_graph(SqliteCheckpointSaver(path, ttl_seconds=3600)).invoke({"log": ["hello"], "notes": "n" * 1000}, config)
+
+    # A second saver on the same file stands in for another worker process
+    state = build_graph(SqliteCheckpointSaver(path, ttl_seconds=3600)).get_state(config)
+
+    assert state.values == {"log": ["hello", "step"], "notes": "n" * 1000}
+
+
+def test_unchanged_channels_are_stored_once(tmp_path):
+    path = str(tmp_path / "checkpoints.sqlite")
+    app = build_graph(SqliteCheckpointSaver(path, ttl_seconds=3600))
+    config = {"configurable": {"thread_id": "thread-1"}}
+    app.invoke({"log": ["a"], "notes": "n" * 1000}, config)
+    for turn in range(3):
+        app.invoke({"log": [str(turn)]}, config)
+
+    with sqlite3.connect(path) as conn:
+        rows = dict(conn.execute("SELECT channel, COUNT(*) FROM blobs GROUP BY channel").fetchall())
+    assert rows["notes"] == 1
+    assert rows["log"] > 1
+
+
+def test_compaction_keeps_the_newest_checkpoints_and_their_state(tmp_path):
+    path = str(tmp_path / "checkpoints.sqlite")
+    saver = SqliteCheckpointSaver(path, ttl_seconds=3600, keep_per_thread=2)
+    app = build_graph(saver)
+    config = {"configurable": {"thread_id": "thread-1"}}
+    app.invoke({"log": ["a"], "notes": "n"}, config)
+    for turn in range(3):
+        app.invoke({"log": [str(turn)]}, config)
+    before = app.get_state(config).values
+
+    result = saver.compact()
+
+    assert result["expired_threads"] == 0
+    assert result["pruned_checkpoints"] > 0
+    assert len(list(app.get_state_history(config))) == 2
+    assert app.get_state(config).values == before
+    app.invoke({"log": ["after"]}, config)
+    assert app.get_state(config).values["log"][-2:] == ["after", "step"]
+
+
+def test_compaction_expires_idle_threads(tmp_path):
+    saver = SqliteCheckpointSaver(str(tmp_path / "checkpoints.sqlite"), ttl_seconds=-1)
+    app = build_graph(saver)
+    config = {"configurable": {"thread_id": "thread-1"}}
+    app.invoke({"log": ["a"], "notes": "n"}, config)
+
+    assert saver.compact()["expired_threads"] == 1
+    assert saver.get_tuple(config) is None
+    assert saver.thread_bytes("thread-1") == 0
+
+
+def test_existing_database_is_converted_to_incremental_vacuum(tmp_path):
+    path = str(tmp_path / "checkpoints.sqlite")
+    with sqlite3.connect(path) as conn:
+        conn.execute("CREATE TABLE unrelated (value TEXT)")
+
+    saver = SqliteCheckpointSaver(path, ttl_seconds=3600)
+    saver.thread_bytes("thread-1")
+
+    with sqlite3.connect(path) as conn:
+        assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
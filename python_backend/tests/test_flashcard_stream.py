@@ -0,0 +1,48 @@
+import asyncio
+
+import pytest
+
+flashcard_agent = pytest.importorskip("flashcards.flashcard_agent")
+from langchain_core.runnables import RunnableLambda
+
+
+class FakeStreamingChain:
+    """Yields growing partial outputs like a structured-output model stream"""
+
+    def __init__(self, partials, release_last: asyncio.Event):
+        self.partials = partials
+        self.release_last = release_last
+
+    async def astream(self, inputs, config=None):
+        for i, partial in enumerate(self.partials):
+            if i == len(self.partials) - 1:
+                # The stream only finishes once a client has received an item
+                await asyncio.wait_for(self.release_last.wait(), 5)
+            yield partial
+
+
+def questions(*names):
+    return {"questions": [{"question": name, "options": ["a", "b"], "answer": "a"} for name in names]}
+
+
+def test_items_are_dispatched_before_the_stream_ends_and_the_last_one_is_flushed():
+    async def run():
+        release_last = asyncio.Event()
+        chain = FakeStreamingChain([questions("q1"), questions("q1", "q2"), questions("q1", "q2", "q3")], release_last)
+
+        async def node(inputs, config):
+            return await flashcard_agent.stream_items(chain, inputs, {"quiz_item": lambda quiz: quiz["questions"]}, config)
+
+        received = []
+        output = None
+        async for event in RunnableLambda(node).astream_events({}, version="v2"):
+            if event["event"] == "on_custom_event" and event["name"] == "quiz_item":
+                received.append(event["data"]["question"])
+                release_last.set()
+            elif event["event"] == "on_chain_end":
+                output = event["data"]["output"]
+        return received, output
+
+    received, output = asyncio.run(run())
+    assert received == ["q1", "q2", "q3"]
+    assert output == questions("q1", "q2", "q3")
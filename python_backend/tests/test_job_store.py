@@ -0,0 +1,74 @@
+import multiprocessing
+import os
+import socket
+
+from flashcards.jobs import JobStore, snapshot
+
+# Forked children stand in for other uvicorn workers sharing the database file
+context = multiprocessing.get_context("fork")
+
+
+def run_in_child(target, *args):
+    child = context.Process(target=target, args=args)
+    child.start()
+    child.join(10)
+    assert child.exitcode == 0
+
+
+def insert_job(path, inputs):
+    JobStore(path).insert(inputs, ["extract", "quiz"], max_queue=10)
+
+
+def claim_job_and_exit(path):
+    assert JobStore(path).claim(f"{socket.gethostname()}:{os.getpid()}") is not None
+
+
+def finish_job(path, job_id):
+    JobStore(path).update(job_id, status="succeeded", result={"cards": 3}, finished_at=1.0)
+
+
+def test_job_submitted_by_one_process_is_claimed_by_another(tmp_path):
+    path = str(tmp_path / "jobs.sqlite")
+    store = JobStore(path)
+    store.counts()
+
+    run_in_child(insert_job, path, {"message": "hi"})
+
+    job_id, inputs, progress, _ = store.claim("host:1")
+    assert inputs == {"message": "hi"}
+    assert set(progress) == {"extract", "quiz"}
+    assert store.claim("host:2") is None
+
+
+def test_status_written_by_one_process_is_read_by_another(tmp_path):
+    path = str(tmp_path / "jobs.sqlite")
+    store = JobStore(path)
+    job_id = store.insert({"message": "hi"}, ["extract"], max_queue=10)
+    version = store.version(job_id)
+
+    run_in_child(finish_job, path, job_id)
+
+    assert store.version(job_id) > version
+    job = snapshot(store.get(job_id))
+    assert job["status"] == "succeeded"
+    assert job["result"] == {"cards": 3}
+
+
+def test_jobs_of_an_exited_worker_are_failed_and_their_inputs_returned(tmp_path):
+    path = str(tmp_path / "jobs.sqlite")
+    store = JobStore(path)
+    job_id = store.insert({"pdf_path": "/tmp/upload.pdf"}, ["extract"], max_queue=10)
+
+    run_in_child(claim_job_and_exit, path)
+    assert store.get(job_id)["status"] == "running"
+
+    assert store.fail_orphans(socket.gethostname()) == [{"pdf_path": "/tmp/upload.pdf"}]
+    assert store.get(job_id)["status"] == "failed"
+
+
+def test_running_jobs_of_live_workers_are_left_alone(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite"))
+    store.insert({"message": "hi"}, ["extract"], max_queue=10)
+    store.claim(f"{socket.gethostname()}:{os.getpid()}")
+
+    assert store.fail_orphans(socket.gethostname()) == []
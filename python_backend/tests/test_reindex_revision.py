@@ -0,0 +1,85 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+agent = pytest.importorskip("flashcards.agent")
+from flashcards.vector_store_manager import VectorStoreManager
+
+
+class InlineExecutor:
+    async def run(self, fn, *args, **kwargs):
+        return fn(*args, **kwargs)
+
+
+class FakeDocumentStore:
+    def path(self, doc_id):
+        return f"/documents/{doc_id}.pdf"
+
+
+class FakeIndexStore:
+    def __init__(self):
+        self.saved = {}
+
+    def load(self, doc_id, model_key):
+        return None
+
+    def save(self, doc_id, model_key, chunks, vectors, extra=None):
+        self.saved[doc_id] = (chunks, vectors, extra)
+
+
+class FakeEmbeddings:
+    def __init__(self):
+        self.embedded = []
+
+    async def aembed_documents_with_stats(self, chunks, embed=None):
+        self.embedded.extend(chunks)
+        vectors = [[float(len(chunk)), 1.0] for chunk in chunks]
+        return vectors, {"chunks": len(chunks), "hits": 0, "hit_ratio": 0.0}
+
+
+@pytest.fixture
+def revision(monkeypatch):
+    old_chunks = ["intro", "cells", "osmosis"]
+    old_vectors = np.array([[1.0, 0.0], [2.0, 0.0], [3.0, 0.0]], dtype=np.float32)
+    new_chunks = ["intro", "osmosis", "diffusion", "summary"]
+    embeddings = FakeEmbeddings()
+    index_store = FakeIndexStore()
+
+    monkeypatch.setattr(agent, "parse_executor", InlineExecutor())
+    monkeypatch.setattr(agent, "embed_executor", InlineExecutor())
+    monkeypatch.setattr(agent, "document_store", FakeDocumentStore())
+    monkeypatch.setattr(agent, "index_store", index_store)
+    monkeypatch.setattr(agent, "document_embeddings", embeddings)
+    monkeypatch.setattr(agent, "vector_stores", VectorStoreManager())
+    monkeypatch.setattr(agent, "split_document", lambda path, content_hash=None: list(new_chunks))
+    monkeypatch.setattr(agent, "previous_revision", lambda doc_id: (old_chunks, old_vectors))
+    monkeypatch.setattr(agent, "build_vector_store", lambda doc_id, chunks, vectors: object())
+    return embeddings, index_store, old_vectors
+
+
+def test_only_changed_chunks_are_embedded_again(revision):
+    embeddings, index_store, old_vectors = revision
+
+    stats = asyncio.run(agent.reindex_revision("doc-2", "doc-1"))
+
+    assert stats["reused"] == 2
+    assert stats["recomputed"] == 2
+    assert stats["removed"] == 1
+    assert stats["chunks"] == 4
+    assert embeddings.embedded == ["diffusion", "summary"]
+
+    chunks, vectors, extra = index_store.saved["doc-2"]
+    assert chunks == ["intro", "osmosis", "diffusion", "summary"]
+    np.testing.assert_array_equal(vectors[0], old_vectors[0])
+    np.testing.assert_array_equal(vectors[1], old_vectors[2])
+    assert extra == {"reindex": stats}
+
+
+def test_resident_index_is_not_rebuilt(revision):
+    embeddings, index_store, _ = revision
+    asyncio.run(agent.reindex_revision("doc-2", "doc-1"))
+    embeddings.embedded.clear()
+
+    assert asyncio.run(agent.reindex_revision("doc-2", "doc-1")) is None
+    assert embeddings.embedded == []
@@ -0,0 +1,47 @@
+from flashcards.response_cache import SemanticResponseCache
+
+
+def test_answers_are_only_reused_within_their_teacher_and_document():
+    cache = SemanticResponseCache(threshold=0.95, ttl_seconds=3600, max_entries=100)
+    entry_id = cache.store("Kavita Iyer", "doc-1", [1.0, 0.0], "What is osmosis?", "Water moving across a membrane.")
+
+    hit = cache.lookup("Kavita Iyer", "doc-1", [0.99, 0.01])
+    assert hit["answer"] == "Water moving across a membrane."
+    assert hit["provenance"]["entry_id"] == entry_id
+
+    assert cache.lookup("Anil Deshmukh", "doc-1", [1.0, 0.0]) is None
+    assert cache.lookup("Kavita Iyer", "doc-2", [1.0, 0.0]) is None
+    assert cache.lookup("Kavita Iyer", None, [1.0, 0.0]) is None
+    assert cache.stats()["partitions"] == 1
+
+
+def test_dissimilar_question_misses():
+    cache = SemanticResponseCache(threshold=0.95, ttl_seconds=3600, max_entries=100)
+    cache.store("Kavita Iyer", "doc-1", [1.0, 0.0], "What is osmosis?", "answer")
+
+    assert cache.lookup("Kavita Iyer", "doc-1", [0.0, 1.0]) is None
+    assert cache.stats()["misses"] == 1
+
+
+def test_invalidating_a_document_drops_it_for_every_teacher():
+    cache = SemanticResponseCache(threshold=0.95, ttl_seconds=3600, max_entries=100)
+    cache.store("Kavita Iyer", "doc-1", [1.0, 0.0], "q", "a")
+    cache.store("Anil Deshmukh", "doc-1", [1.0, 0.0], "q", "a")
+    cache.store("Anil Deshmukh", "doc-2", [1.0, 0.0], "q", "a")
+
+    cache.invalidate("doc-1")
+
+    assert cache.lookup("Kavita Iyer", "doc-1", [1.0, 0.0]) is None
+    assert cache.lookup("Anil Deshmukh", "doc-1", [1.0, 0.0]) is None
+    assert cache.lookup("Anil Deshmukh", "doc-2", [1.0, 0.0]) is not None
+    assert cache.stats()["entries"] == 1
+
+
+def test_oldest_entry_goes_beyond_max_entries():
+    cache = SemanticResponseCache(threshold=0.95, ttl_seconds=3600, max_entries=2)
+    cache.store("Kavita Iyer", "doc-1", [1.0, 0.0], "first", "a")
+    cache.store("Kavita Iyer", "doc-2", [1.0, 0.0], "second", "a")
+    cache.store("Kavita Iyer", "doc-3", [1.0, 0.0], "third", "a")
+
+    assert cache.lookup("Kavita Iyer", "doc-1", [1.0, 0.0]) is None
+    assert cache.stats()["evictions"] == 1
@@ -0,0 +1,85 @@
+from flashcards.vector_store_manager import VectorStoreManager
+
+
+def make_manager(max_bytes=100, ttl_seconds=3600):
+    released = []
+    manager = VectorStoreManager(max_bytes, ttl_seconds, on_evict=lambda key, store: released.append((key, store)))
+    return manager, released
+
+
+def test_least_recently_used_store_is_evicted_over_budget():
+    manager, released = make_manager()
+    manager.put("a", "store-a", 40)
+    manager.put("b", "store-b", 40)
+    assert manager.get("a") == "store-a"
+
+    manager.put("c", "store-c", 40)
+
+    assert released == [("b", "store-b")]
+    assert manager.get("b") is None
+    assert manager.total_bytes == 80
+    assert manager.stats()["evictions"] == 1
+
+
+def test_pinned_store_survives_until_unpinned():
+    manager, released = make_manager()
+    manager.put("a", "store-a", 60, owner="request-1")
+    manager.put("b", "store-b", 60)
+
+    # "a" is pinned and the new entry is never evicted, so the budget is overrun for now
+    assert released == []
+    assert manager.total_bytes == 120
+
+    manager.unpin("a", "request-1")
+
+    assert released == [("a", "store-a")]
+    assert manager.total_bytes == 60
+
+
+def test_idle_store_expires():
+    manager, released = make_manager(max_bytes=1000, ttl_seconds=0)
+    manager.put("a", "store-a", 10)
+
+    assert manager.get("a") is None
+    assert released == [("a", "store-a")]
+    assert manager.stats()["expirations"] == 1
+
+
+def test_discarded_store_is_released_at_its_last_unpin():
+    manager, released = make_manager()
+    manager.put("a", "store-a", 10, owner="request-1")
+    manager.pin("a", "request-2")
+
+    assert manager.discard("a")
+    assert manager.get("a") is None
+    assert manager.stats()["retired"] == 1
+
+    manager.unpin("a", "request-1")
+    assert released == []
+    manager.unpin("a", "request-2")
+    assert released == [("a", "store-a")]
+    assert manager.stats()["retired"] == 0
+
+
+def test_replaced_store_is_released_and_pins_stay_with_it():
+    manager, released = make_manager()
+    manager.put("a", "old", 10, owner="request-1")
+
+    manager.put("a", "new", 10)
+
+    assert manager.get("a") == "new"
+    assert released == []
+    manager.unpin("a", "request-1")
+    assert released == [("a", "old")]
+    assert manager.stats()["pinned"] == 0
+
+
+def test_putting_the_same_store_again_keeps_its_pins():
+    manager, released = make_manager()
+    manager.put("a", "store-a", 10, owner="request-1")
+
+    manager.put("a", "store-a", 20)
+
+    assert released == []
+    assert manager.stats()["pinned"] == 1
+    assert manager.total_bytes == 20